@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+批量截图任务运行器（非交互式）
+从任务文件读取一批截图任务并按指定并发数执行，适合由定时任务或调度系统调用：
+1. 任务文件支持 JSON、YAML（需要安装 PyYAML）和 CSV，每个任务包含 URL、最大页数、输出目录、账号和截图范围
+2. 每个任务结束时输出一行状态，全部结束后写入汇总报告（JSON）
+3. 退出码：0 全部成功；1 有任务失败；2 任务文件无效；130 被中断（已结束任务仍写入报告）
+
+任务文件示例（JSON，也可以是 {"jobs": [...]}）：
+    [
+        {"url": "https://example.com/attendance", "max_pages": 12, "output_dir": "screenshots/a",
+         "account": "alice", "capture_mode": "element"},
+        {"url": "https://example.com/report", "name": "report"}
+    ]
+
+CSV 第一行为字段名：url,max_pages,output_dir,account,capture_mode
+
+使用方法：
+    python batch_runner.py jobs.json
+    python batch_runner.py jobs.csv --mode workers --concurrency 4 --headless
+    python batch_runner.py jobs.yaml --report reports/nightly.json
+    python batch_runner.py jobs.json --dry-run        # 只检查任务文件
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+import config
+import utils
+from capture_modes import CAPTURE_MODES
+from jobs import CaptureJob, JobResult
+
+# 运行方式：tabs 同一浏览器多标签页；workers 多进程（每个进程独立浏览器）
+BATCH_MODES = ("tabs", "workers")
+
+# 任务文件字段 -> CaptureJob 字段
+JOB_FIELDS = {
+    "url": "url",
+    "max_pages": "max_pages",
+    "output_dir": "screenshot_dir",
+    "screenshot_dir": "screenshot_dir",
+    "account": "account",
+    "capture_mode": "capture_mode",
+    "name": "name",
+    "resume": "resume",
+}
+
+# 退出码
+EXIT_OK = 0
+EXIT_JOB_FAILED = 1
+EXIT_INVALID_JOBS = 2
+EXIT_INTERRUPTED = 130
+
+
+class JobFileError(ValueError):
+    """任务文件无法读取或内容无效"""
+
+
+def read_entries(path: Path) -> List[Dict[str, Any]]:
+    """
+    按扩展名读取任务文件中的原始条目（定时任务文件同样使用）
+
+    Args:
+        path: 任务文件路径（.json / .yaml / .yml / .csv）
+
+    Returns:
+        List[Dict[str, Any]]: 原始条目列表
+    """
+    suffix = path.suffix.lower()
+    try:
+        text = path.read_text(encoding="utf-8-sig")
+    except OSError as e:
+        raise JobFileError(f"无法读取任务文件 {path}: {str(e)}")
+
+    if suffix == ".csv":
+        # 空单元格视为未填写
+        return [{key: value for key, value in row.items() if key and value not in (None, "")}
+                for row in csv.DictReader(text.splitlines())]
+
+    if suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise JobFileError("读取YAML任务文件需要安装 PyYAML: pip install pyyaml")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise JobFileError(f"YAML格式错误: {str(e)}")
+    elif suffix == ".json":
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise JobFileError(f"JSON格式错误: {str(e)}")
+    else:
+        raise JobFileError(f"不支持的任务文件格式 {suffix or '(无扩展名)'}，请使用 .json、.yaml/.yml 或 .csv")
+
+    if isinstance(data, dict):
+        data = data.get("jobs")
+    if not isinstance(data, list):
+        raise JobFileError("任务文件应为任务列表，或包含 jobs 列表的对象")
+    return data
+
+
+def _parse_bool(value: Any) -> bool:
+    """解析布尔值（CSV 中为字符串）"""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y", "是")
+    return bool(value)
+
+
+def parse_job(entry: Any, where: str) -> CaptureJob:
+    """
+    把任务文件中的一个条目转换为截图任务
+
+    Args:
+        entry: 条目（字典，或只有URL的字符串）
+        where: 条目位置（用于错误信息，如 "第3个任务"）
+
+    Returns:
+        CaptureJob: 截图任务
+    """
+    if isinstance(entry, str):
+        entry = {"url": entry}
+    if not isinstance(entry, dict):
+        raise JobFileError(f"{where}: 应为对象或URL字符串")
+
+    unknown = sorted(set(entry) - set(JOB_FIELDS))
+    if unknown:
+        raise JobFileError(f"{where}: 未知字段 {', '.join(unknown)}（可用字段: {', '.join(JOB_FIELDS)}）")
+
+    values = {JOB_FIELDS[key]: value for key, value in entry.items()}
+    url = str(values.get("url") or "").strip()
+    if not url or not utils.validate_url(url):
+        raise JobFileError(f"{where}: 无效的URL {url!r}")
+    values["url"] = url
+
+    try:
+        values["max_pages"] = int(values.get("max_pages", config.MAX_PAGES))
+    except (TypeError, ValueError):
+        raise JobFileError(f"{where}: max_pages 应为整数，实际为 {values.get('max_pages')!r}")
+    if values["max_pages"] < 1:
+        raise JobFileError(f"{where}: max_pages 至少为1")
+
+    capture_mode = values.get("capture_mode")
+    if capture_mode and capture_mode not in CAPTURE_MODES:
+        raise JobFileError(f"{where}: 未知的截图范围 {capture_mode!r}（可用: {', '.join(CAPTURE_MODES)}）")
+
+    if "resume" in values:
+        values["resume"] = _parse_bool(values["resume"])
+    for key in ("screenshot_dir", "account", "name"):
+        if values.get(key) is not None:
+            values[key] = str(values[key])
+    return CaptureJob(**values)
+
+
+def load_jobs(path: Path) -> List[CaptureJob]:
+    """
+    读取并校验任务文件
+
+    Args:
+        path: 任务文件路径（.json / .yaml / .yml / .csv）
+
+    Returns:
+        List[CaptureJob]: 截图任务列表
+    """
+    jobs = [parse_job(entry, f"第{i}个任务") for i, entry in enumerate(read_entries(path), 1)]
+    if not jobs:
+        raise JobFileError("任务文件中没有任务")
+
+    # 输出目录相同的任务会互相覆盖截图和检查点
+    seen: Dict[Path, int] = {}
+    for index, job in enumerate(jobs, 1):
+        output_dir = job.output_dir(index).resolve()
+        if output_dir in seen:
+            raise JobFileError(f"第{index}个任务与第{seen[output_dir]}个任务的输出目录相同: {output_dir}")
+        seen[output_dir] = index
+    return jobs
+
+
+def check_accounts(jobs: List[CaptureJob], mode: str) -> None:
+    """
+    检查任务的登录账号是否适用于运行方式（多标签页方式共享一个浏览器的登录状态，只能使用一个账号）
+
+    Args:
+        jobs: 截图任务列表
+        mode: 运行方式
+    """
+    if mode != "tabs":
+        return
+    accounts: Dict[str, int] = {}
+    for index, job in enumerate(jobs, 1):
+        accounts.setdefault(job.account or config.LOGIN_USERNAME, index)
+    if len(accounts) > 1:
+        used = ', '.join(f"{account}（第{index}个任务起）" for account, index in accounts.items())
+        raise JobFileError(f"多标签页方式只能使用一个登录账号，任务中使用了 {used}；请使用 --mode workers")
+
+
+def _job_label(job: CaptureJob, index: int) -> str:
+    """状态行中的任务名称"""
+    return job.name or job.output_dir(index).name
+
+
+def build_report(jobs: List[CaptureJob], results: Dict[int, JobResult], jobs_file: Path,
+                 mode: str, concurrency: Optional[int], started_at: float,
+                 interrupted: bool = False) -> Dict[str, Any]:
+    """
+    生成汇总报告
+
+    Args:
+        jobs: 截图任务列表
+        results: {任务在列表中的位置: 结果}，未结束的任务没有结果
+        jobs_file: 任务文件路径
+        mode: 运行方式
+        concurrency: 并发数（None 表示使用配置）
+        started_at: 开始时间（Unix时间）
+        interrupted: 是否被中断
+
+    Returns:
+        Dict[str, Any]: 汇总报告
+    """
+    entries = []
+    for position, job in enumerate(jobs):
+        result = results.get(position)
+        entries.append({
+            'index': position + 1,
+            'name': _job_label(job, position + 1),
+            'url': job.url,
+            'output_dir': str(job.output_dir(position + 1)),
+            'account': job.account or config.LOGIN_USERNAME,
+            'capture_mode': job.capture_mode or getattr(config, 'CAPTURE_MODE', 'viewport'),
+            'max_pages': job.max_pages,
+            'status': 'unfinished' if result is None else ('succeeded' if result.success else 'failed'),
+            'screenshot_count': result.screenshot_count if result else 0,
+            'duration': round(result.duration, 3) if result else None,
+            'error': result.error if result else None,
+            'files': result.files if result else [],
+        })
+
+    finished_at = time.time()
+    return {
+        'jobs_file': str(jobs_file),
+        'mode': mode,
+        'concurrency': concurrency,
+        'started_at': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started_at)),
+        'finished_at': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(finished_at)),
+        'duration': round(finished_at - started_at, 3),
+        'interrupted': interrupted,
+        'totals': {
+            'jobs': len(jobs),
+            'succeeded': sum(1 for e in entries if e['status'] == 'succeeded'),
+            'failed': sum(1 for e in entries if e['status'] == 'failed'),
+            'unfinished': sum(1 for e in entries if e['status'] == 'unfinished'),
+            'screenshots': sum(e['screenshot_count'] for e in entries),
+        },
+        'jobs': entries,
+    }
+
+
+def run_batch(jobs: List[CaptureJob], mode: str = "tabs", concurrency: Optional[int] = None,
+              headless: Optional[bool] = None, on_result=None,
+              interactive: bool = False) -> List[JobResult]:
+    """
+    执行一批截图任务
+
+    Args:
+        jobs: 截图任务列表
+        mode: tabs 同一浏览器多标签页；workers 多进程（每个进程独立浏览器）
+        concurrency: 并发标签页数或工作进程数，默认使用 config.TAB_POOL_SIZE / config.WORKER_COUNT
+        headless: 是否使用无头模式，默认使用 config.BROWSER_HEADLESS
+        on_result: 每个任务结束时调用，参数为 (任务在列表中的位置, 结果)
+        interactive: 需要登录时是否等待手动输入密码；默认不等待，没有可用登录会话的任务直接失败
+
+    Returns:
+        List[JobResult]: 与输入顺序一致的任务结果列表
+    """
+    if mode == "workers":
+        from worker_pool import WorkerPool
+        pool = WorkerPool(workers=concurrency, headless=headless, interactive=interactive)
+        return pool.run(jobs, on_result=on_result)
+    if mode == "tabs":
+        from tab_pool import TabPool
+        pool = TabPool(pool_size=concurrency, headless=headless, interactive=interactive)
+        return pool.run(jobs, on_result=on_result)
+    raise ValueError(f"未知的运行方式: {mode}（可用: {', '.join(BATCH_MODES)}）")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="批量截图任务运行器（非交互式）")
+    parser.add_argument("jobs_file", help="任务文件（.json / .yaml / .yml / .csv）")
+    parser.add_argument("--mode", choices=BATCH_MODES, default=None,
+                        help="运行方式：tabs 同一浏览器多标签页；workers 多进程（默认 config.BATCH_MODE）")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="并发标签页数或工作进程数（默认 config.TAB_POOL_SIZE / config.WORKER_COUNT）")
+    parser.add_argument("--headless", action="store_true", default=None, help="使用无头模式")
+    parser.add_argument("--resume", action="store_true", help="所有任务从各自输出目录中的检查点继续")
+    parser.add_argument("--report", default=None,
+                        help="汇总报告路径（默认 config.BATCH_REPORT_DIR/batch_<时间>.json）")
+    parser.add_argument("--dry-run", action="store_true", help="只检查任务文件并列出任务，不执行")
+    args = parser.parse_args()
+
+    jobs_file = Path(args.jobs_file)
+    mode = args.mode or getattr(config, 'BATCH_MODE', 'tabs')
+    if mode not in BATCH_MODES:
+        print(f"❌ 未知的运行方式: {mode}（可用: {', '.join(BATCH_MODES)}）")
+        return EXIT_INVALID_JOBS
+    if args.concurrency is not None and args.concurrency < 1:
+        print("❌ --concurrency 至少为1")
+        return EXIT_INVALID_JOBS
+
+    try:
+        jobs = load_jobs(jobs_file)
+        check_accounts(jobs, mode)
+    except JobFileError as e:
+        print(f"❌ 任务文件无效: {e}")
+        return EXIT_INVALID_JOBS
+    if args.resume:
+        for job in jobs:
+            job.resume = True
+
+    print(f"📋 {jobs_file}: {len(jobs)} 个任务（{mode}，并发 {args.concurrency or '默认'}）", flush=True)
+    if args.dry_run:
+        for index, job in enumerate(jobs, 1):
+            print(f"   {index}. {job.url} | 最多 {job.max_pages} 页 | {job.output_dir(index)} | "
+                  f"账号 {job.account or config.LOGIN_USERNAME} | "
+                  f"{job.capture_mode or getattr(config, 'CAPTURE_MODE', 'viewport')}")
+        return EXIT_OK
+
+    utils.init_process()
+    started_at = time.time()
+    results: Dict[int, JobResult] = {}
+
+    def on_result(position: int, result: JobResult) -> None:
+        # 每个任务结束时输出一行状态（flush 保证通过管道读取时也能实时看到）
+        results[position] = result
+        label = _job_label(result.job, position + 1)
+        if result.success:
+            detail = f"{result.screenshot_count} 张截图 | {result.job.output_dir(position + 1)}"
+        else:
+            detail = f"失败: {' '.join(str(result.error).split())}"
+        print(f"[{len(results)}/{len(jobs)}] {'✅' if result.success else '❌'} {label} | "
+              f"{result.duration:.1f} 秒 | {detail}", flush=True)
+
+    interrupted = False
+    try:
+        run_batch(jobs, mode=mode, concurrency=args.concurrency, headless=args.headless, on_result=on_result)
+    except KeyboardInterrupt:
+        interrupted = True
+        logger.warning("批量任务被中断")
+    except Exception as e:
+        # 浏览器无法启动、首次登录失败等：尚未结束的任务全部记为失败
+        logger.error(f"批量任务执行失败: {str(e)}")
+        for position, job in enumerate(jobs):
+            if position not in results:
+                on_result(position, JobResult(job=job, success=False, error=str(e)))
+
+    report = build_report(jobs, results, jobs_file, mode, args.concurrency, started_at, interrupted)
+    report_path = Path(args.report) if args.report else (
+        Path(getattr(config, 'BATCH_REPORT_DIR', config.PROJECT_ROOT / "reports"))
+        / f"batch_{time.strftime('%Y%m%d_%H%M%S', time.localtime(started_at))}.json")
+    try:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    except OSError as e:
+        logger.error(f"写入汇总报告失败: {str(e)}")
+        report_path = None
+
+    totals = report['totals']
+    all_succeeded = totals['succeeded'] == totals['jobs']
+    unfinished = f"，未完成 {totals['unfinished']} 个" if totals['unfinished'] else ""
+    print(f"\n{'✅' if all_succeeded else '❌'} 成功 {totals['succeeded']}/{totals['jobs']} 个任务，"
+          f"失败 {totals['failed']} 个{unfinished}，共 {totals['screenshots']} 张截图，"
+          f"耗时 {report['duration']:.1f} 秒")
+    if report_path:
+        print(f"📁 汇总报告: {report_path}")
+
+    if interrupted:
+        return EXIT_INTERRUPTED
+    return EXIT_OK if all_succeeded else EXIT_JOB_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
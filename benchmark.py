@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+离线性能基准测试
+在本地启动一个模拟目标网站的HTTP服务器，端到端运行 ScreenshotCrawler，结果保存为JSON便于在版本之间对比：
+1. 模拟网站包含登录表单（#username）和带 #cal 翻页的考勤日历
+2. 可配置页面大小、服务器响应延迟以及加载缓慢的资源
+3. 统计吞吐量（页/秒）、每页耗时分位数、各阶段耗时、内存峰值（Python进程和浏览器进程树分别统计）和写入字节数
+
+使用方法：
+    python benchmark.py                                   # 默认参数运行一次
+    python benchmark.py --pages 30 --latency-ms 200 --page-kb 500
+    python benchmark.py --slow-resources 5 --slow-ms 800 --runs 3
+    python benchmark.py --compare benchmarks/上次的结果.json
+"""
+
+import argparse
+import json
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from loguru import logger
+
+import config
+import utils
+from metrics import percentile
+from screenshot_crawler import ScreenshotCrawler
+
+# 1x1 透明PNG，作为加载缓慢的资源返回
+PIXEL_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d49444154789c6360606060000000050001a5f645400000000049454e44ae426082"
+)
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>用户登录</title></head>
+<body style="font-family: sans-serif; margin: 80px;">
+<h1>系统登录</h1>
+<form id="login-form" action="/attendance" method="get">
+  <input type="hidden" name="page" value="1">
+  <p>用户名 <input id="{username_id}" type="text"></p>
+  <p>密码 <input id="password" type="password"></p>
+  <p><button type="submit">登录</button></p>
+</form>
+<script>
+// 模拟用户输入密码：填写用户名后自动提交
+document.getElementById('{username_id}').addEventListener('input', function () {{
+  setTimeout(function () {{ location.href = '/attendance?page=1'; }}, {login_delay_ms});
+}});
+</script>
+</body></html>
+"""
+
+
+@dataclass
+class SiteProfile:
+    """模拟网站的参数"""
+
+    pages: int = 20             # 日历总页数（最后一页没有下一页链接）
+    latency_ms: int = 0         # 每个页面文档的服务器响应延迟（毫秒）
+    page_kb: int = 100          # 每页附加的考勤明细大小（KB）
+    slow_resources: int = 0     # 每页加载缓慢的图片数量
+    slow_ms: int = 500          # 每个缓慢图片的响应延迟（毫秒）
+    login: bool = True          # 是否先经过登录页
+    login_delay_ms: int = 200   # 输入用户名后到登录跳转的时间（毫秒）
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    """模拟网站的请求处理"""
+
+    def do_GET(self):
+        profile: SiteProfile = self.server.profile
+        parsed = urlparse(self.path)
+
+        if parsed.path == "/login":
+            self._sleep(profile.latency_ms)
+            self._send(200, "text/html; charset=utf-8", LOGIN_PAGE.format(
+                username_id=config.USERNAME_INPUT_ID, login_delay_ms=profile.login_delay_ms).encode("utf-8"))
+        elif parsed.path == "/attendance":
+            self._sleep(profile.latency_ms)
+            try:
+                page_num = int(parse_qs(parsed.query).get("page", ["1"])[0])
+            except ValueError:
+                page_num = 1
+            self._send(200, "text/html; charset=utf-8", render_calendar(profile, page_num).encode("utf-8"))
+        elif parsed.path.startswith("/slow/"):
+            self._sleep(profile.slow_ms)
+            self._send(200, "image/png", PIXEL_PNG)
+        else:
+            self._send(404, "text/plain; charset=utf-8", b"not found")
+
+    def _sleep(self, ms: int) -> None:
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def render_calendar(profile: SiteProfile, page_num: int) -> str:
+    """
+    生成第 page_num 页的考勤日历
+
+    每页的单元格颜色按页码生成，保证各页截图在感知哈希上明显不同（不会被当作重复截图）
+
+    Args:
+        profile: 模拟网站的参数
+        page_num: 页码
+
+    Returns:
+        str: 页面HTML
+    """
+    rng = random.Random(page_num * 7919)
+    month = (page_num - 1) % 12 + 1
+    year = 2026 - (page_num - 1) // 12
+
+    rows = []
+    for week in range(6):
+        cells = []
+        for day in range(7):
+            lightness = rng.randint(35, 95)
+            cells.append(f'<td style="background: hsl({rng.randint(0, 359)}, 60%, {lightness}%);">'
+                         f'{week * 7 + day + 1}<br>{rng.choice(["正常", "迟到", "早退", "请假", "加班"])}</td>')
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+
+    next_link = (f'<a href="/attendance?page={page_num + 1}">下一月 &raquo;</a>'
+                 if page_num < profile.pages else '<span>已是最后一页</span>')
+
+    # 考勤明细：按配置的大小填充，位于日历下方
+    details = []
+    size = 0
+    i = 0
+    while size < profile.page_kb * 1024:
+        row = (f"<tr><td>{year}-{month:02d}-{i % 28 + 1:02d}</td><td>员工{i:05d}</td>"
+               f"<td>08:{rng.randint(0, 59):02d}</td><td>18:{rng.randint(0, 59):02d}</td></tr>")
+        details.append(row)
+        size += len(row.encode("utf-8"))
+        i += 1
+
+    images = "".join(f'<img src="/slow/{page_num}_{n}.png" width="1" height="1">'
+                     for n in range(profile.slow_resources))
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>考勤日历 - {year}年{month}月</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+#cal table {{ border-collapse: collapse; width: 100%; }}
+#cal td {{ height: 110px; border: 1px solid #888; text-align: center; font-size: 18px; }}
+</style></head>
+<body>
+<h1>考勤记录 {year}年{month}月（第 {page_num} 页）</h1>
+<div id="cal">
+  <p>{next_link}</p>
+  <table>{"".join(rows)}</table>
+</div>
+{images}
+<table class="detail">{"".join(details)}</table>
+</body></html>
+"""
+
+
+class StandInSite:
+    """在本地随机端口上运行的模拟网站"""
+
+    def __init__(self, profile: SiteProfile):
+        """
+        初始化模拟网站
+
+        Args:
+            profile: 模拟网站的参数
+        """
+        self.profile = profile
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @property
+    def entry_url(self) -> str:
+        """截图任务的入口URL"""
+        return f"{self.base_url}/login" if self.profile.login else f"{self.base_url}/attendance?page=1"
+
+    def start(self) -> None:
+        """在后台线程中启动服务器"""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+        self._server.daemon_threads = True
+        self._server.profile = self.profile
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stand-in-site", daemon=True)
+        self._thread.start()
+        logger.info(f"模拟网站已启动: {self.base_url}")
+
+    def stop(self) -> None:
+        """停止服务器"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class BrowserMemorySampler:
+    """在后台线程中定期采样浏览器进程树（主进程和各渲染进程）的内存，记录峰值"""
+
+    def __init__(self, crawler: ScreenshotCrawler, interval: float = 0.25):
+        """
+        初始化采样器
+
+        Args:
+            crawler: 截图爬虫（浏览器启动后开始采样）
+            interval: 采样间隔（秒）
+        """
+        self.crawler = crawler
+        self.interval = interval
+        self.peak: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                pid = self.crawler.page.browser.process_id
+            except Exception:
+                # 浏览器尚未启动或已关闭
+                continue
+            rss = utils.get_process_tree_rss(pid) if pid else None
+            if rss:
+                self.peak = max(self.peak or 0, rss)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="browser-memory-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+
+def _directory_size(path: Path) -> int:
+    """目录中所有文件的总大小（字节）"""
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def run_benchmark(profile: SiteProfile, headless: bool = True, capture_mode: Optional[str] = None,
+                  pagination_mode: Optional[str] = None, keep_output: bool = False) -> Dict[str, Any]:
+    """
+    端到端运行一次截图任务并统计性能
+
+    Args:
+        profile: 模拟网站的参数
+        headless: 是否使用无头模式
+        capture_mode: 截图范围（可选），默认使用 config.CAPTURE_MODE
+        pagination_mode: 翻页方式（可选），默认使用 config.PAGINATION_MODE
+        keep_output: 是否保留截图目录（默认运行结束后删除）
+
+    Returns:
+        Dict[str, Any]: 本次运行的统计结果
+    """
+    output_dir = Path(tempfile.mkdtemp(prefix="dac-benchmark-"))
+    try:
+        with StandInSite(profile) as site:
+            crawler = ScreenshotCrawler(headless=headless, capture_mode=capture_mode)
+            # 基准测试不读写已保存的登录会话，也不导出运行指标文件，保证每次运行条件一致
+            crawler.session_store.enabled = False
+            crawler.metrics_enabled = False
+            if pagination_mode:
+                crawler.pagination_mode = pagination_mode
+
+            start = time.perf_counter()
+            with BrowserMemorySampler(crawler) as sampler:
+                count, files = crawler.start_screenshot_task(site.entry_url, max_pages=profile.pages,
+                                                             screenshot_dir=str(output_dir))
+            duration = time.perf_counter() - start
+
+        report = crawler.metrics.to_dict()
+        # 每页耗时：相邻两次截图完成的时间间隔
+        shots = [t['at'] for t in report['timings'] if t['phase'] == 'screenshot']
+        intervals = [b - a for a, b in zip(shots, shots[1:])]
+        steady = (len(shots) - 1) / (shots[-1] - shots[0]) if len(shots) > 1 and shots[-1] > shots[0] else None
+
+        return {
+            'screenshots': count,
+            'duration': round(duration, 3),
+            'pages_per_sec': round(count / duration, 4) if duration else None,
+            'steady_pages_per_sec': round(steady, 4) if steady else None,
+            'time_to_first_screenshot': shots[0] if shots else None,
+            'page_latency': {
+                'p50': round(percentile(intervals, 50), 4),
+                'p95': round(percentile(intervals, 95), 4),
+                'max': round(max(intervals), 4) if intervals else 0.0,
+            },
+            'phases': report['phases'],
+            'counters': report['counters'],
+            # 只包含本Python进程（含截图编码等线程），不含浏览器和编码子进程
+            'peak_rss': utils.get_peak_rss(),
+            # 浏览器进程树的内存峰值（定期采样，短暂的峰值可能没有采到）
+            'browser_peak_rss': sampler.peak,
+            'bytes_written': _directory_size(output_dir),
+            'output_dir': str(output_dir) if keep_output else None,
+        }
+    finally:
+        if not keep_output:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def _git_revision() -> Optional[str]:
+    """当前代码的git版本（不在git仓库中时返回None）"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=config.PROJECT_ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    汇总多次运行的结果（取中位数）
+
+    Args:
+        runs: 每次运行的统计结果
+
+    Returns:
+        Dict[str, Any]: 汇总结果
+    """
+    def median(values):
+        values = [v for v in values if v is not None]
+        return round(statistics.median(values), 4) if values else None
+
+    return {
+        'pages_per_sec': median(r['pages_per_sec'] for r in runs),
+        'steady_pages_per_sec': median(r['steady_pages_per_sec'] for r in runs),
+        'time_to_first_screenshot': median(r['time_to_first_screenshot'] for r in runs),
+        'page_latency_p50': median(r['page_latency']['p50'] for r in runs),
+        'page_latency_p95': median(r['page_latency']['p95'] for r in runs),
+        'peak_rss': max((r['peak_rss'] or 0) for r in runs) or None,
+        'browser_peak_rss': max((r.get('browser_peak_rss') or 0) for r in runs) or None,
+        'bytes_written': median(r['bytes_written'] for r in runs),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """
+    打印与之前结果的对比
+
+    Args:
+        current: 本次的基准测试结果
+        baseline: 之前保存的基准测试结果
+    """
+    print(f"\n📊 与 {baseline.get('revision') or '之前的结果'} 对比:")
+    for key, value in current['summary'].items():
+        old = baseline.get('summary', {}).get(key)
+        if value is None or not old:
+            print(f"   {key}: {value} (之前 {old})")
+            continue
+        print(f"   {key}: {value} (之前 {old}, {(value - old) / old * 100:+.1f}%)")
+
+
+def main():
+    """命令行入口"""
+    defaults = SiteProfile()
+    parser = argparse.ArgumentParser(description="离线性能基准测试（本地模拟网站）")
+    parser.add_argument("--pages", type=int, default=defaults.pages, help="截图页数")
+    parser.add_argument("--latency-ms", type=int, default=defaults.latency_ms, help="页面响应延迟（毫秒）")
+    parser.add_argument("--page-kb", type=int, default=defaults.page_kb, help="每页附加内容大小（KB）")
+    parser.add_argument("--slow-resources", type=int, default=defaults.slow_resources, help="每页缓慢图片数量")
+    parser.add_argument("--slow-ms", type=int, default=defaults.slow_ms, help="缓慢图片的响应延迟（毫秒）")
+    parser.add_argument("--no-login", action="store_true", help="跳过登录页，直接从日历第一页开始")
+    parser.add_argument("--runs", type=int, default=1, help="重复运行次数（结果取中位数）")
+    parser.add_argument("--headed", action="store_true", help="使用有界面模式（默认无头）")
+    parser.add_argument("--capture-mode", default=None, help="截图范围（viewport / element / clip / full_page）")
+    parser.add_argument("--pagination-mode", default=None, help="翻页方式（click / predict）")
+    parser.add_argument("--keep-output", action="store_true", help="保留截图目录")
+    parser.add_argument("--output", default=None, help="结果JSON路径（默认 benchmarks/benchmark_<时间>.json）")
+    parser.add_argument("--compare", default=None, help="与之前保存的结果JSON对比")
+    args = parser.parse_args()
+
+    utils.setup_logger()
+    profile = SiteProfile(pages=args.pages, latency_ms=args.latency_ms, page_kb=args.page_kb,
+                          slow_resources=args.slow_resources, slow_ms=args.slow_ms, login=not args.no_login)
+
+    runs = []
+    for i in range(1, args.runs + 1):
+        logger.info(f"基准测试第 {i}/{args.runs} 次运行...")
+        runs.append(run_benchmark(profile, headless=not args.headed, capture_mode=args.capture_mode,
+                                  pagination_mode=args.pagination_mode, keep_output=args.keep_output))
+
+    result = {
+        'revision': _git_revision(),
+        'created_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'python': sys.version.split()[0],
+        'profile': asdict(profile),
+        'options': {
+            'headless': not args.headed,
+            'capture_mode': args.capture_mode or getattr(config, 'CAPTURE_MODE', 'viewport'),
+            'pagination_mode': args.pagination_mode or getattr(config, 'PAGINATION_MODE', 'click'),
+        },
+        'summary': summarize(runs),
+        'runs': runs,
+    }
+
+    output = Path(args.output) if args.output else (
+        config.PROJECT_ROOT / "benchmarks" / f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    summary = result['summary']
+    print(f"\n✅ 基准测试完成（{args.runs} 次运行，每次 {profile.pages} 页）")
+    print(f"🚀 吞吐量: {summary['pages_per_sec']} 页/秒（稳定阶段 {summary['steady_pages_per_sec']} 页/秒）")
+    print(f"⏱️  每页耗时: p50 {summary['page_latency_p50']} 秒, p95 {summary['page_latency_p95']} 秒")
+    peak_rss, browser_rss = summary['peak_rss'], summary['browser_peak_rss']
+    print(f"💾 内存峰值: Python进程 {utils.format_file_size(peak_rss) if peak_rss else '未知'}, "
+          f"浏览器进程树 {utils.format_file_size(browser_rss) if browser_rss else '未知'}（采样）, "
+          f"写入 {utils.format_file_size(int(summary['bytes_written'] or 0))}")
+    print(f"📁 结果已保存: {output}")
+
+    if args.compare:
+        compare(result, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
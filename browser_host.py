@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+常驻浏览器宿主模块
+在固定的调试端口上保持一个已预热的浏览器，截图任务直接连接并领取标签页，
+不再每次启动和关闭浏览器：
+1. 通过 /json/version 做健康检查，浏览器退出或无响应时自动重新启动
+2. 始终保留一个基础标签页，任务关闭自己的标签页后浏览器不会随之退出
+3. 可作为常驻进程运行（python browser_host.py），定期检查并自动恢复
+
+使用方法：
+    python browser_host.py            # 启动并守护浏览器
+    python browser_host.py --status   # 查看浏览器状态
+    python browser_host.py --stop     # 关闭浏览器
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from loguru import logger
+
+import config
+import utils
+
+if TYPE_CHECKING:
+    from DrissionPage import Chromium, ChromiumOptions
+
+
+# 快速启动参数：关闭扩展、后台网络与节流、首次运行界面等与截图无关的功能
+FAST_LAUNCH_ARGUMENTS = [
+    '--disable-extensions',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-breakpad',
+    '--metrics-recording-only',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--password-store=basic',
+    '--mute-audio',
+]
+
+# 与 DrissionPage 默认参数合并后关闭的浏览器特性
+FAST_LAUNCH_DISABLED_FEATURES = "PrivacySandboxSettings4,Translate,OptimizationHints,MediaRouter"
+
+# 无头模式下额外使用的参数（服务器上没有GPU，/dev/shm 往往也很小）
+HEADLESS_ARGUMENTS = [
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+]
+
+
+def build_browser_options(headless: bool, local_port: Optional[int] = None,
+                          user_data_dir: Optional[str] = None) -> 'ChromiumOptions':
+    """
+    构建浏览器启动参数
+
+    Args:
+        headless: 是否使用无头模式
+        local_port: 浏览器调试端口（可选）
+        user_data_dir: 浏览器用户数据目录（可选）
+
+    Returns:
+        ChromiumOptions: 浏览器启动参数
+    """
+    options = utils.import_drission('ChromiumOptions')()
+    if local_port:
+        options.set_local_port(local_port)
+
+    # 用户数据目录：未指定时使用临时目录下固定的配置目录，跨运行复用（缓存保持热）
+    user_data_dir = user_data_dir or getattr(config, 'BROWSER_PROFILE_DIR', None)
+    if not user_data_dir:
+        user_data_dir = (Path(tempfile.gettempdir()) / "drission-auto-capture" /
+                         f"profile_{local_port or 9222}")
+    options.set_user_data_path(str(user_data_dir))
+
+    if headless:
+        options.headless(True)
+        for argument in HEADLESS_ARGUMENTS:
+            options.set_argument(argument)
+
+    # 固定窗口大小与缩放比例，保证截图尺寸稳定（无头模式下同样生效）
+    width, height = config.BROWSER_WINDOW_SIZE
+    options.set_argument('--window-size', f'{width},{height}')
+    scale_factor = getattr(config, 'BROWSER_DEVICE_SCALE_FACTOR', 1)
+    if scale_factor:
+        options.set_argument('--force-device-scale-factor', str(scale_factor))
+
+    if getattr(config, 'BROWSER_FAST_PROFILE', True):
+        for argument in FAST_LAUNCH_ARGUMENTS:
+            options.set_argument(argument)
+        options.set_argument('--disable-features', FAST_LAUNCH_DISABLED_FEATURES)
+
+    if getattr(config, 'BROWSER_NO_IMAGES', False):
+        options.no_imgs(True)
+
+    return options
+
+
+class BrowserHost:
+    """固定调试端口上的常驻浏览器"""
+
+    def __init__(self, port: Optional[int] = None, headless: Optional[bool] = None,
+                 user_data_dir: Optional[str] = None):
+        """
+        初始化浏览器宿主
+
+        Args:
+            port: 调试端口，默认使用 config.BROWSER_HOST_PORT
+            headless: 是否使用无头模式，默认使用 config.BROWSER_HEADLESS
+            user_data_dir: 浏览器用户数据目录（可选）
+        """
+        self.port = port or getattr(config, 'BROWSER_HOST_PORT', 9290)
+        self.address = f"127.0.0.1:{self.port}"
+        self.headless = config.BROWSER_HEADLESS if headless is None else headless
+        self.user_data_dir = user_data_dir
+        self.restarts = 0
+
+    def version(self) -> Optional[Dict[str, Any]]:
+        """
+        健康检查：读取调试端口的 /json/version
+
+        Returns:
+            Optional[Dict[str, Any]]: 浏览器版本信息，浏览器不可用时返回None
+        """
+        try:
+            with urllib.request.urlopen(f"http://{self.address}/json/version",
+                                        timeout=getattr(config, 'BROWSER_HOST_CHECK_TIMEOUT', 2)) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def is_alive(self) -> bool:
+        """浏览器是否可用"""
+        return self.version() is not None
+
+    def launch(self) -> 'Chromium':
+        """
+        在宿主端口上启动浏览器
+
+        Returns:
+            Chromium: 浏览器对象
+        """
+        logger.info(f"正在启动常驻浏览器（端口 {self.port}）...")
+        start = time.perf_counter()
+        Chromium = utils.import_drission('Chromium')
+        browser = Chromium(build_browser_options(self.headless, self.port, self.user_data_dir))
+        logger.success(f"常驻浏览器已启动，用时 {time.perf_counter() - start:.2f} 秒")
+
+        # 预热：在基础标签页中打开指定页面（DNS、连接与静态资源缓存）
+        warm_url = getattr(config, 'BROWSER_HOST_WARM_URL', None)
+        if warm_url:
+            try:
+                browser.latest_tab.get(warm_url)
+                logger.info(f"已预热: {warm_url}")
+            except Exception as e:
+                logger.warning(f"预热页面加载失败: {str(e)}")
+        return browser
+
+    def attach(self) -> 'Chromium':
+        """
+        连接到已在运行的浏览器（不会启动新浏览器）
+
+        Returns:
+            Chromium: 浏览器对象
+        """
+        ChromiumOptions = utils.import_drission('ChromiumOptions')
+        options = ChromiumOptions(read_file=False).set_address(self.address)
+        options.existing_only(True)
+        return utils.import_drission('Chromium')(options)
+
+    def ensure_running(self, autostart: bool = True) -> 'Chromium':
+        """
+        确保浏览器可用：健康检查通过时直接连接，否则启动浏览器
+
+        Args:
+            autostart: 浏览器不可用时是否自动启动
+
+        Returns:
+            Chromium: 浏览器对象
+        """
+        if self.is_alive():
+            return self.attach()
+        if not autostart:
+            raise ConnectionError(f"常驻浏览器不可用（端口 {self.port}），请先运行 python browser_host.py")
+        logger.warning(f"常驻浏览器未运行（端口 {self.port}），正在启动")
+        return self.launch()
+
+    def new_tab(self, autostart: bool = True):
+        """
+        领取一个新标签页
+
+        Args:
+            autostart: 浏览器不可用时是否自动启动
+
+        Returns:
+            新标签页对象（使用完毕后由调用方关闭）
+        """
+        return self.ensure_running(autostart).new_tab()
+
+    def stop(self) -> bool:
+        """
+        关闭常驻浏览器
+
+        Returns:
+            bool: 是否关闭了正在运行的浏览器
+        """
+        if not self.is_alive():
+            return False
+        self.attach().quit()
+        logger.info("常驻浏览器已关闭")
+        return True
+
+    def serve(self, interval: Optional[float] = None) -> None:
+        """
+        常驻运行：启动浏览器并定期做健康检查，浏览器退出时自动重新启动
+
+        Args:
+            interval: 健康检查间隔（秒），默认使用 config.BROWSER_HOST_CHECK_INTERVAL
+        """
+        interval = interval or getattr(config, 'BROWSER_HOST_CHECK_INTERVAL', 10)
+        self.ensure_running()
+        logger.success(f"浏览器宿主运行中: {self.address}（按 Ctrl+C 退出，浏览器保持运行）")
+        while True:
+            time.sleep(interval)
+            if not self.is_alive():
+                self.restarts += 1
+                logger.warning(f"健康检查失败，第 {self.restarts} 次重新启动常驻浏览器")
+                try:
+                    self.ensure_running()
+                except Exception as e:
+                    logger.error(f"重新启动常驻浏览器失败: {str(e)}")
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="常驻浏览器宿主")
+    parser.add_argument("--port", type=int, default=None, help="调试端口（默认 config.BROWSER_HOST_PORT）")
+    parser.add_argument("--headless", action="store_true", default=None, help="使用无头模式")
+    parser.add_argument("--status", action="store_true", help="查看浏览器状态")
+    parser.add_argument("--stop", action="store_true", help="关闭浏览器")
+    args = parser.parse_args()
+
+    utils.setup_logger()
+    host = BrowserHost(port=args.port, headless=args.headless)
+
+    if args.status:
+        version = host.version()
+        if version:
+            print(f"✅ 运行中: {host.address} ({version.get('Browser', '')})")
+            return 0
+        print(f"❌ 未运行: {host.address}")
+        return 1
+
+    if args.stop:
+        if not host.stop():
+            print(f"ℹ️  浏览器未运行: {host.address}")
+        return 0
+
+    try:
+        host.serve()
+    except KeyboardInterrupt:
+        logger.info("浏览器宿主已退出（浏览器保持运行，可用 --stop 关闭）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+截图范围模块
+支持四种截图范围，裁剪都在浏览器端完成（只栅格化、传输和编码需要的像素）：
+1. viewport  - 当前可视区域（默认）
+2. element   - 指定CSS选择器的元素（如 #cal）
+3. clip      - 指定的页面矩形区域 (x, y, 宽, 高)
+4. full_page - 整个页面
+"""
+
+import base64
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from loguru import logger
+
+import config
+
+CAPTURE_MODES = ("viewport", "element", "clip", "full_page")
+
+# 一次往返取回元素（或整页）在文档坐标系中的位置、可视区域大小与页面大小
+GEOMETRY_SCRIPT = """
+var doc = document.documentElement, body = document.body || doc;
+var result = {
+    scrollX: window.scrollX, scrollY: window.scrollY,
+    viewWidth: window.innerWidth, viewHeight: window.innerHeight, clientWidth: doc.clientWidth,
+    pageWidth: Math.max(doc.scrollWidth, body.scrollWidth, doc.clientWidth),
+    pageHeight: Math.max(doc.scrollHeight, body.scrollHeight, doc.clientHeight),
+    element: null
+};
+if (arguments[0]) {
+    var el = document.querySelector(arguments[0]);
+    if (el) {
+        var r = el.getBoundingClientRect();
+        result.element = { x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height };
+    }
+}
+return result;
+"""
+
+
+@dataclass
+class CaptureSpec:
+    """截图范围设置"""
+
+    mode: str = "viewport"
+    selector: str = ""
+    clip: Optional[Tuple[float, float, float, float]] = None
+    padding: int = 0
+
+    @classmethod
+    def from_config(cls, mode: Optional[str] = None) -> "CaptureSpec":
+        """
+        由配置构造截图范围设置
+
+        Args:
+            mode: 截图范围（可选），默认使用 config.CAPTURE_MODE
+
+        Returns:
+            CaptureSpec: 截图范围设置
+        """
+        mode = mode or getattr(config, 'CAPTURE_MODE', 'viewport')
+        if mode not in CAPTURE_MODES:
+            logger.warning(f"未知的截图范围 {mode}，使用 viewport")
+            mode = "viewport"
+        clip = getattr(config, 'CAPTURE_CLIP', None)
+        return cls(
+            mode=mode,
+            selector=getattr(config, 'CAPTURE_SELECTOR', f"#{config.NEXT_PAGE_SELECTOR}"),
+            clip=tuple(clip) if clip else None,
+            padding=getattr(config, 'CAPTURE_PADDING', 0),
+        )
+
+
+def capture_region(page, clip: Optional[dict] = None, beyond_viewport: bool = False) -> bytes:
+    """
+    调用 Page.captureScreenshot 截取指定区域
+
+    Args:
+        page: DrissionPage 页面或标签页对象
+        clip: 截取区域 {x, y, width, height}（文档坐标，CSS像素），不传时截取可视区域
+        beyond_viewport: 区域超出可视区域时需为True
+
+    Returns:
+        bytes: PNG图片字节
+    """
+    args = {'format': 'png'}
+    if clip:
+        args['clip'] = dict(clip, scale=1)
+        args['captureBeyondViewport'] = beyond_viewport
+    return base64.b64decode(page.run_cdp('Page.captureScreenshot', **args)['data'])
+
+
+def _outside_viewport(rect: dict, geometry: dict) -> bool:
+    """矩形是否超出当前可视区域"""
+    return (rect['x'] < geometry['scrollX'] or rect['y'] < geometry['scrollY'] or
+            rect['x'] + rect['width'] > geometry['scrollX'] + geometry['viewWidth'] or
+            rect['y'] + rect['height'] > geometry['scrollY'] + geometry['viewHeight'])
+
+
+def capture_page(page, spec: CaptureSpec) -> bytes:
+    """
+    按截图范围截取页面
+
+    Args:
+        page: DrissionPage 页面或标签页对象
+        spec: 截图范围设置
+
+    Returns:
+        bytes: PNG图片字节
+    """
+    if spec.mode == "viewport":
+        return page.get_screenshot(as_bytes='png')
+
+    geometry = page.run_js(GEOMETRY_SCRIPT, spec.selector if spec.mode == "element" else "")
+
+    if spec.mode == "full_page":
+        rect = {'x': 0, 'y': 0, 'width': geometry['pageWidth'], 'height': geometry['pageHeight']}
+        return capture_region(page, rect, beyond_viewport=True)
+
+    if spec.mode == "element":
+        element = geometry.get('element')
+        if not element or element['width'] <= 0 or element['height'] <= 0:
+            logger.warning(f"未找到可截图的元素 {spec.selector}，改为截取可视区域")
+            return capture_region(page)
+        pad = spec.padding
+        rect = {
+            'x': max(0, element['x'] - pad),
+            'y': max(0, element['y'] - pad),
+            'width': element['width'] + 2 * pad,
+            'height': element['height'] + 2 * pad,
+        }
+    else:
+        if not spec.clip:
+            logger.warning("未设置 CAPTURE_CLIP，改为截取可视区域")
+            return capture_region(page)
+        x, y, width, height = spec.clip
+        rect = {'x': x, 'y': y, 'width': width, 'height': height}
+
+    # 裁剪区域不能超出页面
+    rect['width'] = max(1, min(rect['width'], geometry['pageWidth'] - rect['x']))
+    rect['height'] = max(1, min(rect['height'], geometry['pageHeight'] - rect['y']))
+    return capture_region(page, rect, beyond_viewport=_outside_viewport(rect, geometry))
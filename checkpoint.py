@@ -0,0 +1,161 @@
+"""
+截图任务断点续传模块
+每截完一页就把任务进度原子地写入截图目录下的检查点文件：
+任务信息、最后完成的页码、该页的URL与标题、已写入的截图文件。
+浏览器崩溃或机器重启后，以 resume=True 重新运行即可从下一页继续，文件编号也会接着往下排。
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+CHECKPOINT_FILENAME = ".checkpoint.json"
+
+
+@dataclass
+class CheckpointState:
+    """检查点内容：任务信息与每个已完成页面的记录"""
+
+    url: str
+    max_pages: int
+    # 每页一条记录：page（页码）、url、title、file（截图文件，近似重复时为原截图）
+    pages: List[Dict[str, Any]] = field(default_factory=list)
+    completed: bool = False
+    updated_at: float = 0.0
+
+    @property
+    def last_page(self) -> int:
+        """最后完成的页码"""
+        return self.pages[-1]['page'] if self.pages else 0
+
+    @property
+    def page_url(self) -> str:
+        """最后完成页面的URL"""
+        return self.pages[-1]['url'] if self.pages else ""
+
+    @property
+    def url_addressable(self) -> bool:
+        """翻页后页面URL是否会变化（变化时可直接访问 page_url 定位，否则需重放翻页点击）"""
+        return len({p['url'] for p in self.pages}) > 1
+
+    @property
+    def files(self) -> List[str]:
+        """已写入的截图文件（按页码顺序，去重）"""
+        files: List[str] = []
+        for p in self.pages:
+            if p.get('file') and p['file'] not in files:
+                files.append(p['file'])
+        return files
+
+
+class RunCheckpoint:
+    """截图任务检查点文件"""
+
+    def __init__(self, directory: Path):
+        """
+        初始化检查点
+
+        Args:
+            directory: 截图保存目录（检查点文件保存在该目录下）
+        """
+        self.path = Path(directory) / CHECKPOINT_FILENAME
+        self.state: Optional[CheckpointState] = None
+
+    def load(self, url: str) -> Optional[CheckpointState]:
+        """
+        读取可续传的检查点
+
+        Args:
+            url: 当前任务的目标URL（与检查点中的任务不同时不续传）
+
+        Returns:
+            Optional[CheckpointState]: 未完成的检查点，不存在、已完成或不属于该任务时返回None
+        """
+        if not self.path.exists():
+            return None
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            state = CheckpointState(**{k: data[k] for k in ('url', 'max_pages', 'pages', 'completed')})
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"读取检查点失败，将从第一页开始: {str(e)}")
+            return None
+
+        if state.url != url:
+            logger.info("检查点属于其他任务，将从第一页开始")
+            return None
+        if state.completed:
+            logger.info("上次任务已完成，将从第一页开始新的任务")
+            return None
+
+        # 截图在后台写入，崩溃时最后几页可能已记录但未落盘：回退到第一张缺失截图之前
+        for i, page in enumerate(state.pages):
+            file = Path(page['file']) if page.get('file') else None
+            if file is None or not file.exists() or file.stat().st_size == 0:
+                logger.warning(f"第 {page['page']} 页的截图未写入完成，将从该页重新截图")
+                state.pages = state.pages[:i]
+                break
+        self.state = state
+        return state
+
+    def start(self, url: str, max_pages: int) -> CheckpointState:
+        """开始新的任务记录（不立即写盘）"""
+        self.state = CheckpointState(url=url, max_pages=max_pages)
+        return self.state
+
+    def record_page(self, page_num: int, page_url: str, page_title: str, file: str) -> None:
+        """
+        记录一页已完成并立即保存
+
+        Args:
+            page_num: 已完成的页码
+            page_url: 该页的URL
+            page_title: 该页的标题
+            file: 该页的截图文件（近似重复时为原截图）
+        """
+        self.state.pages.append({'page': page_num, 'url': page_url, 'title': page_title, 'file': file})
+        self.save()
+
+    def replace_files(self, replacements: Dict[str, str]) -> None:
+        """
+        把已记录页面的截图文件替换为其他文件并保存（近似重复的截图没有写盘，改为引用原截图）
+
+        Args:
+            replacements: {原记录的文件: 替换后的文件}
+        """
+        if self.state is None or not replacements:
+            return
+        changed = False
+        for page in self.state.pages:
+            if page.get('file') in replacements:
+                page['file'] = replacements[page['file']]
+                changed = True
+        if changed:
+            self.save()
+
+    def mark_completed(self) -> None:
+        """标记任务已完成"""
+        if self.state is None:
+            return
+        self.state.completed = True
+        self.save()
+
+    def save(self) -> None:
+        """原子地写入检查点文件（先写临时文件并刷盘，再替换）"""
+        if self.state is None:
+            return
+        self.state.updated_at = time.time()
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(asdict(self.state), last_page=self.state.last_page),
+                          f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"保存检查点失败: {str(e)}")
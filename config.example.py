@@ -16,23 +16,92 @@ PROJECT_ROOT = Path(__file__).parent
 
 # 截图保存配置
 SCREENSHOT_DIR = PROJECT_ROOT / "screenshots"
-SCREENSHOT_FORMAT = "PNG"  # 截图格式：PNG, JPEG
-SCREENSHOT_QUALITY = 95    # JPEG质量（1-100）
+SCREENSHOT_FORMAT = "PNG"  # 截图格式：PNG, JPEG, WEBP
+SCREENSHOT_QUALITY = 95    # JPEG/WebP质量（1-100）
+CAPTURE_MODE = "viewport"  # 截图范围：viewport 可视区域; element 指定元素; clip 指定区域; full_page 整个页面
+CAPTURE_SELECTOR = "#cal"  # element 模式下截取的元素（CSS选择器）
+CAPTURE_PADDING = 0        # element 模式下元素四周额外保留的像素
+CAPTURE_CLIP = None        # clip 模式下的区域 (x, y, 宽, 高)，以页面左上角为原点
+FULL_PAGE_TILED = True     # full_page 模式下是否逐屏分块截取（超长页面不会生成超大位图）
+FULL_PAGE_TILE_HEIGHT = 1000  # 分块高度（CSS像素，不超过可视区域高度）
+FULL_PAGE_SCROLL_DELAY = 0.1  # 每次滚动后等待渲染的秒数
+FULL_PAGE_OUTPUT = "stitched"  # stitched: 流式拼接为一张PNG; tiles: 保存分块图片集和 index.json
+SCREENSHOT_COMPRESS_LEVEL = None  # PNG压缩级别（0-9）/ WebP压缩方法（0-6），None 表示PNG直接保存浏览器输出
+SCREENSHOT_ENCODER_PROCESSES = None  # 编码进程数量，None 表示使用CPU核心数
+SCREENSHOT_WRITER_THREADS = 2  # 后台写入截图的线程数量
+SCREENSHOT_QUEUE_SIZE = 8      # 待写入截图队列长度，队列满时截图会等待写入（背压）
+
+# 重复截图检测（感知哈希）
+DUPLICATE_DETECTION = False    # 是否检测近似重复的截图（重复的截图只记录引用，不再保存）；只有少量文字不同的页面可能被误判，默认关闭
+DUPLICATE_HASH_SIZE = 32       # 感知哈希边长（哈希位数为其平方），越大越能区分版式相近的页面
+DUPLICATE_HASH_THRESHOLD = 4   # 判定为近似重复的最大哈希距离（0-哈希位数，越小越严格）
+DUPLICATE_MAX_CONSECUTIVE = 3  # 连续多少次截图完全相同后结束任务（翻页未生效，不受 DUPLICATE_DETECTION 影响），0 表示不结束
 
 # 浏览器配置
 BROWSER_HEADLESS = False   # 是否无头模式
 BROWSER_WINDOW_SIZE = (1920, 1080)  # 浏览器窗口大小
-BROWSER_WAIT_TIME = 3      # 页面加载等待时间（秒）
+BROWSER_WAIT_TIME = 3      # 页面加载等待时间（秒），仅在 READY_STRATEGY = "fixed" 时使用
+BROWSER_DEVICE_SCALE_FACTOR = 1  # 设备缩放比例，固定后截图尺寸不随系统缩放变化（None 表示不设置）
+BROWSER_FAST_PROFILE = True  # 是否使用快速启动参数（关闭扩展、后台节流、首次运行界面等）
+BROWSER_NO_IMAGES = False  # 是否禁止加载图片（只关心文字内容时可加快渲染）
+BROWSER_PROFILE_DIR = None  # 浏览器用户数据目录，None 表示使用系统临时目录下固定的目录（跨运行复用）
+
+# 请求拦截配置（截图时屏蔽统计、广告、在线客服等与截图无关的请求，加快页面加载）
+REQUEST_BLOCKING = True         # 是否启用请求拦截
+REQUEST_BLOCK_PROFILE = "safe"  # safe: 只屏蔽统计/广告/客服/媒体; aggressive: 额外屏蔽字体和图片（截图外观会变化）
+REQUEST_BLOCK_PATTERNS = []     # 额外屏蔽的URL通配符，例如 ["*://*.example-cdn.com/video/*"]
+REQUEST_ALLOW_PATTERNS = []     # 始终放行的URL通配符（优先于屏蔽规则）
+REQUEST_BLOCK_TYPES = None      # 屏蔽的资源类型（如 ["Media", "Font"]），None 表示使用预设方案
+
+# 常驻浏览器宿主配置（python browser_host.py 启动后，截图任务直接连接并领取标签页）
+BROWSER_HOST_ENABLED = False    # 是否连接常驻浏览器，而不是每次启动新浏览器
+BROWSER_HOST_PORT = 9290        # 常驻浏览器的调试端口（不要落在 WORKER_BASE_PORT 起的工作进程端口范围内）
+BROWSER_HOST_AUTOSTART = True   # 常驻浏览器不可用时是否自动（重新）启动
+BROWSER_HOST_CHECK_INTERVAL = 10  # 宿主进程健康检查间隔（秒）
+BROWSER_HOST_CHECK_TIMEOUT = 2  # 单次健康检查（/json/version）超时（秒）
+BROWSER_HOST_WARM_URL = None    # 启动后在基础标签页中预先打开的页面（可选）
+
+# 页面就绪等待配置
+READY_STRATEGY = "event"   # event: 根据加载状态/网络空闲/内容变化判断就绪; fixed: 固定等待BROWSER_WAIT_TIME
+READY_TIMEOUT = 15         # 单次就绪等待的硬超时（秒）
+NETWORK_IDLE_MS = 500      # 无网络活动持续多少毫秒视为网络空闲
+READY_POLL_INTERVAL = 0.1  # 就绪状态轮询间隔（秒）
 
 # 爬虫配置
 MAX_RETRY_TIMES = 3        # 最大重试次数
-RETRY_DELAY = 2           # 重试延迟（秒）
+RETRY_DELAY = 2           # 第一次重试前的等待（秒），之后按 RETRY_BACKOFF 倍数增长
+RETRY_BACKOFF = 2         # 退避倍数
+RETRY_MAX_DELAY = 30      # 单次等待上限（秒）
+RETRY_JITTER = 0.2        # 随机抖动比例（0-1）
+RETRY_BUDGET = 10         # 每次任务最多重试的总次数
+# 按异常类名覆盖处理方式：retry 直接重试 / reload 重新加载页面 / reconnect 重新连接浏览器 / fail 立即失败
+# 默认：浏览器断开 reconnect，超时与加载失败 reload，404 与无效URL fail，其余 retry
+RETRY_STRATEGIES = {}
+MAX_BROWSER_RESTARTS = 3  # 截图过程中浏览器断开后最多重启几次（重启后从检查点位置继续）
 MAX_PAGES = 50            # 最大翻页数量
+TAB_POOL_SIZE = 4         # 批量截图时同一浏览器内同时打开的最大标签页数量
+
+# 多进程任务池配置（每个工作进程使用独立浏览器）
+WORKER_COUNT = None        # 工作进程数量，None 表示使用CPU核心数
+WORKER_BASE_PORT = 9300    # 工作进程浏览器调试端口起始值（第N个进程使用 起始值+N，已被占用的端口会跳过）
+WORKER_JOB_TIMEOUT = 600   # 单个任务最长执行时间（秒），超时将结束进程并重新入队
+WORKER_MAX_ATTEMPTS = 2    # 单个任务最大尝试次数
+
+# 批量任务运行器配置（python batch_runner.py jobs.json）
+BATCH_MODE = "tabs"        # tabs: 同一浏览器多标签页（共享登录）; workers: 多进程，每个进程独立浏览器（不同账号时使用）
+BATCH_REPORT_DIR = PROJECT_ROOT / "reports"  # 批量任务汇总报告保存目录
+
+# 定时调度器配置（python scheduler.py schedule.json，多次运行之间复用常驻浏览器）
+SCHEDULER_JITTER = 30          # 每次触发随机延后的最大秒数（任务文件中可用 jitter 单独设置）
+SCHEDULER_MAX_PARALLEL = 2     # 同时运行的最大任务数（共用一个浏览器，各占一个标签页）
+SCHEDULER_STATUS_FILE = PROJECT_ROOT / "scheduler_status.json"  # 各任务下次运行时间与上次运行结果
 
 # ⚠️ 请修改以下配置为您的实际信息
 # 目标网页配置
 TARGET_URL = "https://example.com/your-target-page"  # ⚠️ 请修改为您的目标网页URL
 NEXT_PAGE_SELECTOR = "cal"  # 下一页元素的ID，程序会点击该元素下的第一个A标签
+PAGINATION_MODE = "click"   # click: 逐页点击翻页; predict: 推算后续页面URL并在后台标签页预取，推算不出时自动改为点击
+PREFETCH_PAGES = 2          # predict 模式下最多提前加载的页数
 
 # A标签点击配置
 CLICK_FIRST_A_AFTER_LOGIN = False  # 是否在登录后自动点击第一个A标签
@@ -40,9 +109,16 @@ CLICK_FIRST_A_AFTER_LOGIN = False  # 是否在登录后自动点击第一个A标
 # 登录配置
 LOGIN_USERNAME = "your_username"  # ⚠️ 请修改为您的登录用户名
 LOGIN_WAIT_TIME = 20              # 等待用户输入密码的时间（秒）
+LOGIN_INTERACTIVE = True          # 需要登录时是否等待手动输入密码；False 时没有可用登录会话的任务直接失败（批量、定时任务始终不等待）
 USERNAME_INPUT_ID = "username"    # 用户名输入框的ID
 LOGIN_BUTTON_WAIT = 10            # 等待登录处理的最大时间（秒）
 
+# 登录会话持久化（需要安装 cryptography）
+SESSION_STORE_ENABLED = True                     # 是否保存并复用登录会话（Cookie + localStorage）
+SESSION_STORE_DIR = PROJECT_ROOT / "sessions"    # 加密会话文件保存目录
+SESSION_KEY_FILE = PROJECT_ROOT / ".session.key" # 加密密钥文件（也可通过环境变量 SESSION_STORE_KEY 提供）
+SESSION_MAX_AGE_HOURS = 12                       # 会话最长复用时间（小时）
+
 # 智能登录检测说明：
 # 1. 优先检测考勤页面关键词 -> 直接开始截图
 # 2. 检测到登录关键词但找不到用户名输入框 -> 认为已登录，开始截图  
@@ -51,12 +127,16 @@ LOGIN_BUTTON_WAIT = 10            # 等待登录处理的最大时间（秒）
 # 日志配置
 LOG_LEVEL = "INFO"         # 日志级别：DEBUG, INFO, WARNING, ERROR
 LOG_FILE = PROJECT_ROOT / "logs" / "crawler.log"
+LOG_JSON_FILE = None       # JSON Lines 日志文件（可选，每行附带 run/job/page 字段），例如 PROJECT_ROOT / "logs" / "crawler.jsonl"
+LOG_ENQUEUE = True         # 日志经队列由后台线程写入，截图线程不因日志IO阻塞
 
-# 确保必要目录存在
+# 运行指标配置
+METRICS_ENABLED = True                   # 是否记录各阶段耗时并在任务结束时导出
+METRICS_DIR = PROJECT_ROOT / "metrics"   # JSON运行报告与Prometheus文本文件（capture_<任务名>.prom）的保存目录
+METRICS_KEEP_REPORTS = 20               # 每个任务保留最近多少份JSON运行报告（较早的自动删除），0 表示全部保留
+
+# 确保必要目录存在（由 utils.init_process() 在每个进程首次运行任务时调用，导入配置时不写文件系统）
 def ensure_directories():
     """确保必要的目录存在"""
     SCREENSHOT_DIR.mkdir(exist_ok=True)
     LOG_FILE.parent.mkdir(exist_ok=True)
-
-# 初始化配置
-ensure_directories() 
\ No newline at end of file
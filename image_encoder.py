@@ -0,0 +1,191 @@
+"""
+截图编码模块
+按 SCREENSHOT_FORMAT / SCREENSHOT_QUALITY / SCREENSHOT_COMPRESS_LEVEL 把浏览器返回的PNG重新编码为
+PNG、JPEG 或 WebP。编码在进程池中用 Pillow 完成，批量截图时不会全部挤在一个CPU核心上。
+"""
+
+import atexit
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from loguru import logger
+
+import config
+import utils
+
+# 支持的格式 -> 文件扩展名
+FORMAT_EXTENSIONS = {
+    "PNG": "png",
+    "JPEG": "jpg",
+    "WEBP": "webp",
+}
+
+_FORMAT_ALIASES = {
+    "JPG": "JPEG",
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def normalize_format(fmt: str) -> str:
+    """
+    规范化图片格式名称
+
+    Args:
+        fmt: 格式名称（不区分大小写，JPG 视为 JPEG）
+
+    Returns:
+        str: PNG、JPEG 或 WEBP
+    """
+    name = str(fmt).strip().upper()
+    name = _FORMAT_ALIASES.get(name, name)
+    if name not in FORMAT_EXTENSIONS:
+        raise ValueError(f"不支持的截图格式: {fmt}（可选: PNG, JPEG, WEBP）")
+    return name
+
+
+def encode_image(data: bytes, fmt: str, quality: int, compress_level: Optional[int]) -> bytes:
+    """
+    把PNG字节重新编码为指定格式（在编码进程中执行）
+
+    Args:
+        data: 浏览器返回的PNG字节
+        fmt: 目标格式（PNG / JPEG / WEBP）
+        quality: JPEG/WebP 质量（1-100）
+        compress_level: PNG 压缩级别（0-9）或 WebP 压缩方法（0-6），None 表示使用默认值
+
+    Returns:
+        bytes: 编码后的图片字节
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        output = io.BytesIO()
+        if fmt == "JPEG":
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(output, "JPEG", quality=quality, optimize=True)
+        elif fmt == "WEBP":
+            options = {"quality": quality}
+            if compress_level is not None:
+                options["method"] = max(0, min(6, compress_level))
+            image.save(output, "WEBP", **options)
+        else:
+            options = {"optimize": compress_level is None}
+            if compress_level is not None:
+                options["compress_level"] = max(0, min(9, compress_level))
+            image.save(output, "PNG", **options)
+        return output.getvalue()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """获取本进程共享的编码进程池（首次使用时创建）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 使用 spawn，避免在持有浏览器连接线程的进程中 fork
+            _pool = ProcessPoolExecutor(max_workers=encoder_processes(),
+                                        mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def encoder_processes() -> int:
+    """编码进程池的进程数量"""
+    return getattr(config, 'SCREENSHOT_ENCODER_PROCESSES', None) or os.cpu_count() or 1
+
+
+class ImageEncoder:
+    """截图输出格式层：负责格式选择、进程池编码和节省字节统计"""
+
+    def __init__(self, fmt: Optional[str] = None, quality: Optional[int] = None,
+                 compress_level: Optional[int] = None):
+        """
+        初始化编码器
+
+        Args:
+            fmt: 输出格式，默认使用 config.SCREENSHOT_FORMAT
+            quality: JPEG/WebP 质量，默认使用 config.SCREENSHOT_QUALITY
+            compress_level: PNG 压缩级别 / WebP 压缩方法，默认使用 config.SCREENSHOT_COMPRESS_LEVEL
+        """
+        self.format = normalize_format(fmt or getattr(config, 'SCREENSHOT_FORMAT', "PNG"))
+        self.quality = quality or getattr(config, 'SCREENSHOT_QUALITY', 95)
+        self.compress_level = (compress_level if compress_level is not None
+                               else getattr(config, 'SCREENSHOT_COMPRESS_LEVEL', None))
+
+        if not self.passthrough:
+            try:
+                import PIL  # noqa: F401
+            except ImportError:
+                logger.error("请先安装Pillow: pip install Pillow，本次截图将保存为PNG")
+                self.format, self.compress_level = "PNG", None
+
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def passthrough(self) -> bool:
+        """PNG 且未指定压缩级别时直接保存浏览器返回的字节，无需重新编码"""
+        return self.format == "PNG" and self.compress_level is None
+
+    @property
+    def extension(self) -> str:
+        """输出文件扩展名"""
+        return FORMAT_EXTENSIONS[self.format]
+
+    def encode(self, data: bytes) -> bytes:
+        """
+        编码一张截图（阻塞直到进程池完成编码；在守护进程中改为在当前线程编码）
+
+        Args:
+            data: 浏览器返回的PNG字节
+
+        Returns:
+            bytes: 目标格式的图片字节
+        """
+        if self.passthrough:
+            encoded = data
+        elif multiprocessing.current_process().daemon:
+            # 守护进程（如多进程任务池的工作进程）不能再创建子进程，直接在当前线程中编码
+            encoded = encode_image(data, self.format, self.quality, self.compress_level)
+        else:
+            encoded = _get_pool().submit(encode_image, data, self.format,
+                                         self.quality, self.compress_level).result()
+        with self._stats_lock:
+            self._stats["images"] += 1
+            self._stats["raw_bytes"] += len(data)
+            self._stats["encoded_bytes"] += len(encoded)
+        return encoded
+
+    def reset_stats(self) -> None:
+        """清空本次运行的统计"""
+        with self._stats_lock:
+            self._stats = {"images": 0, "raw_bytes": 0, "encoded_bytes": 0}
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取本次运行的编码统计
+
+        Returns:
+            Dict[str, int]: 图片数量、原始PNG字节数、编码后字节数与节省的字节数
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["bytes_saved"] = stats["raw_bytes"] - stats["encoded_bytes"]
+        return stats
+
+    def log_stats(self) -> None:
+        """输出本次运行节省的字节数"""
+        stats = self.stats()
+        if not stats["images"]:
+            return
+        ratio = stats["bytes_saved"] / stats["raw_bytes"] * 100 if stats["raw_bytes"] else 0.0
+        logger.info(f"截图编码统计 ({self.format}): {stats['images']} 张, "
+                    f"原始 {utils.format_file_size(stats['raw_bytes'])} → "
+                    f"{utils.format_file_size(stats['encoded_bytes'])}, "
+                    f"节省 {utils.format_file_size(max(stats['bytes_saved'], 0))} ({ratio:.1f}%)")
@@ -0,0 +1,227 @@
+"""
+截图去重模块
+1. 截图线程比较截图字节的摘要（始终启用）：连续多次与上一张截图完全相同，说明翻页没有生效，应当结束本次任务
+   （近似重复不会结束任务，避免只有少量文字不同的页面，如日历的不同月份，被误判为翻页失效）
+2. 开启 DUPLICATE_DETECTION 时，写入线程对每张截图计算感知哈希（dHash，基于缩小后的灰度图），
+   与已保存的截图近似重复时不再写盘，只记录为对原文件的引用
+3. 整页分块截图对每个分块分别计算哈希，所有分块都近似相同才判为重复
+"""
+
+import hashlib
+import io
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+import config
+
+
+def dhash(data: bytes, hash_size: int = 32) -> int:
+    """
+    计算图片的差值哈希（dHash）
+
+    Args:
+        data: 图片字节
+        hash_size: 哈希边长，结果为 hash_size * hash_size 位
+
+    Returns:
+        int: 哈希值
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        # reducing_gap 让 Pillow 先整数倍快速缩小再精确缩放，大图也只需几毫秒
+        small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR, reducing_gap=2.0)
+        pixels = small.tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """两个哈希值之间不同的位数"""
+    return bin(a ^ b).count("1")
+
+
+class TileSignature:
+    """整页分块截图的签名：分块流过时累计所有分块字节的摘要，并逐个计算感知哈希"""
+
+    def __init__(self, hash_size: int, enabled: bool = True):
+        """
+        初始化签名
+
+        Args:
+            hash_size: 感知哈希边长
+            enabled: 是否计算感知哈希（关闭近似重复检测时只计算摘要）
+        """
+        self.hash_size = hash_size
+        self.enabled = enabled
+        self.hashes: List[int] = []
+        self._digest = hashlib.blake2b(digest_size=16)
+
+    def wrap(self, tiles: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        包装分块迭代器，分块原样输出，同时记录每个分块的哈希
+
+        Args:
+            tiles: 分块PNG字节迭代器
+
+        Yields:
+            bytes: 分块PNG字节
+        """
+        for data in tiles:
+            self._digest.update(data)
+            if self.enabled:
+                self.hashes.append(dhash(data, self.hash_size))
+            yield data
+
+    @property
+    def digest(self) -> bytes:
+        """所有分块字节的摘要"""
+        return self._digest.digest()
+
+
+class DuplicateDetector:
+    """重复截图检测器（每次截图任务使用一个实例，check 可在多个写入线程中同时调用）"""
+
+    def __init__(self, threshold: Optional[int] = None, max_consecutive: Optional[int] = None,
+                 hash_size: Optional[int] = None):
+        """
+        初始化检测器
+
+        Args:
+            threshold: 判定为近似重复的最大汉明距离
+            max_consecutive: 连续多少次截图完全相同后结束任务（0 表示不结束）
+            hash_size: 感知哈希边长，结果为 hash_size * hash_size 位
+        """
+        self.threshold = threshold if threshold is not None else getattr(config, 'DUPLICATE_HASH_THRESHOLD', 4)
+        self.max_consecutive = (max_consecutive if max_consecutive is not None
+                                else getattr(config, 'DUPLICATE_MAX_CONSECUTIVE', 3))
+        self.hash_size = hash_size or getattr(config, 'DUPLICATE_HASH_SIZE', 32)
+        # 近似重复检测（感知哈希）；完全相同截图的连续计数不受此开关影响
+        self.enabled = getattr(config, 'DUPLICATE_DETECTION', False)
+        if self.enabled:
+            try:
+                import PIL  # noqa: F401
+            except ImportError:
+                logger.warning("未安装Pillow，已关闭近似重复截图检测")
+                self.enabled = False
+
+        self.consecutive = 0
+        self.duplicates: List[Dict[str, Any]] = []
+        # (各分块的哈希, 文件路径)，普通截图只有一个哈希
+        self._hashes: List[Tuple[Tuple[int, ...], str]] = []
+        self._last_digest: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    @property
+    def should_stop(self) -> bool:
+        """连续完全相同的截图次数是否已达到上限"""
+        return bool(self.max_consecutive) and self.consecutive >= self.max_consecutive
+
+    def observe(self, data: bytes) -> None:
+        """
+        记录一次截图，与上一张截图字节完全相同时累加连续相同次数（在截图线程中调用，只计算摘要）
+
+        Args:
+            data: 截图字节
+        """
+        self._observe_digest(hashlib.blake2b(data, digest_size=16).digest())
+
+    def tile_signature(self) -> TileSignature:
+        """
+        创建整页分块截图的签名，用 signature.wrap(tiles) 包装分块迭代器，写完后调用 check_tiles
+
+        Returns:
+            TileSignature: 分块签名
+        """
+        return TileSignature(self.hash_size, self.enabled)
+
+    def check(self, data: bytes, path: str, page_num: Optional[int] = None) -> Optional[str]:
+        """
+        检查截图是否与已保存的截图近似重复，不重复时记录为新的已保存截图（在写入线程中调用）
+
+        Args:
+            data: 截图字节
+            path: 截图将要保存的文件路径
+            page_num: 页码（用于记录）
+
+        Returns:
+            Optional[str]: 近似重复时返回原截图路径（不应再保存），否则返回None
+        """
+        if not self.enabled:
+            return None
+        # 解码和缩放在锁外进行，多个写入线程可以同时计算哈希
+        return self._match((dhash(data, self.hash_size),), path, page_num)
+
+    def check_tiles(self, signature: TileSignature, path: str, page_num: Optional[int] = None) -> Optional[str]:
+        """
+        用整页分块截图的签名记录一次截图（累加连续相同次数），并检查是否与已保存的截图近似重复
+
+        Args:
+            signature: 已遍历完所有分块的签名
+            path: 截图文件路径
+            page_num: 页码（用于记录）
+
+        Returns:
+            Optional[str]: 所有分块都与已保存的截图近似相同时返回原截图路径，否则返回None
+        """
+        self._observe_digest(signature.digest)
+        if not self.enabled or not signature.hashes:
+            return None
+        return self._match(tuple(signature.hashes), path, page_num)
+
+    def _observe_digest(self, digest: bytes) -> None:
+        self.consecutive = self.consecutive + 1 if digest == self._last_digest else 0
+        self._last_digest = digest
+
+    def _match(self, values: Tuple[int, ...], path: str, page_num: Optional[int]) -> Optional[str]:
+        """与已保存的截图比较（分块数量相同且每个分块的距离都不超过阈值才算近似重复）"""
+        with self._lock:
+            best: Optional[Tuple[int, str]] = None
+            for known, known_path in self._hashes:
+                if len(known) != len(values):
+                    continue
+                distance = max(hamming_distance(a, b) for a, b in zip(values, known))
+                if distance <= self.threshold and (best is None or distance < best[0]):
+                    best = (distance, known_path)
+
+            if best is None:
+                self._hashes.append((values, path))
+                return None
+
+            self.duplicates.append({
+                'page': page_num,
+                'file': path,
+                'duplicate_of': best[1],
+                'distance': best[0],
+            })
+        logger.bind(page=page_num).warning(f"第 {page_num} 页与 {Path(best[1]).name} 近似重复 (距离 {best[0]})，不再保存")
+        return best[1]
+
+    def write_manifest(self, screenshot_dir: Path) -> None:
+        """
+        把本次任务的重复截图引用追加到截图目录下的 duplicates.jsonl
+
+        Args:
+            screenshot_dir: 截图保存目录
+        """
+        if not self.duplicates:
+            return
+        run_time = time.strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with open(Path(screenshot_dir) / "duplicates.jsonl", "a", encoding="utf-8") as f:
+                for record in self.duplicates:
+                    # 被跳过的文件没有写盘，引用记录中只保留原截图
+                    entry = {key: value for key, value in record.items() if key != 'file'}
+                    f.write(json.dumps(dict(entry, run=run_time), ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"写入重复截图记录失败: {str(e)}")
@@ -0,0 +1,49 @@
+"""
+截图任务定义模块
+批量截图（多标签页、多进程等）共用的任务与结果数据结构
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import config
+
+
+@dataclass
+class CaptureJob:
+    """单个截图任务"""
+
+    url: str
+    max_pages: int = 10
+    screenshot_dir: Optional[str] = None
+    name: Optional[str] = None
+    resume: bool = False
+    account: Optional[str] = None
+    capture_mode: Optional[str] = None
+
+    def output_dir(self, index: int) -> Path:
+        """
+        获取任务的截图输出目录
+
+        Args:
+            index: 任务在批次中的序号（从1开始），未指定名称和目录时用于生成子目录名
+
+        Returns:
+            Path: 输出目录
+        """
+        if self.screenshot_dir:
+            return Path(self.screenshot_dir)
+        return Path(config.SCREENSHOT_DIR) / (self.name or f"job_{index}")
+
+
+@dataclass
+class JobResult:
+    """单个截图任务的执行结果"""
+
+    job: CaptureJob
+    success: bool
+    screenshot_count: int = 0
+    files: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    duration: float = 0.0
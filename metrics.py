@@ -0,0 +1,270 @@
+"""
+运行指标模块
+记录每次截图任务各阶段的耗时（按页码和URL标记），任务结束后导出：
+1. JSON 运行报告：每条耗时记录、各阶段统计（次数、总计、p50、p95、最大值）和计数器（每个任务只保留最近若干份）
+2. Prometheus 文本格式文件：可由 node_exporter 的 textfile collector 采集
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+import config
+
+# 截图任务的各个阶段
+PHASES = (
+    "browser_launch",     # 启动浏览器或领取标签页
+    "navigation",         # 访问目标网页
+    "login_detection",    # 登录状态探测
+    "login_wait",         # 交互式登录（输入用户名、等待密码、点击登录）
+    "readiness_wait",     # 页面就绪等待
+    "screenshot",         # 浏览器截图并取回图片
+    "encode_write",       # 编码并写入磁盘（后台线程）
+    "pagination_click",   # 点击翻页或切换到预取的页面
+    "retry",              # 失败后的退避等待与恢复（重新连接等）
+    "browser_restart",    # 浏览器断开后重启、恢复登录并回到断开前位置（中断时长）
+)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    计算百分位数（最近秩法）
+
+    Args:
+        values: 数值列表
+        pct: 百分位（0-100）
+
+    Returns:
+        float: 百分位数，列表为空时返回0
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+class RunMetrics:
+    """单次截图任务的阶段耗时与计数器（线程安全）"""
+
+    def __init__(self, url: str = "", job: Optional[str] = None):
+        """
+        初始化运行指标
+
+        Args:
+            url: 任务的目标URL
+            job: 任务名称（用于Prometheus标签和报告文件名）
+        """
+        self.run_id = uuid.uuid4().hex[:12]
+        self.url = url
+        self.job = job or "default"
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.timings: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        self.info: Dict[str, Any] = {}
+        self._page_urls: Dict[int, str] = {}
+        self._current_page: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def set_page(self, page_num: Optional[int], url: Optional[str] = None) -> None:
+        """
+        设置当前页码和URL，之后未指定页码的记录都标记为该页
+
+        Args:
+            page_num: 当前页码
+            url: 当前页面URL
+        """
+        with self._lock:
+            self._current_page = page_num
+            if page_num is not None and url:
+                self._page_urls[page_num] = url
+
+    def record(self, phase: str, duration: float, page: Optional[int] = None,
+               url: Optional[str] = None, **extra) -> None:
+        """
+        记录一次阶段耗时
+
+        Args:
+            phase: 阶段名称（见 PHASES）
+            duration: 耗时（秒）
+            page: 页码，默认使用当前页码
+            url: 页面URL，默认使用该页码对应的URL
+            **extra: 附加信息（如就绪等待的用途）
+        """
+        with self._lock:
+            if page is None:
+                page = self._current_page
+            if url is None:
+                url = self._page_urls.get(page, self.url)
+            self.timings.append(dict(phase=phase, duration=round(duration, 6), page=page, url=url,
+                                     at=round(time.time() - self.started_at, 3), **extra))
+
+    @contextmanager
+    def phase(self, name: str, page: Optional[int] = None, **extra) -> Iterator[None]:
+        """计时上下文：记录代码块的耗时（出错时也会记录）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, page=page, **extra)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """累加计数器"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        按阶段汇总耗时
+
+        Returns:
+            Dict[str, Dict[str, float]]: 每个阶段的次数、总计、p50、p95、最大值（秒）
+        """
+        with self._lock:
+            timings = list(self.timings)
+        result = {}
+        for phase in list(PHASES) + sorted({t['phase'] for t in timings} - set(PHASES)):
+            values = [t['duration'] for t in timings if t['phase'] == phase]
+            if not values:
+                continue
+            result[phase] = {
+                'count': len(values),
+                'total': round(sum(values), 6),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'max': max(values),
+            }
+        return result
+
+    def finish(self) -> None:
+        """标记任务结束"""
+        self.finished_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """生成JSON运行报告"""
+        finished_at = self.finished_at or time.time()
+        with self._lock:
+            timings = list(self.timings)
+            counters = dict(self.counters)
+        return {
+            'run_id': self.run_id,
+            'job': self.job,
+            'url': self.url,
+            'started_at': self.started_at,
+            'finished_at': finished_at,
+            'duration': round(finished_at - self.started_at, 3),
+            'info': self.info,
+            'counters': counters,
+            'phases': self.summary(),
+            'timings': timings,
+        }
+
+    def to_prometheus(self) -> str:
+        """生成 Prometheus 文本格式的指标"""
+        job = self.job.replace('\\', '\\\\').replace('"', '\\"')
+        lines = [
+            "# HELP capture_phase_duration_seconds Duration of screenshot capture phases.",
+            "# TYPE capture_phase_duration_seconds summary",
+        ]
+        summary = self.summary()
+        for phase, stats in summary.items():
+            labels = f'job="{job}",phase="{phase}"'
+            lines.append(f'capture_phase_duration_seconds{{{labels},quantile="0.5"}} {stats["p50"]}')
+            lines.append(f'capture_phase_duration_seconds{{{labels},quantile="0.95"}} {stats["p95"]}')
+            lines.append(f'capture_phase_duration_seconds_sum{{{labels}}} {stats["total"]}')
+            lines.append(f'capture_phase_duration_seconds_count{{{labels}}} {stats["count"]}')
+        lines += [
+            "# HELP capture_phase_duration_max_seconds Longest single duration per capture phase.",
+            "# TYPE capture_phase_duration_max_seconds gauge",
+        ]
+        for phase, stats in summary.items():
+            lines.append(f'capture_phase_duration_max_seconds{{job="{job}",phase="{phase}"}} {stats["max"]}')
+
+        report = self.to_dict()
+        lines += [
+            "# HELP capture_run_duration_seconds Wall-clock duration of the last capture run.",
+            "# TYPE capture_run_duration_seconds gauge",
+            f'capture_run_duration_seconds{{job="{job}"}} {report["duration"]}',
+            "# HELP capture_run_finished_timestamp_seconds Unix time the last capture run finished.",
+            "# TYPE capture_run_finished_timestamp_seconds gauge",
+            f'capture_run_finished_timestamp_seconds{{job="{job}"}} {report["finished_at"]:.3f}',
+        ]
+        for name, value in sorted(report['counters'].items()):
+            metric = f"capture_run_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f'{metric}{{job="{job}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: Optional[Path] = None, keep: Optional[int] = None) -> Optional[Path]:
+        """
+        导出JSON运行报告和Prometheus文本文件，并删除该任务较早的JSON运行报告
+
+        Args:
+            directory: 输出目录，默认使用 config.METRICS_DIR
+            keep: 每个任务保留的JSON运行报告数量，默认使用 config.METRICS_KEEP_REPORTS（0 表示全部保留）
+
+        Returns:
+            Optional[Path]: JSON运行报告路径，导出失败时返回None
+        """
+        directory = Path(directory or getattr(config, 'METRICS_DIR', config.PROJECT_ROOT / "metrics"))
+        keep = getattr(config, 'METRICS_KEEP_REPORTS', 20) if keep is None else keep
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started_at))
+            report_path = directory / f"run_{self.job}_{stamp}_{self.run_id}.json"
+            _write_atomic(report_path, json.dumps(self.to_dict(), ensure_ascii=False, indent=2))
+            # Prometheus 文件每个任务一个，每次运行覆盖
+            _write_atomic(directory / f"capture_{self.job}.prom", self.to_prometheus())
+            if keep:
+                _prune_reports(directory, self.job, keep)
+            return report_path
+        except OSError as e:
+            logger.warning(f"导出运行指标失败: {str(e)}")
+            return None
+
+    def log_summary(self) -> None:
+        """输出各阶段耗时统计"""
+        for phase, stats in self.summary().items():
+            logger.info(f"阶段耗时 [{phase}] {stats['count']} 次, 总计 {stats['total']:.2f} 秒, "
+                        f"p50 {stats['p50']:.3f} 秒, p95 {stats['p95']:.3f} 秒, 最大 {stats['max']:.3f} 秒")
+
+
+def _prune_reports(directory: Path, job: str, keep: int) -> None:
+    """
+    只保留任务最近的若干份JSON运行报告（按文件名中的时间排序）
+
+    Args:
+        directory: 报告目录
+        job: 任务名
+        keep: 保留数量
+    """
+    # 精确匹配任务名，避免 job_1 的清理误删 job_1_extra 的报告
+    pattern = re.compile(rf"run_{re.escape(job)}_(\d{{8}}_\d{{6}})_[0-9a-f]+\.json")
+    reports = []
+    for path in directory.iterdir():
+        match = pattern.fullmatch(path.name)
+        if match:
+            reports.append((match.group(1), path.stat().st_mtime, path))
+    reports.sort(key=lambda item: item[:2])
+    for _, _, path in reports[:-keep]:
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.debug("删除旧的运行报告失败: {}", e)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """先写临时文件再替换，避免采集方读到写了一半的文件"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
@@ -0,0 +1,188 @@
+"""
+页面动作模块
+把“查找元素 → 获取信息 → 点击”合并为一次页面内调用：
+1. 动作脚本库在每个标签页只注册一次（对之后的每个新文档自动生效）
+2. 之后只按名称调用库中的函数，不再每次拼接和传输整段脚本
+3. 返回精简的 ActionResult，替代原来的三次 run_js 往返
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+
+# 动作脚本库：注册到 window.__dacActions
+ACTION_LIBRARY_SCRIPT = """
+(function () {
+    if (window.__dacActions) { return; }
+
+    function isClickableAnchor(a) {
+        return a.offsetParent !== null && a.href && !a.disabled &&
+            getComputedStyle(a).display !== 'none';
+    }
+
+    function findFirstAnchor(scopeId) {
+        var root = scopeId ? document.getElementById(scopeId) : document;
+        if (!root) { return null; }
+        var anchors = root.querySelectorAll('a');
+        for (var i = 0; i < anchors.length; i++) {
+            if (isClickableAnchor(anchors[i])) { return anchors[i]; }
+        }
+        return null;
+    }
+
+    function findLoginButton() {
+        var candidates = [];
+        // 1. 提交按钮
+        candidates = candidates.concat(
+            Array.from(document.querySelectorAll('input[type="submit"]')),
+            Array.from(document.querySelectorAll('button[type="submit"]')));
+        // 2. 包含登录文字的按钮
+        var buttons = document.querySelectorAll('button, input[type="button"], a');
+        for (var i = 0; i < buttons.length; i++) {
+            var text = (buttons[i].textContent || buttons[i].value || '').toLowerCase();
+            if (text.includes('登录') || text.includes('login') || text.includes('submit')) {
+                candidates.push(buttons[i]);
+            }
+        }
+        // 3. 特定class或id的按钮
+        candidates = candidates.concat(Array.from(
+            document.querySelectorAll('[class*="login"], [id*="login"], .login-btn, #login-btn')));
+        // 返回第一个可见的候选者
+        for (var j = 0; j < candidates.length; j++) {
+            if (candidates[j] && candidates[j].offsetParent !== null) { return candidates[j]; }
+        }
+        return null;
+    }
+
+    function describe(el) {
+        return {
+            found: true,
+            clicked: false,
+            tag: el.tagName,
+            type: el.type || '',
+            text: (el.textContent || el.value || '').trim(),
+            href: el.href || '',
+            id: el.id || '',
+            className: typeof el.className === 'string' ? el.className : ''
+        };
+    }
+
+    function click(el) {
+        if (!el) { return { found: false, clicked: false }; }
+        var result = describe(el);
+        el.click();
+        result.clicked = true;
+        return result;
+    }
+
+    window.__dacActions = {
+        clickFirstAnchor: function (scopeId) { return click(findFirstAnchor(scopeId)); },
+        describeFirstAnchor: function (scopeId) {
+            var el = findFirstAnchor(scopeId);
+            return el ? describe(el) : { found: false, clicked: false };
+        },
+        clickLoginButton: function () { return click(findLoginButton()); }
+    };
+})();
+"""
+
+# 按名称调用动作库中的函数；库不存在时返回 null，由调用方注册后重试
+CALL_ACTION_SCRIPT = """
+var lib = window.__dacActions;
+if (!lib) { return null; }
+return lib[arguments[0]].apply(null, Array.prototype.slice.call(arguments, 1));
+"""
+
+
+@dataclass
+class ActionResult:
+    """页面动作的执行结果"""
+
+    found: bool = False
+    clicked: bool = False
+    tag: str = ""
+    type: str = ""
+    text: str = ""
+    href: str = ""
+    element_id: str = ""
+    class_name: str = ""
+
+    @classmethod
+    def from_js(cls, data: Optional[Dict[str, Any]]) -> "ActionResult":
+        """由动作脚本返回的对象构造结果"""
+        data = data or {}
+        return cls(
+            found=bool(data.get('found')),
+            clicked=bool(data.get('clicked')),
+            tag=data.get('tag', ''),
+            type=data.get('type', ''),
+            text=data.get('text', ''),
+            href=data.get('href', ''),
+            element_id=data.get('id', ''),
+            class_name=data.get('className', ''),
+        )
+
+    def describe(self) -> Dict[str, str]:
+        """用于日志输出的元素信息"""
+        return {
+            'tagName': self.tag,
+            'href': self.href,
+            'text': self.text,
+            'id': self.element_id,
+            'className': self.class_name,
+        }
+
+
+class PageActions:
+    """单次往返完成“查找 + 描述 + 点击”的页面动作层"""
+
+    def __init__(self, page):
+        """
+        初始化动作层
+
+        Args:
+            page: DrissionPage 页面或标签页对象
+        """
+        self.page = page
+        self._init_script_id = None
+
+    def install(self) -> None:
+        """在标签页上注册动作脚本库（之后打开的文档自动注入，同时注入当前文档）"""
+        try:
+            if self._init_script_id is None:
+                self._init_script_id = self.page.add_init_js(ACTION_LIBRARY_SCRIPT)
+            self.page.run_js(ACTION_LIBRARY_SCRIPT)
+        except Exception as e:
+            logger.debug("注册页面动作脚本失败: {}", e)
+
+    def call(self, name: str, *args) -> ActionResult:
+        """
+        按名称调用动作库中的函数
+
+        Args:
+            name: 动作名称
+            *args: 传给动作的参数
+
+        Returns:
+            ActionResult: 动作结果
+        """
+        result = self.page.run_js(CALL_ACTION_SCRIPT, name, *args)
+        if result is None:
+            # 当前文档还没有动作库（如注册前已打开的文档），补注册后重试一次
+            self.install()
+            result = self.page.run_js(CALL_ACTION_SCRIPT, name, *args)
+        return ActionResult.from_js(result)
+
+    def click_first_anchor(self, scope_id: Optional[str] = None) -> ActionResult:
+        """点击第一个可点击的A标签（可限定在指定ID的元素内）"""
+        return self.call('clickFirstAnchor', scope_id or '')
+
+    def describe_first_anchor(self, scope_id: Optional[str] = None) -> ActionResult:
+        """获取第一个可点击的A标签的信息，不点击"""
+        return self.call('describeFirstAnchor', scope_id or '')
+
+    def click_login_button(self) -> ActionResult:
+        """查找并点击登录按钮"""
+        return self.call('clickLoginButton')
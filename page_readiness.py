@@ -0,0 +1,233 @@
+"""
+页面就绪等待模块
+用真实的页面信号代替固定时长的等待：
+1. 文档加载状态（document.readyState）
+2. 网络空闲（指定毫秒内没有进行中的请求、也没有新完成的资源）
+3. 翻页点击后目标元素（如 #cal）内容发生变化（MutationObserver）
+所有等待都有硬超时，并记录每一页实际等待的时间
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+import config
+from utils import safe_sleep
+
+
+# 注入到每个新文档中的网络活动计数脚本：统计进行中的 XHR/fetch 请求数与最后一次网络活动时间
+NETWORK_TRACKER_SCRIPT = """
+(function () {
+    if (window.__dacNet) { return; }
+    var net = window.__dacNet = { pending: 0, last: performance.now() };
+    function done() { net.pending = Math.max(0, net.pending - 1); net.last = performance.now(); }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        net.pending += 1; net.last = performance.now();
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function () {
+            net.pending += 1; net.last = performance.now();
+            return origFetch.apply(this, arguments).then(
+                function (r) { done(); return r; },
+                function (e) { done(); throw e; }
+            );
+        };
+    }
+})();
+"""
+
+# 一次往返取回就绪状态：加载状态、进行中的请求数、距最后一次网络活动的毫秒数
+READY_PROBE_SCRIPT = """
+var net = window.__dacNet || { pending: 0, last: 0 };
+var last = net.last;
+var entries = performance.getEntriesByType('resource');
+if (entries.length) {
+    last = Math.max(last, entries[entries.length - 1].responseEnd);
+}
+return {
+    state: document.readyState,
+    pending: net.pending,
+    idle: performance.now() - last
+};
+"""
+
+# 在目标元素上挂载 MutationObserver，翻页点击前调用
+ARM_WATCH_SCRIPT = """
+var el = document.getElementById(arguments[0]);
+if (window.__dacWatch) { window.__dacWatch.observer.disconnect(); }
+if (!el) { window.__dacWatch = null; return false; }
+var watch = { token: arguments[1], changed: false, observer: null };
+watch.observer = new MutationObserver(function () { watch.changed = true; });
+watch.observer.observe(el, { childList: true, subtree: true, characterData: true, attributes: true });
+window.__dacWatch = watch;
+return true;
+"""
+
+# 检查挂载后内容是否已变化；文档被替换（整页跳转）时标记丢失，同样视为已变化
+CHECK_WATCH_SCRIPT = """
+var watch = window.__dacWatch;
+return !watch || watch.token !== arguments[0] || watch.changed;
+"""
+
+
+class PageReadiness:
+    """事件驱动的页面就绪等待引擎"""
+
+    def __init__(self, page, timeout: Optional[float] = None,
+                 network_idle_ms: Optional[int] = None,
+                 poll_interval: Optional[float] = None):
+        """
+        初始化就绪等待引擎
+
+        Args:
+            page: DrissionPage 页面或标签页对象
+            timeout: 单次等待的硬超时（秒）
+            network_idle_ms: 判定网络空闲所需的静默时长（毫秒）
+            poll_interval: 轮询间隔（秒）
+        """
+        self.page = page
+        self.timeout = timeout if timeout is not None else getattr(config, 'READY_TIMEOUT', 15)
+        self.network_idle_ms = (network_idle_ms if network_idle_ms is not None
+                                else getattr(config, 'NETWORK_IDLE_MS', 500))
+        self.poll_interval = (poll_interval if poll_interval is not None
+                              else getattr(config, 'READY_POLL_INTERVAL', 0.1))
+        self.strategy = getattr(config, 'READY_STRATEGY', 'event')
+        self.records: List[Dict[str, Any]] = []
+        # 运行指标（可选），每次等待同时记录为 readiness_wait 阶段
+        self.metrics = None
+        self._watch_token: Optional[str] = None
+        self._watch_seq = 0
+
+    def install(self) -> None:
+        """注册网络活动计数脚本（对之后打开的每个文档生效，也注入当前文档）"""
+        if self.strategy != 'event':
+            return
+        try:
+            self.page.add_init_js(NETWORK_TRACKER_SCRIPT)
+            self.page.run_js(NETWORK_TRACKER_SCRIPT)
+        except Exception as e:
+            logger.warning(f"注册网络活动监听脚本失败，将仅依据资源时间线判断空闲: {str(e)}")
+
+    def arm_content_watch(self, element_id: str) -> bool:
+        """
+        在点击翻页前挂载内容变化监听
+
+        Args:
+            element_id: 需要监听的元素ID
+
+        Returns:
+            bool: 是否成功挂载（元素不存在时返回False）
+        """
+        self._watch_token = None
+        if self.strategy != 'event':
+            return False
+        self._watch_seq += 1
+        token = f"dac-{self._watch_seq}"
+        try:
+            if self.page.run_js(ARM_WATCH_SCRIPT, element_id, token):
+                self._watch_token = token
+                return True
+        except Exception as e:
+            logger.debug("挂载内容变化监听失败: {}", e)
+        return False
+
+    def cancel_content_watch(self) -> None:
+        """取消已挂载的内容变化监听（点击未发生时调用，避免下一次等待误等内容变化）"""
+        self._watch_token = None
+
+    def wait_until_ready(self, label: str, page_num: Optional[int] = None) -> float:
+        """
+        等待页面就绪：先等待已挂载的内容变化（如有），再等待文档加载完成且网络空闲
+
+        Args:
+            label: 本次等待的用途（用于记录，如 navigate / next_page）
+            page_num: 当前页码（可选）
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        start = time.perf_counter()
+
+        if self.strategy != 'event':
+            safe_sleep(config.BROWSER_WAIT_TIME)
+            return self._record(label, page_num, start, True, ['fixed'])
+
+        deadline = start + self.timeout
+        signals = []
+        timed_out = False
+
+        if self._watch_token:
+            if self._poll(deadline, self._content_changed):
+                signals.append('content_changed')
+            else:
+                timed_out = True
+            self._watch_token = None
+
+        if not timed_out:
+            if self._poll(deadline, self._loaded_and_idle):
+                signals.append('loaded_idle')
+            else:
+                timed_out = True
+
+        return self._record(label, page_num, start, not timed_out, signals)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        汇总本次运行的就绪等待统计
+
+        Returns:
+            Dict[str, Any]: 等待次数、总耗时、平均耗时、最大耗时与超时次数
+        """
+        waits = [r['waited'] for r in self.records]
+        return {
+            'count': len(waits),
+            'total': sum(waits),
+            'average': sum(waits) / len(waits) if waits else 0.0,
+            'max': max(waits) if waits else 0.0,
+            'timeouts': sum(1 for r in self.records if not r['ready']),
+        }
+
+    def _poll(self, deadline: float, check) -> bool:
+        """在截止时间前轮询检查函数，返回是否满足条件"""
+        while True:
+            try:
+                if check():
+                    return True
+            except Exception as e:
+                # 页面跳转过程中执行上下文可能暂时不可用，继续轮询即可
+                logger.debug("就绪检查暂时失败: {}", e)
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def _content_changed(self) -> bool:
+        return bool(self.page.run_js(CHECK_WATCH_SCRIPT, self._watch_token))
+
+    def _loaded_and_idle(self) -> bool:
+        state = self.page.run_js(READY_PROBE_SCRIPT)
+        if not state or state.get('state') != 'complete':
+            return False
+        return state.get('pending', 0) == 0 and state.get('idle', 0) >= self.network_idle_ms
+
+    def _record(self, label: str, page_num: Optional[int], start: float,
+                ready: bool, signals: list) -> float:
+        waited = time.perf_counter() - start
+        self.records.append({
+            'label': label,
+            'page': page_num,
+            'waited': waited,
+            'ready': ready,
+            'signals': signals,
+        })
+        if self.metrics is not None:
+            self.metrics.record('readiness_wait', waited, page=page_num, label=label, ready=ready)
+        if ready:
+            logger.info(f"页面就绪 [{label}] 用时 {waited:.2f} 秒 ({'+'.join(signals)})")
+        else:
+            logger.warning(f"页面就绪等待超时 [{label}] 已等待 {waited:.2f} 秒，继续执行")
+        return waited
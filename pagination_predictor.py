@@ -0,0 +1,261 @@
+"""
+翻页URL预测与预取模块
+比较当前页面URL与“下一页”A标签的href，找出按规律变化的那一个查询参数或路径段
+（整数页码、年月、日期），据此推算后续页面的URL，并提前在后台标签页中加载：
+1. 只有恰好一个部分发生变化、且变化量可以推算时才启用预测
+2. 每翻一页都会用真实的“下一页”href核对预测结果，不一致时立即回退到点击翻页
+"""
+
+import calendar
+import re
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Deque, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from loguru import logger
+
+from page_actions import PageActions
+from page_readiness import PageReadiness
+
+# 支持的日期格式：(匹配正则, strptime格式, 是否包含“日”)
+_DATE_FORMATS = [
+    (re.compile(r"^\d{4}-\d{2}-\d{2}$"), "%Y-%m-%d", True),
+    (re.compile(r"^\d{4}/\d{2}/\d{2}$"), "%Y/%m/%d", True),
+    (re.compile(r"^\d{8}$"), "%Y%m%d", True),
+    (re.compile(r"^\d{4}-\d{2}$"), "%Y-%m", False),
+    (re.compile(r"^\d{6}$"), "%Y%m", False),
+]
+
+
+def _add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(month_index, 12)
+    day = min(value.day, calendar.monthrange(year, month + 1)[1])
+    return date(year, month + 1, day)
+
+
+def _parse_date(text: str) -> Optional[Tuple[date, str, bool]]:
+    for pattern, fmt, has_day in _DATE_FORMATS:
+        if pattern.match(text):
+            try:
+                return datetime.strptime(text, fmt).date(), fmt, has_day
+            except ValueError:
+                return None
+    return None
+
+
+@dataclass
+class PagePattern:
+    """翻页URL规律：URL中哪个部分、按什么类型、以多大步长变化"""
+
+    location: str           # 'query' 或 'path'
+    key: str                # 查询参数名，或路径段序号
+    kind: str               # 'int' / 'day' / 'month'
+    step: int
+    fmt: str = ""           # 日期格式，或整数的补零宽度
+
+    def __str__(self) -> str:
+        where = f"参数 {self.key}" if self.location == 'query' else f"路径第 {self.key} 段"
+        return f"{where} 按 {self.kind} 递增 {self.step}"
+
+    def next_url(self, url: str) -> Optional[str]:
+        """
+        推算给定页面的下一页URL
+
+        Args:
+            url: 当前页面URL
+
+        Returns:
+            Optional[str]: 下一页URL，URL中不含规律对应的部分时返回None
+        """
+        parts = urlsplit(url)
+        if self.location == 'query':
+            query = parse_qsl(parts.query, keep_blank_values=True)
+            for i, (name, value) in enumerate(query):
+                if name == self.key:
+                    new_value = self._advance(value)
+                    if new_value is None:
+                        return None
+                    query[i] = (name, new_value)
+                    return urlunsplit(parts._replace(query=urlencode(query)))
+            return None
+
+        segments = parts.path.split('/')
+        index = int(self.key)
+        if index >= len(segments):
+            return None
+        new_value = self._advance(segments[index])
+        if new_value is None:
+            return None
+        segments[index] = new_value
+        return urlunsplit(parts._replace(path='/'.join(segments)))
+
+    def _advance(self, value: str) -> Optional[str]:
+        try:
+            if self.kind == 'int':
+                return str(int(value) + self.step).zfill(int(self.fmt or 0))
+            current = datetime.strptime(value, self.fmt).date()
+        except ValueError:
+            return None
+        if self.kind == 'month':
+            return _add_months(current, self.step).strftime(self.fmt)
+        return (current + timedelta(days=self.step)).strftime(self.fmt)
+
+
+def _derive_step(current: str, following: str) -> Optional[Tuple[str, int, str]]:
+    """根据同一位置的两个取值推算 (类型, 步长, 格式)"""
+    current_date, following_date = _parse_date(current), _parse_date(following)
+    if current_date and following_date and current_date[1] == following_date[1]:
+        a, fmt, has_day = current_date
+        b = following_date[0]
+        months = (b.year - a.year) * 12 + b.month - a.month
+        if not has_day or (a.day == b.day and months):
+            return ('month', months, fmt) if months else None
+        days = (b - a).days
+        return ('day', days, fmt) if days else None
+
+    if current.isdigit() and following.isdigit():
+        step = int(following) - int(current)
+        if not step:
+            return None
+        width = len(current) if current.startswith('0') and len(current) == len(following) else 0
+        return 'int', step, str(width)
+    return None
+
+
+def derive_pattern(current_url: str, next_url: str) -> Optional[PagePattern]:
+    """
+    比较当前页URL与下一页URL，推导翻页规律
+
+    Args:
+        current_url: 当前页面URL
+        next_url: “下一页”A标签的href
+
+    Returns:
+        Optional[PagePattern]: 翻页规律，无法推导时返回None
+    """
+    if not current_url or not next_url:
+        return None
+    a, b = urlsplit(current_url), urlsplit(next_url)
+    if (a.scheme, a.netloc) != (b.scheme, b.netloc):
+        return None
+
+    candidates: List[PagePattern] = []
+
+    query_a = dict(parse_qsl(a.query, keep_blank_values=True))
+    query_b = dict(parse_qsl(b.query, keep_blank_values=True))
+    if set(query_a) != set(query_b):
+        return None
+    for key in query_a:
+        if query_a[key] != query_b[key]:
+            step = _derive_step(query_a[key], query_b[key])
+            if step is None:
+                return None
+            candidates.append(PagePattern('query', key, step[0], step[1], step[2]))
+
+    segments_a, segments_b = a.path.split('/'), b.path.split('/')
+    if len(segments_a) != len(segments_b):
+        return None
+    for index, (seg_a, seg_b) in enumerate(zip(segments_a, segments_b)):
+        if seg_a != seg_b:
+            step = _derive_step(seg_a, seg_b)
+            if step is None:
+                return None
+            candidates.append(PagePattern('path', str(index), step[0], step[1], step[2]))
+
+    if len(candidates) != 1:
+        return None
+    pattern = candidates[0]
+    # 规律必须能从当前页准确推算出下一页（排除参数顺序、编码差异等情况）
+    return pattern if _same_url(pattern.next_url(current_url), next_url) else None
+
+
+def _same_url(a: Optional[str], b: Optional[str]) -> bool:
+    """忽略查询参数顺序和锚点比较两个URL"""
+    if not a or not b:
+        return False
+    pa, pb = urlsplit(a), urlsplit(b)
+    return ((pa.scheme, pa.netloc, pa.path) == (pb.scheme, pb.netloc, pb.path) and
+            sorted(parse_qsl(pa.query, keep_blank_values=True)) ==
+            sorted(parse_qsl(pb.query, keep_blank_values=True)))
+
+
+@dataclass
+class PrefetchedPage:
+    """在后台标签页中预取的页面"""
+
+    url: str
+    tab: object
+    readiness: PageReadiness
+    actions: PageActions
+
+
+class PagePrefetcher:
+    """按翻页规律在后台标签页中提前加载后续页面"""
+
+    def __init__(self, browser, pattern: PagePattern, depth: int, blocker=None):
+        """
+        初始化预取器
+
+        Args:
+            browser: DrissionPage 浏览器对象（用于打开后台标签页）
+            pattern: 翻页规律
+            depth: 最多提前加载的页数
+            blocker: 请求拦截引擎（可选），安装到每个预取标签页上
+        """
+        self.browser = browser
+        self.blocker = blocker
+        self.pattern = pattern
+        self.depth = max(1, depth)
+        self._pages: Deque[PrefetchedPage] = deque()
+        self._last_url: Optional[str] = None
+
+    def matches_next(self, href: str) -> bool:
+        """真实的下一页href是否与预取队列的第一页一致"""
+        return bool(self._pages) and _same_url(self._pages[0].url, href)
+
+    def fill(self, first_url: Optional[str], limit: int) -> None:
+        """
+        补足预取队列
+
+        Args:
+            first_url: 队列为空时的第一页URL（即当前页真实的下一页href）
+            limit: 还允许翻页的最大页数
+        """
+        if not self._pages and first_url:
+            self._last_url = None
+        while len(self._pages) < min(self.depth, limit):
+            url = first_url if self._last_url is None else self.pattern.next_url(self._last_url)
+            if not url:
+                return
+            self._pages.append(self._open(url))
+            self._last_url = url
+
+    def pop(self) -> PrefetchedPage:
+        """取出队列中的下一页"""
+        return self._pages.popleft()
+
+    def close(self) -> None:
+        """关闭所有尚未使用的预取标签页"""
+        while self._pages:
+            page = self._pages.popleft()
+            try:
+                page.tab.close()
+            except Exception as e:
+                logger.debug("关闭预取标签页失败: {}", e)
+        self._last_url = None
+
+    def _open(self, url: str) -> PrefetchedPage:
+        """打开后台标签页并开始加载（不等待加载完成）"""
+        tab = self.browser.new_tab(background=True)
+        if self.blocker:
+            self.blocker.install(tab)
+        readiness = PageReadiness(tab)
+        readiness.install()
+        actions = PageActions(tab)
+        actions.install()
+        tab.run_cdp('Page.navigate', url=url)
+        logger.debug("开始预取: {}", url)
+        return PrefetchedPage(url=url, tab=tab, readiness=readiness, actions=actions)
@@ -0,0 +1,229 @@
+"""
+请求拦截模块
+截图时屏蔽统计、广告、在线客服、媒体等与截图内容无关的请求，缩短页面加载和就绪等待时间：
+1. 规则由URL通配符和资源类型组成，支持屏蔽列表和放行列表（放行优先）
+2. 通过 CDP Fetch 域拦截：只有命中规则的请求才会被暂停，其余请求不受影响
+3. 统计每次运行屏蔽的请求数，并按资源类型估算节省的流量
+"""
+
+import threading
+from collections import Counter
+from fnmatch import fnmatch
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+import config
+import utils
+
+# 统计、广告与在线客服等第三方服务
+TRACKER_URL_PATTERNS = [
+    "*://*.google-analytics.com/*",
+    "*://*.googletagmanager.com/*",
+    "*://*.doubleclick.net/*",
+    "*://*.googlesyndication.com/*",
+    "*://connect.facebook.net/*",
+    "*://hm.baidu.com/*",
+    "*://*.cnzz.com/*",
+    "*://*.51.la/*",
+    "*://*.growingio.com/*",
+    "*://*.sensorsdata.cn/*",
+    "*://*.hotjar.com/*",
+    "*://*.clarity.ms/*",
+    "*://*.segment.io/*",
+    "*://*.mixpanel.com/*",
+    "*://*.intercom.io/*",
+    "*://*.crisp.chat/*",
+    "*://*.tawk.to/*",
+    "*://*.zopim.com/*",
+    "*://*.livechatinc.com/*",
+    "*://*.meiqia.com/*",
+    "*://*.53kf.com/*",
+]
+
+# 第三方网页字体服务
+WEB_FONT_URL_PATTERNS = [
+    "*://fonts.googleapis.com/*",
+    "*://fonts.gstatic.com/*",
+    "*://use.typekit.net/*",
+]
+
+# 预设方案：safe 只屏蔽不影响页面内容的请求；aggressive 额外屏蔽字体和图片（截图中字体和图标会变化）
+BLOCK_PROFILES: Dict[str, Dict[str, List[str]]] = {
+    "safe": {
+        "url_patterns": TRACKER_URL_PATTERNS,
+        "resource_types": ["Media", "Ping", "CSPViolationReport"],
+    },
+    "aggressive": {
+        "url_patterns": TRACKER_URL_PATTERNS + WEB_FONT_URL_PATTERNS,
+        "resource_types": ["Media", "Ping", "CSPViolationReport", "Font", "Image", "Prefetch"],
+    },
+}
+
+# 被屏蔽请求的平均大小（字节），用于估算节省的流量（只是估算：被屏蔽的请求没有真实大小）
+ESTIMATED_RESOURCE_SIZES = {
+    "Document": 50 * 1024,
+    "Stylesheet": 30 * 1024,
+    "Image": 60 * 1024,
+    "Media": 500 * 1024,
+    "Font": 40 * 1024,
+    "Script": 80 * 1024,
+    "XHR": 5 * 1024,
+    "Fetch": 5 * 1024,
+    "Ping": 1024,
+    "CSPViolationReport": 1024,
+    "Prefetch": 30 * 1024,
+}
+DEFAULT_ESTIMATED_SIZE = 10 * 1024
+
+
+class RequestBlocker:
+    """基于 CDP Fetch 的请求拦截引擎，可安装到多个标签页并共享统计"""
+
+    def __init__(self, profile: Optional[str] = None,
+                 block_patterns: Optional[Iterable[str]] = None,
+                 allow_patterns: Optional[Iterable[str]] = None,
+                 resource_types: Optional[Iterable[str]] = None):
+        """
+        初始化请求拦截引擎
+
+        Args:
+            profile: 预设方案名称（safe / aggressive），默认使用 config.REQUEST_BLOCK_PROFILE
+            block_patterns: 额外屏蔽的URL通配符，默认使用 config.REQUEST_BLOCK_PATTERNS
+            allow_patterns: 始终放行的URL通配符（优先于屏蔽规则），默认使用 config.REQUEST_ALLOW_PATTERNS
+            resource_types: 屏蔽的资源类型，默认使用预设方案中的类型（config.REQUEST_BLOCK_TYPES 可覆盖）
+        """
+        self.enabled = getattr(config, 'REQUEST_BLOCKING', True)
+        profile = profile or getattr(config, 'REQUEST_BLOCK_PROFILE', 'safe')
+        if profile not in BLOCK_PROFILES:
+            logger.warning(f"未知的请求拦截方案 {profile}，使用 safe")
+            profile = "safe"
+        preset = BLOCK_PROFILES[profile]
+
+        if block_patterns is None:
+            block_patterns = getattr(config, 'REQUEST_BLOCK_PATTERNS', [])
+        if allow_patterns is None:
+            allow_patterns = getattr(config, 'REQUEST_ALLOW_PATTERNS', [])
+        if resource_types is None:
+            resource_types = getattr(config, 'REQUEST_BLOCK_TYPES', None)
+        if resource_types is None:
+            resource_types = preset["resource_types"]
+
+        self.profile = profile
+        self.url_patterns = list(preset["url_patterns"]) + list(block_patterns)
+        self.allow_patterns = list(allow_patterns)
+        self.resource_types = list(resource_types)
+
+        self._lock = threading.Lock()
+        self.blocked: Counter = Counter()
+        self.allowed = 0
+
+    def fetch_patterns(self) -> List[Dict[str, str]]:
+        """生成 Fetch.enable 的拦截模式：只暂停可能被屏蔽的请求"""
+        patterns = [{"urlPattern": pattern, "requestStage": "Request"} for pattern in self.url_patterns]
+        patterns += [{"urlPattern": "*", "resourceType": resource_type, "requestStage": "Request"}
+                     for resource_type in self.resource_types]
+        return patterns
+
+    def install(self, page) -> bool:
+        """
+        在标签页上启用请求拦截（之后的所有导航都生效）
+
+        Args:
+            page: DrissionPage 页面或标签页对象
+
+        Returns:
+            bool: 是否启用成功
+        """
+        if not self.enabled:
+            return False
+        patterns = self.fetch_patterns()
+        if not patterns:
+            return False
+        try:
+            driver = page.driver
+            main_frame = page.tab_id
+
+            def on_request_paused(**params):
+                self._handle(driver, main_frame, params)
+
+            driver.set_callback('Fetch.requestPaused', on_request_paused)
+            result = page.run_cdp('Fetch.enable', patterns=patterns)
+            logger.info(f"已启用请求拦截（方案 {self.profile}，{len(self.url_patterns)} 条URL规则，"
+                        f"资源类型: {', '.join(self.resource_types) or '无'}）")
+            return result is not None
+        except Exception as e:
+            logger.warning(f"启用请求拦截失败，将不屏蔽任何请求: {str(e)}")
+            return False
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """
+        判断请求是否应被屏蔽
+
+        Args:
+            url: 请求URL
+            resource_type: CDP 资源类型（Image、Font、Script 等）
+
+        Returns:
+            bool: 是否屏蔽
+        """
+        if any(fnmatch(url, pattern) for pattern in self.allow_patterns):
+            return False
+        if resource_type in self.resource_types:
+            return True
+        return any(fnmatch(url, pattern) for pattern in self.url_patterns)
+
+    def _handle(self, driver, main_frame: str, params: Dict[str, Any]) -> None:
+        """处理被暂停的请求：屏蔽或放行（不等待浏览器回应）"""
+        request_id = params.get('requestId')
+        url = params.get('request', {}).get('url', '')
+        resource_type = params.get('resourceType', 'Other')
+        try:
+            # 页面主文档始终放行
+            is_main_document = resource_type == 'Document' and params.get('frameId') == main_frame
+            if not is_main_document and self.should_block(url, resource_type):
+                driver.run('Fetch.failRequest', requestId=request_id,
+                           errorReason='BlockedByClient', _timeout=0)
+                with self._lock:
+                    self.blocked[resource_type] += 1
+                logger.debug("已屏蔽请求 [{}] {}", resource_type, url)
+            else:
+                driver.run('Fetch.continueRequest', requestId=request_id, _timeout=0)
+                with self._lock:
+                    self.allowed += 1
+        except Exception as e:
+            logger.debug("处理被拦截的请求失败: {}", e)
+
+    def reset_stats(self) -> None:
+        """清空统计（每次截图任务开始时调用）"""
+        with self._lock:
+            self.blocked.clear()
+            self.allowed = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取本次运行的拦截统计
+
+        Returns:
+            Dict[str, Any]: 屏蔽总数、按资源类型的屏蔽数、估算节省的字节数
+        """
+        with self._lock:
+            by_type = dict(self.blocked)
+        return {
+            'blocked': sum(by_type.values()),
+            'by_type': by_type,
+            'estimated_bytes_saved': sum(ESTIMATED_RESOURCE_SIZES.get(t, DEFAULT_ESTIMATED_SIZE) * n
+                                         for t, n in by_type.items()),
+        }
+
+    def log_stats(self) -> None:
+        """输出本次运行的拦截统计"""
+        if not self.enabled:
+            return
+        stats = self.stats()
+        if not stats['blocked']:
+            logger.info("请求拦截统计: 未屏蔽任何请求")
+            return
+        detail = ", ".join(f"{t} {n}" for t, n in sorted(stats['by_type'].items()))
+        logger.info(f"请求拦截统计: 共屏蔽 {stats['blocked']} 个请求 ({detail})，"
+                    f"估算节省流量约 {utils.format_file_size(stats['estimated_bytes_saved'])}")
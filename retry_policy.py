@@ -0,0 +1,188 @@
+"""
+重试策略模块
+代替固定间隔、对所有异常一视同仁的重试：
+1. 指数退避加随机抖动，避免多个任务同时重试
+2. 按异常类名选择处理方式：重新连接浏览器、重新加载页面、直接重试或立即失败
+3. 每次运行共享一个重试预算，预算用完后不再重试
+4. 重试次数与重试耗时记录到运行指标中
+"""
+
+import random
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+from loguru import logger
+
+import config
+
+T = TypeVar("T")
+
+# 处理方式：retry 直接重试；reload 重新加载页面后重试；reconnect 重新连接浏览器后重试；fail 立即失败
+RETRY_ACTIONS = ("retry", "reload", "reconnect", "fail")
+
+# 按异常类名（含父类）选择处理方式，未列出的异常直接重试
+DEFAULT_RETRY_STRATEGIES: Dict[str, str] = {
+    "PageDisconnectedError": "reconnect",
+    "BrowserConnectError": "reconnect",
+    "TargetNotFoundError": "reconnect",
+    "ConnectionError": "reconnect",
+    "PageLoadError": "reload",
+    "WaitTimeoutError": "reload",
+    "TimeoutError": "reload",
+    "ContextLostError": "reload",
+    "GetDocumentError": "reload",
+    "PageNotFoundError": "fail",
+    "IncorrectURLError": "fail",
+    "ValueError": "fail",
+}
+
+
+class PageLoadError(Exception):
+    """页面加载失败（可重新加载）"""
+
+
+class PageNotFoundError(PageLoadError):
+    """页面不存在（404），重试无意义"""
+
+
+class RetryPolicy:
+    """带指数退避、抖动、预算和异常分类的重试策略"""
+
+    def __init__(self, max_attempts: Optional[int] = None, base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None, multiplier: Optional[float] = None,
+                 jitter: Optional[float] = None, budget: Optional[int] = None,
+                 strategies: Optional[Dict[str, str]] = None):
+        """
+        初始化重试策略
+
+        Args:
+            max_attempts: 单个步骤的最大尝试次数（含第一次），默认 config.MAX_RETRY_TIMES + 1
+            base_delay: 第一次重试前的等待（秒），默认使用 config.RETRY_DELAY
+            max_delay: 单次等待的上限（秒），默认使用 config.RETRY_MAX_DELAY
+            multiplier: 每次重试等待时间的倍数，默认使用 config.RETRY_BACKOFF
+            jitter: 随机抖动比例（0-1），默认使用 config.RETRY_JITTER
+            budget: 每次运行的重试总次数上限，默认使用 config.RETRY_BUDGET
+            strategies: 额外的 {异常类名: 处理方式}，覆盖默认策略（config.RETRY_STRATEGIES 同理）
+        """
+        self.max_attempts = max(1, max_attempts if max_attempts is not None
+                                else getattr(config, 'MAX_RETRY_TIMES', 3) + 1)
+        self.base_delay = base_delay if base_delay is not None else getattr(config, 'RETRY_DELAY', 2)
+        self.max_delay = max_delay if max_delay is not None else getattr(config, 'RETRY_MAX_DELAY', 30)
+        self.multiplier = multiplier if multiplier is not None else getattr(config, 'RETRY_BACKOFF', 2)
+        self.jitter = min(1.0, max(0.0, jitter if jitter is not None else getattr(config, 'RETRY_JITTER', 0.2)))
+        self.budget = budget if budget is not None else getattr(config, 'RETRY_BUDGET', 10)
+
+        self.strategies = dict(DEFAULT_RETRY_STRATEGIES)
+        self.strategies.update(getattr(config, 'RETRY_STRATEGIES', {}) or {})
+        self.strategies.update(strategies or {})
+        unknown = {name: action for name, action in self.strategies.items() if action not in RETRY_ACTIONS}
+        if unknown:
+            logger.warning(f"未知的重试处理方式 {unknown}，按 retry 处理")
+            self.strategies.update({name: "retry" for name in unknown})
+
+        self.metrics = None
+        self.retries = 0
+        self.retry_time = 0.0
+
+    def reset(self, metrics=None) -> None:
+        """
+        开始新的一次运行：恢复重试预算
+
+        Args:
+            metrics: 本次运行的运行指标（可选）
+        """
+        self.metrics = metrics
+        self.retries = 0
+        self.retry_time = 0.0
+
+    @property
+    def budget_left(self) -> int:
+        """本次运行剩余的重试次数"""
+        return max(0, self.budget - self.retries)
+
+    def classify(self, error: BaseException) -> str:
+        """
+        按异常类名（从子类到父类）选择处理方式
+
+        Args:
+            error: 异常
+
+        Returns:
+            str: 处理方式（retry / reload / reconnect / fail）
+        """
+        for cls in type(error).__mro__:
+            action = self.strategies.get(cls.__name__)
+            if action:
+                return action
+        return "retry"
+
+    def delay(self, attempt: int) -> float:
+        """
+        第 attempt 次重试前的等待时间（指数退避加抖动）
+
+        Args:
+            attempt: 重试序号（从1开始）
+
+        Returns:
+            float: 等待秒数
+        """
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, delay)
+
+    def run(self, func: Callable[[], T], label: str = "",
+            recover: Optional[Dict[str, Callable[[], None]]] = None) -> T:
+        """
+        执行步骤，失败时按异常类型处理后重试
+
+        Args:
+            func: 要执行的步骤（无参数）
+            label: 步骤名称（用于日志和运行指标）
+            recover: {处理方式: 恢复函数}，重试前调用；reconnect 没有恢复函数时不重试
+
+        Returns:
+            步骤的返回值
+        """
+        recover = recover or {}
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return func()
+            except Exception as e:
+                action = self.classify(e)
+                reason = None
+                if action == "fail":
+                    reason = "不可重试的错误"
+                elif action == "reconnect" and "reconnect" not in recover:
+                    reason = "无法重新连接浏览器"
+                elif attempt >= self.max_attempts:
+                    reason = f"已尝试 {attempt} 次"
+                elif self.budget_left <= 0:
+                    reason = f"本次运行的重试预算（{self.budget} 次）已用完"
+                if reason:
+                    logger.error(f"[{label}] 失败，不再重试（{reason}）: {type(e).__name__}: {str(e)}")
+                    raise
+
+                delay = self.delay(attempt)
+                logger.warning(f"[{label}] 第 {attempt} 次尝试失败 ({type(e).__name__}: {str(e)})，"
+                               f"{delay:.1f} 秒后{'' if action == 'retry' else f'（{action}）'}重试，"
+                               f"剩余重试预算 {self.budget_left - 1} 次")
+                start = time.perf_counter()
+                try:
+                    time.sleep(delay)
+                    if action in recover:
+                        recover[action]()
+                finally:
+                    self._record(label, action, type(e).__name__, time.perf_counter() - start)
+
+    def _record(self, label: str, action: str, error: str, duration: float) -> None:
+        """记录一次重试"""
+        self.retries += 1
+        self.retry_time += duration
+        if self.metrics is not None:
+            self.metrics.record('retry', duration, label=label, action=action, error=error)
+            self.metrics.increment('retries')
+            self.metrics.increment(f'retries_{action}')
+            self.metrics.increment('retry_seconds', round(duration, 6))
@@ -13,6 +13,7 @@ from utils import safe_sleep
 sys.path.insert(0, str(Path(__file__).parent))
 
 import config
+from checkpoint import RunCheckpoint
 from screenshot_crawler import ScreenshotCrawler
 
 
@@ -33,9 +34,18 @@ def main():
         print("⚠️  输入的页数无效，使用默认值 10")
         max_pages = 10
     
+    # 检查是否有未完成的任务
+    resume = False
+    checkpoint = RunCheckpoint(config.SCREENSHOT_DIR).load(url)
+    if checkpoint:
+        answer = input(f"检测到未完成的任务（已完成 {checkpoint.last_page} 页），是否继续？(Y/n): ").strip().lower()
+        resume = answer not in ['n', 'no']
+    
     print(f"\n📋 任务配置:")
     print(f"   🌐 目标URL: {url}")
     print(f"   📄 最大页数: {max_pages}")
+    if resume:
+        print(f"   ⏯️  从第 {checkpoint.last_page + 1} 页继续")
     print(f"   📁 保存目录: {config.SCREENSHOT_DIR}")
     print()
     
@@ -49,7 +59,8 @@ def main():
         with ScreenshotCrawler() as crawler:
             success_count, screenshot_files = crawler.start_screenshot_task(
                 url=url,
-                max_pages=max_pages
+                max_pages=max_pages,
+                resume=resume
             )
             
             print(f"\n🎉 任务完成!")
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+定时截图调度器
+一个常驻进程按 cron 表达式定时执行截图任务，浏览器和登录状态在多次运行之间保持：
+1. 使用常驻浏览器宿主（BrowserHost），每次运行只领取一个新标签页，不再重复启动浏览器和登录
+2. 上一次运行尚未结束时跳过本次触发，不会叠加运行
+3. 每次触发时间加上随机抖动，多个任务不会在同一秒同时开始
+4. 每个任务的下次运行时间和上次运行结果写入状态文件（python scheduler.py --status 查看）
+
+定时任务文件（JSON / YAML，字段与 batch_runner.py 的任务文件相同，另加 cron 和 jitter）：
+    {"jobs": [
+        {"name": "morning", "cron": "30 8 * * 1-5", "url": "https://example.com/attendance", "max_pages": 5},
+        {"name": "hourly", "cron": "0 9-18 * * *", "url": "https://example.com/report", "jitter": 60}
+    ]}
+
+cron 表达式为 5 个字段：分 时 日 月 周（0 和 7 均为周日），支持 * , - / 以及英文月份和星期缩写，
+也支持 @hourly、@daily、@weekly、@monthly、@yearly。
+
+使用方法：
+    python scheduler.py schedule.json              # 常驻运行（Ctrl+C 退出，浏览器保持运行）
+    python scheduler.py schedule.json --next 5     # 只列出每个任务接下来 5 次的触发时间
+    python scheduler.py --status                   # 查看各任务的下次运行时间和上次运行结果
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from loguru import logger
+
+import config
+import utils
+from batch_runner import JobFileError, parse_job, read_entries
+from jobs import CaptureJob
+
+# 常用表达式的简写
+CRON_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_MONTH_NAMES = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+_WEEKDAY_NAMES = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# (字段名, 最小值, 最大值, 名称表)；星期允许写 7，解析后按 0（周日）处理
+_CRON_FIELDS = (
+    ("分", 0, 59, {}),
+    ("时", 0, 23, {}),
+    ("日", 1, 31, {}),
+    ("月", 1, 12, _MONTH_NAMES),
+    ("周", 0, 7, _WEEKDAY_NAMES),
+)
+
+
+def _parse_cron_field(text: str, name: str, low: int, high: int, names: Dict[str, int]) -> Set[int]:
+    """解析 cron 表达式的一个字段，返回匹配的取值集合"""
+
+    def value(token: str) -> int:
+        token = token.lower()
+        number = names[token] if token in names else (int(token) if token.isdigit() else None)
+        if number is None or not low <= number <= high:
+            raise ValueError(f"cron 字段「{name}」的取值 {token!r} 无效（范围 {low}-{high}）")
+        return number
+
+    values = set()
+    for part in text.split(","):
+        base, _, step_text = part.partition("/")
+        step = 1
+        if step_text:
+            if not step_text.isdigit() or int(step_text) < 1:
+                raise ValueError(f"cron 字段「{name}」的步长 {step_text!r} 无效")
+            step = int(step_text)
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start, end = (value(token) for token in base.split("-", 1))
+            if start > end:
+                raise ValueError(f"cron 字段「{name}」的范围 {base!r} 无效")
+        else:
+            start = value(base)
+            end = high if step_text else start
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """5 字段 cron 表达式（分 时 日 月 周，本地时间）"""
+
+    def __init__(self, expression: str):
+        """
+        解析 cron 表达式
+
+        Args:
+            expression: cron 表达式，如 "30 8 * * 1-5" 或 "@hourly"
+        """
+        self.expression = expression.strip()
+        fields = CRON_MACROS.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式应为 5 个字段（分 时 日 月 周）: {expression!r}")
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_cron_field(text, *spec) for text, spec in zip(fields, _CRON_FIELDS))
+        self.weekdays = {day % 7 for day in weekdays}
+        # 与 cron 相同：日和周都有限制时，满足任一即可
+        self._days_restricted = not fields[2].startswith("*")
+        self._weekdays_restricted = not fields[4].startswith("*")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        """日期是否匹配日和周字段"""
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._days_restricted and self._weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        计算指定时间之后的下一个触发时间（精确到分钟）
+
+        Args:
+            moment: 起始时间（不包含）
+
+        Returns:
+            datetime: 下一个触发时间
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit_year = candidate.year + 8
+        while candidate.year <= limit_year:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"cron 表达式 {self.expression!r} 没有可以触发的时间")
+
+    def __str__(self) -> str:
+        return self.expression
+
+
+@dataclass
+class ScheduledJob:
+    """一个定时截图任务及其运行状态"""
+
+    name: str
+    cron: CronExpression
+    job: CaptureJob
+    jitter: float = 0.0
+    next_run: Optional[datetime] = None
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_started: Optional[datetime] = None
+    last_result: Optional[Dict[str, Any]] = None
+
+    def schedule_next(self, after: datetime) -> None:
+        """
+        计算下次运行时间（cron 触发时间加上随机抖动）
+
+        Args:
+            after: 从该时间之后开始计算
+        """
+        self.next_run = self.cron.next_after(after) + timedelta(seconds=random.uniform(0, self.jitter))
+
+    def status(self) -> Dict[str, Any]:
+        """任务状态（写入状态文件）"""
+        return {
+            'cron': str(self.cron),
+            'url': self.job.url,
+            'next_run': self.next_run.isoformat(timespec="seconds") if self.next_run else None,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'last_started': self.last_started.isoformat(timespec="seconds") if self.last_started else None,
+            'last_result': self.last_result,
+        }
+
+
+def load_schedule(path: Path) -> List[ScheduledJob]:
+    """
+    读取并校验定时任务文件
+
+    Args:
+        path: 定时任务文件路径（.json / .yaml / .yml / .csv）
+
+    Returns:
+        List[ScheduledJob]: 定时任务列表
+    """
+    default_jitter = getattr(config, 'SCHEDULER_JITTER', 30)
+    scheduled = []
+    for i, entry in enumerate(read_entries(path), 1):
+        where = f"第{i}个任务"
+        if not isinstance(entry, dict) or not entry.get("cron"):
+            raise JobFileError(f"{where}: 缺少 cron 表达式")
+        entry = dict(entry)
+        try:
+            cron = CronExpression(str(entry.pop("cron")))
+            cron.next_after(datetime.now())
+            jitter = float(entry.pop("jitter", default_jitter))
+        except ValueError as e:
+            raise JobFileError(f"{where}: {e}")
+        job = parse_job(entry, where)
+        scheduled.append(ScheduledJob(name=job.name or f"job_{i}", cron=cron, job=job, jitter=max(0.0, jitter)))
+
+    if not scheduled:
+        raise JobFileError("定时任务文件中没有任务")
+    names = [item.name for item in scheduled]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise JobFileError(f"任务名称重复: {', '.join(duplicated)}")
+    return scheduled
+
+
+class Scheduler:
+    """按 cron 表达式定时运行截图任务，多次运行之间复用常驻浏览器"""
+
+    def __init__(self, jobs: List[ScheduledJob], headless: Optional[bool] = None,
+                 max_parallel: Optional[int] = None, status_file: Optional[Path] = None):
+        """
+        初始化调度器
+
+        Args:
+            jobs: 定时任务列表
+            headless: 是否使用无头模式，默认使用 config.BROWSER_HEADLESS
+            max_parallel: 同时运行的最大任务数（共用一个浏览器，各占一个标签页），默认使用 config.SCHEDULER_MAX_PARALLEL
+            status_file: 状态文件路径，默认使用 config.SCHEDULER_STATUS_FILE
+        """
+        self.jobs = jobs
+        self.headless = config.BROWSER_HEADLESS if headless is None else headless
+        self.max_parallel = max(1, max_parallel or getattr(config, 'SCHEDULER_MAX_PARALLEL', 2))
+        self.status_file = Path(status_file or getattr(config, 'SCHEDULER_STATUS_FILE',
+                                                       config.PROJECT_ROOT / "scheduler_status.json"))
+        self.check_interval = getattr(config, 'BROWSER_HOST_CHECK_INTERVAL', 10)
+        self.started_at: Optional[datetime] = None
+        self._host = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # 多个任务线程同时结束时会并发写状态文件，串行化以免共用临时文件
+        self._status_lock = threading.Lock()
+
+    def run_forever(self) -> None:
+        """常驻运行，直到调用 stop()（或收到 Ctrl+C / SIGTERM）"""
+        # 在这里导入：--status / --next 不需要加载浏览器相关模块
+        from browser_host import BrowserHost
+
+        utils.init_process()
+        self.started_at = datetime.now()
+        if len({item.job.account for item in self.jobs}) > 1:
+            logger.warning("所有任务共用一个浏览器的登录状态，多个账号交替登录时每次运行都可能需要重新登录")
+
+        # 预热：启动（或连接）常驻浏览器，之后每次运行只领取标签页
+        self._host = BrowserHost(headless=self.headless)
+        self._host.ensure_running()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="schedule")
+
+        now = datetime.now()
+        for item in self.jobs:
+            item.schedule_next(now)
+            logger.info(f"定时任务 [{item.name}] {item.cron}，下次运行: {item.next_run:%Y-%m-%d %H:%M:%S}")
+        self._write_status()
+        logger.success(f"调度器已启动: {len(self.jobs)} 个任务（按 Ctrl+C 退出，浏览器保持运行）")
+
+        last_check = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                now = datetime.now()
+                for item in self.jobs:
+                    if item.next_run <= now:
+                        self._trigger(item, now)
+
+                # 空闲时定期检查常驻浏览器，退出时重新启动，下次运行仍是热的
+                if time.monotonic() - last_check >= self.check_interval:
+                    last_check = time.monotonic()
+                    self._keep_alive()
+
+                wait = min(item.next_run for item in self.jobs) - datetime.now()
+                self._stop.wait(min(1.0, max(0.05, wait.total_seconds())))
+        finally:
+            logger.info("调度器正在退出，等待正在运行的任务结束...")
+            self._executor.shutdown(wait=True)
+            self._write_status()
+
+    def stop(self) -> None:
+        """停止调度（正在运行的任务会继续执行完）"""
+        self._stop.set()
+
+    def _trigger(self, item: ScheduledJob, now: datetime) -> None:
+        """到达触发时间：上一次运行未结束时跳过，否则提交运行"""
+        with self._lock:
+            if item.running:
+                item.skipped += 1
+                logger.warning(f"定时任务 [{item.name}] 上一次运行尚未结束，跳过本次触发（已跳过 {item.skipped} 次）")
+            else:
+                item.running = True
+                self._executor.submit(self._run, item)
+            item.schedule_next(now)
+        self._write_status()
+
+    def _run(self, item: ScheduledJob) -> None:
+        """执行一次定时任务（在线程池中运行）"""
+        from screenshot_crawler import ScreenshotCrawler
+
+        started = datetime.now()
+        item.last_started = started
+        # 每次运行的截图保存到任务输出目录下按时间命名的子目录
+        output_dir = item.job.output_dir(self.jobs.index(item) + 1) / started.strftime("%Y%m%d_%H%M%S")
+        result: Dict[str, Any] = {'started_at': started.isoformat(timespec="seconds"),
+                                  'output_dir': str(output_dir)}
+        start = time.perf_counter()
+        with logger.contextualize(schedule=item.name):
+            logger.info(f"定时任务 [{item.name}] 开始运行")
+            try:
+                # 无人值守运行：没有可用的登录会话时直接失败，不等待手动输入密码
+                crawler = ScreenshotCrawler(headless=self.headless, use_host=True,
+                                            capture_mode=item.job.capture_mode, account=item.job.account,
+                                            interactive=False)
+                count, _ = crawler.start_screenshot_task(url=item.job.url, max_pages=item.job.max_pages,
+                                                         screenshot_dir=str(output_dir), job_name=item.name)
+                result.update(success=True, screenshot_count=count, error=None)
+                logger.success(f"定时任务 [{item.name}] 完成，截图 {count} 张")
+            except Exception as e:
+                result.update(success=False, screenshot_count=0, error=str(e))
+                logger.error(f"定时任务 [{item.name}] 失败: {str(e)}")
+
+        result['duration'] = round(time.perf_counter() - start, 3)
+        result['finished_at'] = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            item.runs += 1
+            item.failures += 0 if result['success'] else 1
+            item.last_result = result
+            item.running = False
+        self._write_status()
+
+    def _keep_alive(self) -> None:
+        """检查常驻浏览器，不可用时重新启动"""
+        if self._host.is_alive():
+            return
+        logger.warning("常驻浏览器不可用，正在重新启动")
+        try:
+            self._host.ensure_running()
+        except Exception as e:
+            logger.error(f"重新启动常驻浏览器失败: {str(e)}")
+
+    def status(self) -> Dict[str, Any]:
+        """
+        调度器状态
+
+        Returns:
+            Dict[str, Any]: 进程信息以及每个任务的下次运行时间和上次运行结果
+        """
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'started_at': self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+                'updated_at': datetime.now().isoformat(timespec="seconds"),
+                'browser': self._host.address if self._host else None,
+                'jobs': {item.name: item.status() for item in self.jobs},
+            }
+
+    def _write_status(self) -> None:
+        """原子写入状态文件"""
+        try:
+            with self._status_lock:
+                self.status_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.status_file.with_name(self.status_file.name + ".tmp")
+                tmp_path.write_text(json.dumps(self.status(), ensure_ascii=False, indent=2), encoding="utf-8")
+                os.replace(tmp_path, self.status_file)
+        except OSError as e:
+            logger.warning(f"写入调度器状态失败: {str(e)}")
+
+
+def print_status(status_file: Path) -> int:
+    """输出状态文件中的各任务状态"""
+    try:
+        status = json.loads(status_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        print(f"❌ 没有调度器状态: {status_file}")
+        return 1
+
+    print(f"📋 调度器（进程 {status['pid']}，启动于 {status['started_at']}，更新于 {status['updated_at']}）")
+    for name, job in status['jobs'].items():
+        last = job['last_result']
+        if last is None:
+            last_text = "尚未运行"
+        elif last['success']:
+            last_text = f"✅ {last['finished_at']} 截图 {last['screenshot_count']} 张（{last['duration']:.1f} 秒）"
+        else:
+            last_text = f"❌ {last['finished_at']} {last['error']}"
+        print(f"   [{name}] {job['cron']} | {'运行中 | ' if job['running'] else ''}"
+              f"下次 {job['next_run']} | 运行 {job['runs']} 次，失败 {job['failures']} 次，"
+              f"跳过 {job['skipped']} 次 | 上次: {last_text}")
+    return 0
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="定时截图调度器（常驻浏览器）")
+    parser.add_argument("schedule_file", nargs="?", help="定时任务文件（.json / .yaml / .yml / .csv）")
+    parser.add_argument("--headless", action="store_true", default=None, help="使用无头模式")
+    parser.add_argument("--max-parallel", type=int, default=None,
+                        help="同时运行的最大任务数（默认 config.SCHEDULER_MAX_PARALLEL）")
+    parser.add_argument("--status-file", default=None, help="状态文件路径（默认 config.SCHEDULER_STATUS_FILE）")
+    parser.add_argument("--status", action="store_true", help="查看各任务的下次运行时间和上次运行结果")
+    parser.add_argument("--next", type=int, default=0, metavar="N", help="只列出每个任务接下来 N 次的触发时间")
+    args = parser.parse_args()
+
+    status_file = Path(args.status_file or getattr(config, 'SCHEDULER_STATUS_FILE',
+                                                   config.PROJECT_ROOT / "scheduler_status.json"))
+    if args.status:
+        return print_status(status_file)
+    if not args.schedule_file:
+        parser.error("需要指定定时任务文件")
+
+    try:
+        jobs = load_schedule(Path(args.schedule_file))
+    except JobFileError as e:
+        print(f"❌ 定时任务文件无效: {e}")
+        return 2
+
+    if args.next:
+        for item in jobs:
+            moment, times = datetime.now(), []
+            for _ in range(args.next):
+                moment = item.cron.next_after(moment)
+                times.append(f"{moment:%Y-%m-%d %H:%M}")
+            print(f"[{item.name}] {item.cron}（抖动 0-{item.jitter:.0f} 秒）: {', '.join(times)}")
+        return 0
+
+    scheduler = Scheduler(jobs, headless=args.headless, max_parallel=args.max_parallel, status_file=status_file)
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop())
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+    except Exception as e:
+        logger.error(f"调度器运行失败: {str(e)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,59 +10,214 @@ DrissionPage自动截图爬虫
 import sys
 import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
 from loguru import logger
 
-try:
-    from DrissionPage import WebPage
-    from DrissionPage.errors import ElementNotFoundError, PageDisconnectedError
-except ImportError as e:
-    logger.error("请先安装DrissionPage: pip install DrissionPage")
-    sys.exit(1)
-
 import config
 import utils
-from utils import retry_on_failure, safe_sleep
+from browser_host import BrowserHost, build_browser_options
+from capture_modes import CaptureSpec, capture_page
+from checkpoint import CheckpointState, RunCheckpoint
+from image_encoder import ImageEncoder
+from image_hash import DuplicateDetector
+from metrics import RunMetrics
+from page_actions import PageActions
+from page_readiness import PageReadiness
+from pagination_predictor import PagePrefetcher, PrefetchedPage, derive_pattern
+from request_blocker import RequestBlocker
+from retry_policy import PageLoadError, PageNotFoundError, RetryPolicy
+from screenshot_writer import ScreenshotWriter
+from session_store import SessionStore
+from tiled_capture import STITCHING_AVAILABLE, iter_tiles, remove_capture, write_stitched, write_tile_set
+from utils import safe_sleep
+
+if TYPE_CHECKING:
+    # DrissionPage 导入较慢（约0.15秒），只在启动浏览器时才导入
+    from DrissionPage import ChromiumOptions, WebPage
+
+
+# 已在目标页面的关键词（页面文字或URL中出现任一即认为无需登录）
+TARGET_PAGE_KEYWORDS = ["attendance", "考勤", "打卡", "签到"]
+
+# 登录页面的关键词
+LOGIN_PAGE_KEYWORDS = ["login", "登录", "密码", "password", "username", "用户名"]
+
+# 用户名输入框选择器（按优先级排列，优先使用精确的id选择器）
+USERNAME_SELECTORS = [
+    f'input[id="{config.USERNAME_INPUT_ID}"]',  # 精确匹配用户名输入框ID
+    'input[name="username"]',
+    'input[type="text"]',
+    'input[name="user"]',
+    'input[id*="user"]',
+    'input[placeholder*="用户"]',
+    'input[placeholder*="账号"]'
+]
+
+# 登录状态探测脚本：一次往返返回结论，不把整页HTML传回Python
+LOGIN_PROBE_SCRIPT = """
+var targetWords = arguments[0].target, loginWords = arguments[0].login, selectors = arguments[0].selectors;
+var text = ((document.title || '') + ' ' + (document.body ? document.body.textContent : '')).toLowerCase();
+var url = location.href.toLowerCase();
+function find(words, haystack) {
+    for (var i = 0; i < words.length; i++) {
+        if (haystack.indexOf(words[i]) !== -1) { return words[i]; }
+    }
+    return null;
+}
+var keyword = find(targetWords, text) || find(targetWords, url);
+if (keyword) {
+    return { verdict: 'on_target', login_hint: false, selector: null, keyword: keyword };
+}
+var selector = null;
+for (var i = 0; i < selectors.length; i++) {
+    if (document.querySelector(selectors[i])) { selector = selectors[i]; break; }
+}
+keyword = find(loginWords, text);
+var hint = !!keyword || !!document.querySelector('input[type="password"]') ||
+    (selector !== null && selector !== 'input[type="text"]');
+return {
+    verdict: hint && selector ? 'login_form' : 'unknown',
+    login_hint: hint,
+    selector: hint ? selector : null,
+    keyword: keyword
+};
+"""
+
+
+class LoginRequiredError(RuntimeError):
+    """页面需要登录，但没有可用的登录会话且处于非交互模式（不会等待手动输入密码）"""
 
 
 class ScreenshotCrawler:
     """DrissionPage自动截图爬虫类"""
     
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: Optional[bool] = None, page=None,
+                 local_port: Optional[int] = None,
+                 user_data_dir: Optional[str] = None,
+                 use_host: Optional[bool] = None,
+                 capture_mode: Optional[str] = None,
+                 account: Optional[str] = None,
+                 interactive: Optional[bool] = None):
         """
         初始化爬虫
         
         Args:
-            headless: 是否使用无头模式
+            headless: 是否使用无头模式，默认使用 config.BROWSER_HEADLESS
+            page: 已存在的页面或标签页对象（可选），传入时直接在该标签页上工作，不再启动浏览器
+            local_port: 浏览器调试端口（可选），多个浏览器并行运行时需各不相同
+            user_data_dir: 浏览器用户数据目录（可选），多个浏览器并行运行时需各不相同
+            use_host: 是否连接常驻浏览器宿主领取标签页（不启动浏览器），默认使用 config.BROWSER_HOST_ENABLED；
+                      传入 page 或 local_port 时不使用
+            capture_mode: 截图范围（viewport / element / clip / full_page），默认使用 config.CAPTURE_MODE
+            account: 登录账号（自动填入用户名，并按账号保存登录会话），默认使用 config.LOGIN_USERNAME
+            interactive: 需要登录时是否等待用户在浏览器中输入密码，默认使用 config.LOGIN_INTERACTIVE；
+                         为 False 时没有可用的登录会话会立即抛出 LoginRequiredError（批量、定时任务使用）
         """
-        utils.setup_logger()
+        utils.init_process()
         logger.info("初始化DrissionPage自动截图爬虫...")
         
-        self.headless = headless
-        self.page: Optional[WebPage] = None
+        self.headless = config.BROWSER_HEADLESS if headless is None else headless
+        self.account = account or config.LOGIN_USERNAME
+        self.interactive = getattr(config, 'LOGIN_INTERACTIVE', True) if interactive is None else interactive
+        self.page: Optional['WebPage'] = page
+        if use_host is None:
+            use_host = getattr(config, 'BROWSER_HOST_ENABLED', False)
+        self.use_host = use_host and page is None and not local_port
+        # 是否由本实例启动浏览器（决定清理时退出浏览器还是只关闭标签页）
+        self._owns_browser = page is None and not self.use_host
+        self.local_port = local_port
+        self.user_data_dir = user_data_dir
+        self.readiness: Optional[PageReadiness] = None
+        self.actions: Optional[PageActions] = None
+        self.current_page_num: Optional[int] = None
+        self.launch_time: Optional[float] = None
         self.screenshot_count = 0
         self.screenshot_dir = Path(config.SCREENSHOT_DIR)
+        # 截图范围（裁剪在浏览器端完成）
+        self.capture_spec = CaptureSpec.from_config(capture_mode)
+        # 整页截图是否逐屏分块截取（避免浏览器生成超大位图），以及本次任务的分块数
+        self.tiled_full_page = getattr(config, 'FULL_PAGE_TILED', True)
+        self.tile_count = 0
+        # 输出格式编码器与后台写入线程池：截图在这里编码落盘，翻页无需等待编码和磁盘IO
+        self.encoder = ImageEncoder()
+        self.writer = ScreenshotWriter(encoder=self.encoder)
+        # 重复截图检测器（每次截图任务重新创建）
+        self.duplicates = DuplicateDetector()
+        # 已同步到检查点的近似重复记录数量
+        self._duplicates_synced = 0
+        # 断点续传检查点（每次截图任务重新创建）
+        self.checkpoint: Optional[RunCheckpoint] = None
+        # 加密的登录会话存储
+        self.session_store = SessionStore()
+        # 各阶段耗时（每次截图任务重新创建，任务结束时导出）
+        self.metrics = RunMetrics()
+        self.metrics_enabled = getattr(config, 'METRICS_ENABLED', True)
+        # 重试策略（指数退避、按异常类型处理、每次任务共享重试预算）
+        self.retry_policy = RetryPolicy()
+        # 浏览器断开后的重启次数上限，以及本次任务的重启次数和中断时长
+        self.max_browser_restarts = getattr(config, 'MAX_BROWSER_RESTARTS', 3)
+        self.browser_restarts = 0
+        self.downtime = 0.0
+        # 请求拦截（屏蔽统计、广告、在线客服等与截图无关的请求）
+        self.blocker = RequestBlocker()
+        # 翻页方式：click 逐页点击；predict 推算后续页面URL并在后台标签页预取
+        self.pagination_mode = getattr(config, 'PAGINATION_MODE', 'click')
+        self.prefetch_pages = getattr(config, 'PREFETCH_PAGES', 2)
+        self._prefetcher: Optional[PagePrefetcher] = None
+        self._prediction_enabled = False
+        # 任务开始时的页面及其就绪/动作对象（预取翻页结束后切换回这里）
+        self._root_page = None
+        self._root_helpers: Optional[Tuple[PageReadiness, PageActions]] = None
+    
+    def _build_browser_options(self) -> 'ChromiumOptions':
+        """
+        构建浏览器启动参数
         
-        # 确保截图目录存在
-        self.screenshot_dir.mkdir(exist_ok=True)
-        
-        # 检查磁盘空间
-        if not utils.check_disk_space(self.screenshot_dir):
-            logger.warning("磁盘空间可能不足，请注意")
+        Returns:
+            ChromiumOptions: 浏览器启动参数
+        """
+        return build_browser_options(self.headless, self.local_port, self.user_data_dir)
     
     def _initialize_browser(self) -> None:
         """初始化浏览器"""
         try:
-            logger.info("正在启动浏览器...")
+            if self._owns_browser:
+                logger.info(f"正在启动浏览器...（{'无头模式' if self.headless else '有界面模式'}）")
+                
+                # 创建WebPage实例（窗口大小等已在启动参数中设置）
+                start = time.perf_counter()
+                WebPage = utils.import_drission('WebPage')
+                self.page = WebPage(chromium_options=self._build_browser_options())
+                self.launch_time = time.perf_counter() - start
+                self.metrics.record('browser_launch', self.launch_time)
+                logger.info(f"浏览器启动用时 {self.launch_time:.2f} 秒，窗口大小: {config.BROWSER_WINDOW_SIZE}")
+            elif self.page is None:
+                # 连接常驻浏览器宿主并领取一个标签页，清理时只关闭这个标签页
+                logger.info("正在连接常驻浏览器...")
+                start = time.perf_counter()
+                self.page = BrowserHost(headless=self.headless).new_tab(
+                    autostart=getattr(config, 'BROWSER_HOST_AUTOSTART', True))
+                self.launch_time = time.perf_counter() - start
+                self.metrics.record('browser_launch', self.launch_time)
+                logger.info(f"已从常驻浏览器领取标签页，用时 {self.launch_time:.2f} 秒")
+            else:
+                logger.info("使用已打开的浏览器标签页")
+            
+            # 启用请求拦截（对之后的所有导航生效）
+            self.blocker.install(self.page)
+            
+            # 注册页面就绪信号监听
+            self.readiness = PageReadiness(self.page)
+            self.readiness.metrics = self.metrics
+            self.readiness.install()
             
-            # 创建WebPage实例
-            self.page = WebPage()
+            # 注册页面动作脚本库（每个标签页只注册一次）
+            self.actions = PageActions(self.page)
+            self.actions.install()
             
-            # 设置窗口大小
-            if not self.headless:
-                self.page.set.window.size(*config.BROWSER_WINDOW_SIZE)
-                logger.info(f"设置浏览器窗口大小: {config.BROWSER_WINDOW_SIZE}")
+            self._root_page = self.page
+            self._root_helpers = (self.readiness, self.actions)
             
             logger.success("浏览器启动成功!")
             
@@ -80,95 +235,135 @@ class ScreenshotCrawler:
         try:
             logger.info("检查是否需要登录...")
             
-            page_text = self.page.html.lower()
+            probe = self._probe_login_state()
             
             # 优先检查是否已经在目标页面或已登录状态
-            if any(keyword in page_text for keyword in ["attendance", "考勤", "打卡", "签到"]):
+            if probe['verdict'] == 'on_target':
                 logger.success("检测到已在考勤页面，无需登录")
                 return True
             
             # 检查是否在登录页面
-            if any(keyword in page_text for keyword in ["login", "登录", "密码", "password", "username", "用户名"]):
+            if probe['login_hint']:
+                # 只有找到登录表单才算需要登录（已登录页面上的“退出登录”等文字也会命中登录关键词）
+                if not self.interactive and probe['verdict'] == 'login_form':
+                    raise LoginRequiredError(
+                        f"页面需要登录，但账号 {self.account} 没有可用的登录会话；非交互模式不会等待输入密码，"
+                        f"请先运行 python run_crawler.py 手动登录一次以保存会话")
                 logger.info("检测到登录相关内容，检查是否需要登录...")
+                with self.metrics.phase('login_wait'):
+                    return self._complete_login(probe)
+            else:
+                logger.info("无需登录，直接继续")
+                return True
                 
-                # 尝试查找用户名输入框（优先使用精确的id选择器）
-                username_selectors = [
-                    'input[id="username"]',        # 精确匹配用户名输入框ID
-                    '#username',                   # 简化的ID选择器
-                    'input[name="username"]', 
-                    'input[type="text"]',
-                    'input[name="user"]',
-                    'input[id*="user"]',
-                    'input[placeholder*="用户"]',
-                    'input[placeholder*="账号"]'
-                ]
+        except LoginRequiredError:
+            raise
+        except Exception as e:
+            logger.error(f"处理登录时出错: {str(e)}")
+            return False
+
+    def _complete_login(self, probe: dict) -> bool:
+        """
+        交互式登录：自动输入用户名，等待用户输入密码后点击登录按钮
+        
+        Args:
+            probe: 登录状态探测结果
+            
+        Returns:
+            bool: 是否成功处理登录
+        """
+        # 探测脚本已按优先级匹配好用户名输入框，直接定位，不再逐个选择器等待
+        username_input = None
+        if probe['selector']:
+            username_input = self.page.ele(f"css:{probe['selector']}", timeout=0)
+        
+        if username_input:
+            # 自动输入用户名
+            username_input.clear()
+            username_input.input(self.account)
+            logger.success(f"✅ 已自动输入用户名: {self.account}")
+            
+            # 提示用户输入密码并等待
+            print(f"\n🔐 请在浏览器中手动输入密码")
+            print(f"⏰ 程序将等待 {config.LOGIN_WAIT_TIME} 秒...")
+            print(f"💡 输入密码后，程序将自动点击登录按钮")
+            
+            # 等待用户输入密码
+            for i in range(config.LOGIN_WAIT_TIME):
+                print(f"\r⏳ 等待输入密码... 剩余 {config.LOGIN_WAIT_TIME - i} 秒", end="", flush=True)
+                time.sleep(1)
                 
-                username_input = None
-                for selector in username_selectors:
-                    try:
-                        username_input = self.page.ele(selector)
-                        if username_input:
-                            break
-                    except:
-                        continue
+                # 检查是否已经登录成功（页面跳转或内容变化）
+                current_url = self.page.url
+                if config.TARGET_URL.split('?')[0] in current_url or "attendance" in current_url.lower():
+                    print(f"\n🎉 检测到登录成功，页面已跳转！")
+                    logger.success("登录成功，继续执行任务...")
+                    return True
+            
+            print(f"\n⏰ 等待时间结束，开始查找登录按钮...")
+            
+            # 查找并点击登录按钮
+            if self._click_login_button():
+                # 等待登录处理和页面跳转
+                logger.info("等待登录处理...")
+                safe_sleep(3)
                 
-                if username_input:
-                    # 自动输入用户名
-                    username_input.clear()
-                    username_input.input(config.LOGIN_USERNAME)
-                    logger.success(f"✅ 已自动输入用户名: {config.LOGIN_USERNAME}")
-                    
-                    # 提示用户输入密码并等待
-                    print(f"\n🔐 请在浏览器中手动输入密码")
-                    print(f"⏰ 程序将等待 {config.LOGIN_WAIT_TIME} 秒...")
-                    print(f"💡 输入密码后，程序将自动点击登录按钮")
-                    
-                    # 等待用户输入密码
-                    for i in range(config.LOGIN_WAIT_TIME):
-                        print(f"\r⏳ 等待输入密码... 剩余 {config.LOGIN_WAIT_TIME - i} 秒", end="", flush=True)
-                        time.sleep(1)
-                        
-                        # 检查是否已经登录成功（页面跳转或内容变化）
-                        current_url = self.page.url
-                        if config.TARGET_URL.split('?')[0] in current_url or "attendance" in current_url.lower():
-                            print(f"\n🎉 检测到登录成功，页面已跳转！")
-                            logger.success("登录成功，继续执行任务...")
-                            return True
-                    
-                    print(f"\n⏰ 等待时间结束，开始查找登录按钮...")
-                    
-                    # 查找并点击登录按钮
-                    if self._click_login_button():
-                        # 等待登录处理和页面跳转
-                        logger.info("等待登录处理...")
-                        safe_sleep(3)
-                        
-                        # 再次检查是否登录成功
-                        for attempt in range(config.LOGIN_BUTTON_WAIT):  # 使用配置的等待时间
-                            current_url = self.page.url
-                            if config.TARGET_URL.split('?')[0] in current_url or "attendance" in current_url.lower():
-                                print(f"🎉 登录成功！页面已跳转到目标页面")
-                                logger.success("登录成功，页面已跳转，继续执行任务...")
-                                return True
-                            time.sleep(1)
-                            print(f"\r🔄 等待页面跳转... {attempt + 1}/{config.LOGIN_BUTTON_WAIT}", end="", flush=True)
-                        
-                        print(f"\n✅ 登录按钮已点击，继续执行任务...")
-                        return True
-                    else:
-                        logger.warning("未找到登录按钮，但继续执行任务")
+                # 再次检查是否登录成功
+                for attempt in range(config.LOGIN_BUTTON_WAIT):  # 使用配置的等待时间
+                    current_url = self.page.url
+                    if config.TARGET_URL.split('?')[0] in current_url or "attendance" in current_url.lower():
+                        print(f"🎉 登录成功！页面已跳转到目标页面")
+                        logger.success("登录成功，页面已跳转，继续执行任务...")
                         return True
-                else:
-                    logger.success("未找到用户名输入框，判断为已登录状态")
-                    print(f"\n✅ 未检测到登录输入框，认为已经登录成功")
-                    print(f"🚀 直接开始截图任务...")
-                    return True
+                    time.sleep(1)
+                    print(f"\r🔄 等待页面跳转... {attempt + 1}/{config.LOGIN_BUTTON_WAIT}", end="", flush=True)
+                
+                print(f"\n✅ 登录按钮已点击，继续执行任务...")
+                return True
             else:
-                logger.info("无需登录，直接继续")
+                logger.warning("未找到登录按钮，但继续执行任务")
                 return True
-                
+        else:
+            logger.success("未找到用户名输入框，判断为已登录状态")
+            print(f"\n✅ 未检测到登录输入框，认为已经登录成功")
+            print(f"🚀 直接开始截图任务...")
+            return True
+
+    def _probe_login_state(self) -> dict:
+        """
+        用一次页面内JS探测登录状态，只返回精简结论
+        
+        Returns:
+            dict: verdict（on_target 已在目标页 / login_form 有登录表单 / unknown）、
+                  login_hint（是否有登录相关内容）、selector（匹配到的用户名输入框选择器）、
+                  keyword（命中的关键词）
+        """
+        start = time.perf_counter()
+        probe = self.page.run_js(LOGIN_PROBE_SCRIPT, {
+            'target': TARGET_PAGE_KEYWORDS,
+            'login': LOGIN_PAGE_KEYWORDS,
+            'selectors': USERNAME_SELECTORS,
+        }) or {}
+        probe.setdefault('verdict', 'unknown')
+        probe.setdefault('login_hint', False)
+        probe.setdefault('selector', None)
+        elapsed = time.perf_counter() - start
+        self.metrics.record('login_detection', elapsed, verdict=probe['verdict'])
+        logger.info(f"登录状态探测: {probe['verdict']} (关键词: {probe.get('keyword')}, "
+                    f"用户名输入框: {probe['selector']}, 耗时 {elapsed * 1000:.0f} ms)")
+        return probe
+    
+    def _is_session_valid(self) -> bool:
+        """
+        廉价校验当前是否处于登录状态：页面中没有可填写的登录表单
+        
+        Returns:
+            bool: 是否处于登录状态
+        """
+        try:
+            return self._probe_login_state()['verdict'] != 'login_form'
         except Exception as e:
-            logger.error(f"处理登录时出错: {str(e)}")
+            logger.debug("校验登录状态失败: {}", e)
             return False
 
     def _click_login_button(self) -> bool:
@@ -181,75 +376,16 @@ class ScreenshotCrawler:
         try:
             logger.info("正在查找登录按钮...")
             
-            # 使用JavaScript查找包含特定文字的登录按钮
-            find_login_button_script = """
-            function findLoginButton() {
-                // 查找所有可能的登录按钮元素
-                var candidates = [];
-                
-                // 1. 查找提交按钮
-                var submitInputs = document.querySelectorAll('input[type="submit"]');
-                var submitButtons = document.querySelectorAll('button[type="submit"]');
-                candidates = candidates.concat(Array.from(submitInputs), Array.from(submitButtons));
-                
-                // 2. 查找包含登录文字的按钮
-                var allButtons = document.querySelectorAll('button, input[type="button"], a');
-                for (var i = 0; i < allButtons.length; i++) {
-                    var element = allButtons[i];
-                    var text = (element.textContent || element.value || '').toLowerCase();
-                    if (text.includes('登录') || text.includes('login') || text.includes('submit')) {
-                        candidates.push(element);
-                    }
-                }
-                
-                // 3. 查找特定class或id的按钮
-                var classCandidates = document.querySelectorAll('[class*="login"], [id*="login"], .login-btn, #login-btn');
-                candidates = candidates.concat(Array.from(classCandidates));
-                
-                // 返回第一个找到的有效候选者
-                for (var j = 0; j < candidates.length; j++) {
-                    var candidate = candidates[j];
-                    if (candidate && candidate.offsetParent !== null) { // 确保元素是可见的
-                        return candidate;
-                    }
-                }
-                
-                return null;
-            }
-            
-            return findLoginButton();
-            """
+            # 一次页面内调用完成查找、获取信息和点击
+            result = self.actions.click_login_button()
             
-            login_button_element = self.page.run_js(find_login_button_script)
-            
-            if login_button_element:
-                try:
-                    # 获取按钮信息用于日志
-                    button_info = self.page.run_js("""
-                    var el = arguments[0];
-                    return {
-                        tagName: el.tagName,
-                        type: el.type || '',
-                        text: el.textContent || el.value || '',
-                        id: el.id || '',
-                        className: el.className || ''
-                    };
-                    """, login_button_element)
-                    
-                    logger.info(f"找到登录按钮: {button_info}")
-                    
-                    # 尝试点击按钮
-                    click_result = self.page.run_js("arguments[0].click(); return true;", login_button_element)
-                    
-                    if click_result:
-                        logger.success("✅ 成功点击登录按钮")
-                        return True
-                    else:
-                        logger.warning("点击登录按钮可能失败")
-                        return False
-                        
-                except Exception as e:
-                    logger.error(f"点击登录按钮时出错: {str(e)}")
+            if result.found:
+                logger.info(f"找到登录按钮: {result.describe()}")
+                if result.clicked:
+                    logger.success("✅ 成功点击登录按钮")
+                    return True
+                else:
+                    logger.warning("点击登录按钮可能失败")
                     return False
             else:
                 logger.warning("未找到合适的登录按钮")
@@ -268,10 +404,47 @@ class ScreenshotCrawler:
             logger.error(f"查找登录按钮时出错: {str(e)}")
             return False
 
-    @retry_on_failure(max_retries=config.MAX_RETRY_TIMES, delay=config.RETRY_DELAY)
+    def _load_page(self, url: str, label: str = 'navigate', page_num: Optional[int] = None) -> None:
+        """
+        访问URL并等待页面就绪（可单独重试，不包含登录流程）
+        
+        Args:
+            url: 目标URL
+            label: 就绪等待的用途
+            page_num: 当前页码（可选）
+        """
+        with self.metrics.phase('navigation'):
+            loaded = self.page.get(url)
+        self.readiness.wait_until_ready(label, page_num)
+        
+        # 检查页面是否加载成功
+        title = self.page.title
+        if "404" in title:
+            raise PageNotFoundError(f"页面不存在，页面标题: {title}")
+        if loaded is False or "error" in title.lower():
+            raise PageLoadError(f"页面加载可能失败，页面标题: {title}")
+    
+    def _reconnect_browser(self) -> None:
+        """重新启动浏览器（或重新从常驻浏览器领取标签页），用于浏览器连接断开后的重试"""
+        if not self._owns_browser and not self.use_host:
+            raise RuntimeError("标签页由调用方提供，无法重新连接浏览器")
+        logger.warning("浏览器连接已断开，正在重新连接...")
+        self._stop_prefetch()
+        try:
+            if self.page:
+                if self._owns_browser:
+                    self.page.quit()
+                else:
+                    self.page.close()
+        except Exception as e:
+            logger.debug("关闭已断开的浏览器失败: {}", e)
+        self.page = None
+        self._root_page = None
+        self._initialize_browser()
+    
     def _navigate_to_url(self, url: str) -> None:
         """
-        导航到指定URL
+        导航到指定URL：页面加载按重试策略重试，登录流程只执行一次
         
         Args:
             url: 目标URL
@@ -281,18 +454,30 @@ class ScreenshotCrawler:
         if not utils.validate_url(url):
             raise ValueError(f"无效的URL格式: {url}")
         
-        self.page.get(url)
-        safe_sleep(config.BROWSER_WAIT_TIME)
+        def load() -> bool:
+            # 访问前恢复已保存的登录会话（Cookie 与 localStorage），重新连接浏览器后同样需要
+            restored = self.session_store.restore(self.page, url, self.account)
+            self._load_page(url)
+            return restored
         
-        # 检查页面是否加载成功
-        if "error" in self.page.title.lower() or "404" in self.page.title:
-            raise Exception(f"页面加载可能失败，页面标题: {self.page.title}")
+        session_restored = self.retry_policy.run(load, label='navigate',
+                                                 recover={'reconnect': self._reconnect_browser})
         
         logger.success(f"页面加载成功: {self.page.title}")
         
-        # 处理登录
-        if not self._handle_login():
-            logger.warning("登录处理可能未成功，但继续执行任务")
+        # 处理登录：恢复的会话仍然有效时跳过交互式登录
+        if session_restored and self._is_session_valid():
+            logger.success("已保存的登录会话有效，跳过登录流程")
+        else:
+            if session_restored:
+                logger.info("已保存的登录会话已失效，重新登录")
+                self.session_store.invalidate(url, self.account)
+                self.session_store.discard_restore(self.page)
+            
+            if not self._handle_login():
+                logger.warning("登录处理可能未成功，但继续执行任务")
+            elif self._is_session_valid():
+                self.session_store.save(self.page, url, self.account)
         
         # 登录后可能需要点击第一个A标签进入正确页面
         if hasattr(config, 'CLICK_FIRST_A_AFTER_LOGIN') and config.CLICK_FIRST_A_AFTER_LOGIN:
@@ -307,26 +492,94 @@ class ScreenshotCrawler:
         截取当前页面截图
         
         Returns:
-            str: 截图文件路径
+            str: 截图文件路径（是否与之前的截图近似重复由写入线程判断，见 WriteResult.duplicate_of）
         """
+        if self.capture_spec.mode == "full_page" and self.tiled_full_page:
+            return self._take_tiled_screenshot()
+        
+        filepath = None
         try:
-            # 获取下一个截图文件名
-            filename = utils.get_next_screenshot_filename(self.screenshot_dir)
+            # 按截图范围在浏览器端裁剪，只取回图片字节，写盘交给后台写入线程
+            with self.metrics.phase('screenshot'):
+                data = capture_page(self.page, self.capture_spec)
+            
+            # 只比较字节摘要判断翻页是否生效，近似重复检测（需要解码图片）交给写入线程
+            self.duplicates.observe(data)
+            
+            # 获取下一个截图文件名（分配器会先创建空文件占用该序号）
+            filename = utils.get_next_screenshot_filename(self.screenshot_dir, self.encoder.extension)
             filepath = self.screenshot_dir / filename
             
-            # 截图
-            self.page.get_screenshot(str(filepath))
+            # 提交后台写入（队列满时在此阻塞）
+            self.writer.submit(filepath, data, self.current_page_num)
             self.screenshot_count += 1
             
-            # 获取文件大小
-            file_size = utils.format_file_size(filepath.stat().st_size)
-            
-            logger.success(f"截图保存成功: {filename} (大小: {file_size})")
+            logger.info(f"截图已提交写入: {filename}")
             return str(filepath)
             
         except Exception as e:
             logger.error(f"截图失败: {str(e)}")
+            # 删除截图失败时留下的空占位文件
+            if filepath and filepath.exists() and filepath.stat().st_size == 0:
+                filepath.unlink()
+            raise
+    
+    def _take_tiled_screenshot(self) -> str:
+        """
+        逐屏分块截取整个页面，流式拼接为一张PNG或保存为分块图片集（内存占用与页面长度无关）
+        
+        Returns:
+            str: 截图文件路径（分块图片集时为索引文件路径）
+        """
+        output = getattr(config, 'FULL_PAGE_OUTPUT', 'stitched')
+        if output == 'stitched' and not STITCHING_AVAILABLE:
+            logger.warning("未安装Pillow，无法拼接分块，改为保存分块图片集")
+            output = 'tiles'
+        
+        tiles = iter_tiles(self.page, getattr(config, 'FULL_PAGE_TILE_HEIGHT', 1000),
+                           getattr(config, 'FULL_PAGE_SCROLL_DELAY', 0.1))
+        filepath = None
+        try:
+            start = time.perf_counter()
+            extension = 'png' if output == 'stitched' else 'json'
+            filename = utils.get_next_screenshot_filename(self.screenshot_dir, extension)
+            filepath = self.screenshot_dir / filename
+            
+            # 写入的同时对每个分块计算哈希，写完后用整页的签名判断是否与之前的截图近似重复
+            signature = self.duplicates.tile_signature()
+            if output == 'stitched':
+                count = write_stitched(filepath, signature.wrap(tiles),
+                                       getattr(config, 'SCREENSHOT_COMPRESS_LEVEL', None) or 6)
+            else:
+                count = write_tile_set(filepath, signature.wrap(tiles), self.current_page_num)
+            if not count:
+                remove_capture(filepath)
+                raise RuntimeError("页面高度为0，没有截取到任何分块")
+            
+            duplicate_of = self.duplicates.check_tiles(signature, str(filepath), self.current_page_num)
+            if duplicate_of:
+                remove_capture(filepath)
+                return duplicate_of
+            
+            self.screenshot_count += 1
+            self.tile_count += count
+            
+            # 分块截图的截取与拼接交替进行，整体记为截图阶段
+            elapsed = time.perf_counter() - start
+            self.metrics.record('screenshot', elapsed, tiles=count)
+            peak_rss = utils.get_peak_rss()
+            logger.info(f"整页分块截图已保存: {filename}（{count} 个分块, "
+                        f"用时 {elapsed:.2f} 秒, "
+                        f"进程内存峰值 {utils.format_file_size(peak_rss) if peak_rss else '未知'}）")
+            return str(filepath)
+            
+        except Exception as e:
+            logger.error(f"整页分块截图失败: {str(e)}")
+            if filepath and filepath.exists() and filepath.stat().st_size == 0:
+                filepath.unlink()
             raise
+        finally:
+            tiles.close()
     
     def _click_first_a_tag(self) -> bool:
         """
@@ -338,56 +591,17 @@ class ScreenshotCrawler:
         try:
             logger.info("正在查找第一个A标签...")
             
-            # 使用JavaScript查找第一个可见的A标签
-            script = """
-            function findFirstATag() {
-                var aTags = document.querySelectorAll('a');
-                for (var i = 0; i < aTags.length; i++) {
-                    var aTag = aTags[i];
-                    // 检查A标签是否可见且可点击
-                    if (aTag.offsetParent !== null && 
-                        aTag.href && 
-                        !aTag.disabled &&
-                        getComputedStyle(aTag).display !== 'none') {
-                        return aTag;
-                    }
-                }
-                return null;
-            }
-            
-            return findFirstATag();
-            """
-            
-            first_a_element = self.page.run_js(script)
-            
-            if first_a_element:
-                try:
-                    # 获取A标签信息用于日志
-                    a_info = self.page.run_js("""
-                    var el = arguments[0];
-                    return {
-                        href: el.href || '',
-                        text: el.textContent.trim() || '',
-                        id: el.id || '',
-                        className: el.className || ''
-                    };
-                    """, first_a_element)
-                    
-                    logger.info(f"找到第一个A标签: {a_info}")
-                    
-                    # 尝试点击A标签
-                    click_result = self.page.run_js("arguments[0].click(); return true;", first_a_element)
-                    
-                    if click_result:
-                        logger.success("✅ 成功点击第一个A标签")
-                        safe_sleep(config.BROWSER_WAIT_TIME)
-                        return True
-                    else:
-                        logger.warning("点击第一个A标签可能失败")
-                        return False
-                        
-                except Exception as e:
-                    logger.error(f"点击第一个A标签时出错: {str(e)}")
+            # 一次页面内调用完成查找、获取信息和点击
+            result = self.actions.click_first_anchor()
+            
+            if result.found:
+                logger.info(f"找到第一个A标签: {result.describe()}")
+                if result.clicked:
+                    logger.success("✅ 成功点击第一个A标签")
+                    self.readiness.wait_until_ready('click_first_a', self.current_page_num)
+                    return True
+                else:
+                    logger.warning("点击第一个A标签可能失败")
                     return False
             else:
                 logger.warning("未找到可点击的A标签")
@@ -407,76 +621,228 @@ class ScreenshotCrawler:
         try:
             logger.info("正在查找下一页元素...")
             
-            # 使用JavaScript查找cal元素下的第一个A标签
-            script = f"""
-            function findFirstAInCal() {{
-                var calElement = document.getElementById('{config.NEXT_PAGE_SELECTOR}');
-                if (!calElement) {{
-                    return null;
-                }}
-                
-                // 查找cal元素内的所有A标签
-                var aTags = calElement.querySelectorAll('a');
-                for (var i = 0; i < aTags.length; i++) {{
-                    var aTag = aTags[i];
-                    // 检查A标签是否可见且可点击
-                    if (aTag.offsetParent !== null && 
-                        aTag.href && 
-                        !aTag.disabled &&
-                        getComputedStyle(aTag).display !== 'none') {{
-                        return aTag;
-                    }}
-                }}
-                
-                return null;
-            }}
-            
-            return findFirstAInCal();
-            """
+            # 点击前挂载cal元素内容变化监听，用于判断翻页是否完成
+            self.readiness.arm_content_watch(config.NEXT_PAGE_SELECTOR)
             
-            first_a_in_cal = self.page.run_js(script)
+            # 一次页面内调用完成查找cal元素下第一个A标签、获取信息和点击
+            with self.metrics.phase('pagination_click'):
+                result = self.actions.click_first_anchor(config.NEXT_PAGE_SELECTOR)
             
-            if first_a_in_cal:
-                try:
-                    # 获取A标签信息用于日志
-                    a_info = self.page.run_js("""
-                    var el = arguments[0];
-                    return {
-                        href: el.href || '',
-                        text: el.textContent.trim() || '',
-                        id: el.id || '',
-                        className: el.className || ''
-                    };
-                    """, first_a_in_cal)
-                    
-                    logger.info(f"找到cal元素下的第一个A标签: {a_info}")
-                    
-                    # 尝试点击A标签
-                    click_result = self.page.run_js("arguments[0].click(); return true;", first_a_in_cal)
-                    
-                    if click_result:
-                        logger.success("✅ 成功点击cal元素下的第一个A标签")
-                        safe_sleep(config.BROWSER_WAIT_TIME)
-                        return True
-                    else:
-                        logger.warning("点击cal元素下的第一个A标签可能失败")
-                        return False
-                        
-                except Exception as e:
-                    logger.error(f"点击cal元素下的第一个A标签时出错: {str(e)}")
+            if result.found:
+                logger.info(f"找到cal元素下的第一个A标签: {result.describe()}")
+                if result.clicked:
+                    logger.success("✅ 成功点击cal元素下的第一个A标签")
+                    self.readiness.wait_until_ready('next_page', self.current_page_num)
+                    return True
+                else:
+                    logger.warning("点击cal元素下的第一个A标签可能失败")
+                    self.readiness.cancel_content_watch()
                     return False
             else:
                 logger.warning(f"未找到ID为'{config.NEXT_PAGE_SELECTOR}'的元素或其下的A标签")
+                self.readiness.cancel_content_watch()
                 return False
                 
         except Exception as e:
+            if self._is_disconnected(e):
+                raise
             logger.error(f"查找下一页元素时出错: {str(e)}")
             return False
     
+    def _go_to_next_page(self, remaining: int) -> bool:
+        """
+        翻到下一页：预测模式下优先切换到已预取的标签页，无法预测时点击翻页
+        
+        Args:
+            remaining: 还需要翻页的最大页数（用于控制预取数量）
+            
+        Returns:
+            bool: 是否成功翻到下一页
+        """
+        if self._prediction_enabled:
+            result = self._advance_to_prefetched(remaining)
+            if result is not None:
+                return result
+        return self._find_next_page_element()
+    
+    def _advance_to_prefetched(self, remaining: int) -> Optional[bool]:
+        """
+        用当前页面真实的“下一页”链接核对预测，一致时切换到预取的标签页
+        
+        Args:
+            remaining: 还需要翻页的最大页数
+            
+        Returns:
+            Optional[bool]: 翻页结果；返回None表示放弃预测，改为点击翻页
+        """
+        try:
+            anchor = self.actions.describe_first_anchor(config.NEXT_PAGE_SELECTOR)
+            if not anchor.found:
+                logger.warning(f"未找到ID为'{config.NEXT_PAGE_SELECTOR}'的元素或其下的A标签")
+                return False
+            
+            if self._prefetcher is None:
+                pattern = derive_pattern(self.page.url, anchor.href)
+                if pattern is None:
+                    logger.info("未发现翻页URL规律，使用点击翻页")
+                    self._prediction_enabled = False
+                    return None
+                logger.info(f"发现翻页URL规律: {pattern}，预取后续 {self.prefetch_pages} 页")
+                self._prefetcher = PagePrefetcher(self._root_page.browser, pattern, self.prefetch_pages,
+                                                  blocker=self.blocker)
+                self._prefetcher.fill(anchor.href, remaining)
+            elif not self._prefetcher.matches_next(anchor.href):
+                logger.warning(f"下一页链接与预测不一致 ({anchor.href})，改为点击翻页")
+                self._stop_prefetch(keep_current=True)
+                self._prediction_enabled = False
+                return None
+            
+            prefetched = self._prefetcher.pop()
+            # 先补足后续页面的预取，再切换过去，使加载与截图重叠进行
+            self._prefetcher.fill(None, remaining - 1)
+            with self.metrics.phase('pagination_click', prefetched=True):
+                self._switch_to(prefetched)
+            logger.success(f"✅ 已切换到预取的下一页: {prefetched.url}")
+            self.readiness.wait_until_ready('prefetched_page', self.current_page_num)
+            return True
+            
+        except Exception as e:
+            logger.warning(f"预取翻页失败，改为点击翻页: {str(e)}")
+            self._stop_prefetch(keep_current=True)
+            self._prediction_enabled = False
+            return None
+    
+    def _switch_to(self, prefetched: PrefetchedPage) -> None:
+        """切换到预取的标签页，并关闭上一个预取标签页"""
+        previous = self.page
+        # 就绪等待记录汇总到同一个列表中，便于任务结束时统计
+        prefetched.readiness.records = self.readiness.records
+        prefetched.readiness.metrics = self.metrics
+        self.page = prefetched.tab
+        self.readiness = prefetched.readiness
+        self.actions = prefetched.actions
+        try:
+            # 后台标签页可能不渲染，切到前台后再截图
+            self.page.set.activate()
+        except Exception as e:
+            logger.debug("激活预取标签页失败: {}", e)
+        if previous is not self._root_page:
+            previous.close()
+    
+    def _stop_prefetch(self, keep_current: bool = False) -> None:
+        """
+        关闭预取标签页
+        
+        Args:
+            keep_current: 是否保留当前正在截图的标签页（回退为点击翻页时在该页继续）
+        """
+        if self._prefetcher:
+            self._prefetcher.close()
+            self._prefetcher = None
+        if keep_current or self._root_page is None or self.page is self._root_page:
+            return
+        try:
+            if self.page:
+                self.page.close()
+        except Exception as e:
+            logger.debug("关闭预取标签页失败: {}", e)
+        records = self.readiness.records
+        self.page = self._root_page
+        self.readiness, self.actions = self._root_helpers
+        self.readiness.records = records
+    
+    def _is_disconnected(self, error: Exception) -> bool:
+        """
+        判断异常是否由浏览器断开引起：异常类型属于断开类，或页面/浏览器连接已失效
+        
+        Args:
+            error: 异常
+            
+        Returns:
+            bool: 浏览器是否已断开
+        """
+        if self.retry_policy.classify(error) == 'reconnect':
+            return True
+        try:
+            return not (self.page and self.page.states.is_alive and self.page.browser.states.is_alive)
+        except Exception:
+            return True
+    
+    def _restart_browser(self, url: str, error: Exception) -> int:
+        """
+        浏览器断开后重新启动（或重新连接常驻浏览器），恢复登录并回到检查点记录的位置
+        
+        Args:
+            url: 任务的目标URL
+            error: 导致断开的异常
+            
+        Returns:
+            int: 接下来要截图的页码
+        """
+        if not self._owns_browser and not self.use_host:
+            logger.error("标签页由调用方提供，浏览器断开后无法重新启动")
+            raise error
+        
+        while True:
+            if self.browser_restarts >= self.max_browser_restarts:
+                raise RuntimeError(f"浏览器已重启 {self.browser_restarts} 次仍然断开，放弃任务") from error
+            self.browser_restarts += 1
+            logger.warning(f"浏览器连接已断开 ({type(error).__name__}: {str(error)})，"
+                           f"第 {self.browser_restarts}/{self.max_browser_restarts} 次重启浏览器...")
+            start = time.perf_counter()
+            try:
+                self._reconnect_browser()
+                self._navigate_to_url(url)
+                state = self.checkpoint.state
+                if state.last_page and not self._resume_from(state):
+                    raise RuntimeError(f"无法回到第 {state.last_page + 1} 页")
+                logger.success(f"浏览器已恢复，从第 {state.last_page + 1} 页继续截图")
+                return state.last_page + 1
+            except Exception as e:
+                logger.error(f"重启浏览器后恢复失败: {str(e)}")
+                error = e
+            finally:
+                downtime = time.perf_counter() - start
+                self.downtime += downtime
+                self.metrics.record('browser_restart', downtime, error=type(error).__name__)
+                self.metrics.increment('browser_restarts')
+                self.metrics.increment('downtime_seconds', round(downtime, 6))
+    
+    def _resume_from(self, state: CheckpointState) -> bool:
+        """
+        从检查点定位到上次完成页的下一页：翻页会改变URL时直接访问记录的URL再翻一页，
+        否则从第一页重放翻页点击（不截图）
+        
+        Args:
+            state: 检查点内容
+            
+        Returns:
+            bool: 是否成功定位
+        """
+        logger.info(f"从检查点续传: 已完成 {state.last_page} 页，"
+                    f"已有截图 {len(state.files)} 张，从第 {state.last_page + 1} 页继续")
+        
+        if state.url_addressable and state.page_url:
+            logger.info(f"直接访问上次完成的页面: {state.page_url}")
+            self.current_page_num = state.last_page
+            self.retry_policy.run(lambda: self._load_page(state.page_url, 'resume', state.last_page),
+                                  label='resume')
+            return self._go_to_next_page(state.max_pages - state.last_page)
+        
+        logger.info(f"重放 {state.last_page} 次翻页点击...")
+        for page_num in range(1, state.last_page + 1):
+            self.current_page_num = page_num
+            if not self._find_next_page_element():
+                logger.error(f"重放第 {page_num} 次翻页失败")
+                return False
+        return True
+    
     def start_screenshot_task(self, 
                             url: str, 
                             max_pages: int = 10,
-                            screenshot_dir: Optional[str] = None) -> Tuple[int, list]:
+                            screenshot_dir: Optional[str] = None,
+                            resume: bool = False,
+                            job_name: Optional[str] = None) -> Tuple[int, list]:
         """
         开始截图任务
         
@@ -484,59 +850,193 @@ class ScreenshotCrawler:
             url: 目标网页URL
             max_pages: 最大截图页数
             screenshot_dir: 截图保存目录（可选）
+            resume: 是否从截图目录中的检查点继续上次中断的任务
+            job_name: 任务名称（运行指标和日志中使用），默认使用截图目录名
             
         Returns:
             Tuple[int, list]: (成功截图数量, 截图文件路径列表)
         """
         if screenshot_dir:
             self.screenshot_dir = Path(screenshot_dir)
-            self.screenshot_dir.mkdir(exist_ok=True)
+        # 截图目录在任务开始时创建（创建爬虫对象不会写文件系统）
+        self.screenshot_dir.mkdir(parents=True, exist_ok=True)
         
         screenshot_files = []
+        self.encoder.reset_stats()
+        self.blocker.reset_stats()
+        self.tile_count = 0
+        self.duplicates = DuplicateDetector()
+        self._duplicates_synced = 0
+        self._prediction_enabled = self.pagination_mode == 'predict'
+        self.metrics = RunMetrics(url, job=job_name or self.screenshot_dir.name)
+        self.writer.metrics = self.metrics
+        self.writer.duplicates = self.duplicates
+        self.retry_policy.reset(self.metrics)
+        self.browser_restarts = 0
+        self.downtime = 0.0
+        error = None
         
-        try:
-            # 初始化浏览器
-            self._initialize_browser()
+        with logger.contextualize(run=self.metrics.run_id, job=self.metrics.job):
+            # 读取或新建检查点
+            self.checkpoint = RunCheckpoint(self.screenshot_dir)
+            resume_state = self.checkpoint.load(url) if resume else None
+            if resume_state:
+                resume_state.max_pages = max_pages
+                screenshot_files = list(resume_state.files)
+                start_page = resume_state.last_page + 1
+            else:
+                self.checkpoint.start(url, max_pages)
+                start_page = 1
             
-            # 访问目标网页
-            self._navigate_to_url(url)
+            try:
+                # 初始化浏览器
+                self._initialize_browser()
+                
+                # 访问目标网页
+                self._navigate_to_url(url)
+                
+                # 续传时先定位到上次完成的下一页
+                if resume_state and start_page <= max_pages:
+                    if not self._resume_from(resume_state):
+                        raise RuntimeError(f"无法定位到续传页面（第 {start_page} 页）")
 
-            logger.info(f"开始截图任务，最大页数: {max_pages}")
-            
-            for page_num in range(1, max_pages + 1):
-                try:
-                    logger.info(f"正在处理第 {page_num} 页...")
-                    
-                    # 截图
-                    screenshot_path = self._take_screenshot()
-                    screenshot_files.append(screenshot_path)
-                    
-                    # 如果不是最后一页，尝试翻页
-                    if page_num < max_pages:
-                        if not self._find_next_page_element():
-                            logger.info("无法找到下一页元素，可能已到最后一页")
-                            break
+                logger.info(f"开始截图任务，最大页数: {max_pages}")
+                
+                page_num = start_page
+                while page_num <= max_pages:
+                    with logger.contextualize(page=page_num):
+                        try:
+                            self.current_page_num = page_num
+                            page_url = self.page.url
+                            self.metrics.set_page(page_num, page_url)
+                            logger.info(f"正在处理第 {page_num} 页...")
+                            
+                            # 截图（整页分块截图近似重复时返回原文件路径，不重复加入列表）
+                            screenshot_path = self.retry_policy.run(self._take_screenshot, label='screenshot')
+                            if screenshot_path not in screenshot_files:
+                                screenshot_files.append(screenshot_path)
+                            
+                            # 记录本页已完成（原子写入检查点）
+                            self.checkpoint.record_page(page_num, page_url, self.page.title, screenshot_path)
+                            self._sync_duplicates()
+                            
+                            # 连续多次截图完全相同，说明翻页没有生效
+                            if self.duplicates.should_stop:
+                                logger.warning(f"连续 {self.duplicates.consecutive} 次截图完全相同，翻页可能已失效，结束任务")
+                                break
+                            
+                            # 如果不是最后一页，尝试翻页
+                            if page_num < max_pages:
+                                if not self._go_to_next_page(max_pages - page_num):
+                                    logger.info("无法找到下一页元素，可能已到最后一页")
+                                    break
+                            
+                        except Exception as e:
+                            if self._is_disconnected(e):
+                                # 浏览器断开：重启浏览器并回到检查点记录的位置，从未完成的页继续
+                                page_num = self._restart_browser(url, e)
+                                continue
+                            logger.error(f"处理第 {page_num} 页时出错: {str(e)}")
                     
-                except Exception as e:
-                    logger.error(f"处理第 {page_num} 页时出错: {str(e)}")
-                    continue
-            
-            logger.success(f"截图任务完成! 总共截图 {len(screenshot_files)} 张")
-            return len(screenshot_files), screenshot_files
+                    page_num += 1
+                
+                # 等待后台写入完成，剔除写入失败和近似重复（未写盘）的文件
+                results = self.writer.flush()
+                failed_files = {r.path for r in results if not r.success}
+                if failed_files:
+                    logger.warning(f"{len(failed_files)} 张截图写入失败")
+                skipped_files = failed_files | {r.path for r in results if r.duplicate_of}
+                screenshot_files = [f for f in screenshot_files if f not in skipped_files]
+                self._sync_duplicates()
+                self.checkpoint.mark_completed()
+                
+                logger.success(f"截图任务完成! 总共截图 {len(screenshot_files)} 张")
+                self.encoder.log_stats()
+                self.blocker.log_stats()
+                if self.tile_count:
+                    peak_rss = utils.get_peak_rss()
+                    logger.info(f"整页分块截图统计: 共 {self.tile_count} 个分块, "
+                                f"进程内存峰值 {utils.format_file_size(peak_rss) if peak_rss else '未知'}")
+                if self.duplicates.duplicates:
+                    logger.info(f"跳过近似重复截图 {len(self.duplicates.duplicates)} 张，"
+                                f"引用记录见 {self.screenshot_dir / 'duplicates.jsonl'}")
+                    self.duplicates.write_manifest(self.screenshot_dir)
+                
+                wait_stats = self.readiness.summary()
+                logger.info(f"页面就绪等待统计: 共 {wait_stats['count']} 次, "
+                            f"总计 {wait_stats['total']:.2f} 秒, 平均 {wait_stats['average']:.2f} 秒, "
+                            f"最长 {wait_stats['max']:.2f} 秒, 超时 {wait_stats['timeouts']} 次")
+                return len(screenshot_files), screenshot_files
+                
+            except Exception as e:
+                logger.error(f"截图任务失败: {str(e)}")
+                error = str(e)
+                raise
             
-        except Exception as e:
-            logger.error(f"截图任务失败: {str(e)}")
-            raise
+            finally:
+                self._cleanup()
+                self._export_metrics(screenshot_files, error)
+    
+    def _sync_duplicates(self) -> None:
+        """把写入线程新判定为近似重复的截图在检查点中改为原截图，续传时不会当作未写入的页面"""
+        found = self.duplicates.duplicates[self._duplicates_synced:]
+        self._duplicates_synced += len(found)
+        self.checkpoint.replace_files({record['file']: record['duplicate_of'] for record in found})
+    
+    def _export_metrics(self, screenshot_files: list, error: Optional[str]) -> None:
+        """
+        汇总本次任务的运行指标，输出各阶段耗时统计并导出运行报告
         
-        finally:
-            self._cleanup()
+        Args:
+            screenshot_files: 截图文件路径列表
+            error: 任务失败时的错误信息
+        """
+        self.metrics.finish()
+        blocked = self.blocker.stats()
+        self.metrics.info.update({
+            'success': error is None,
+            'error': error,
+            'screenshot_dir': str(self.screenshot_dir),
+            'capture_mode': self.capture_spec.mode,
+            'pagination_mode': self.pagination_mode,
+            'headless': self.headless,
+            'retry_budget': self.retry_policy.budget,
+        })
+        self.metrics.increment('retries', 0)
+        self.metrics.increment('retry_seconds', 0)
+        self.metrics.increment('browser_restarts', 0)
+        self.metrics.increment('downtime_seconds', 0)
+        if self.browser_restarts:
+            logger.info(f"浏览器断开后重启 {self.browser_restarts} 次，累计中断 {self.downtime:.1f} 秒")
+        self.metrics.increment('screenshots', len(screenshot_files))
+        self.metrics.increment('duplicates_skipped', len(self.duplicates.duplicates))
+        self.metrics.increment('tiles', self.tile_count)
+        self.metrics.increment('requests_blocked', blocked['blocked'])
+        self.metrics.log_summary()
+        
+        if self.metrics_enabled:
+            report_path = self.metrics.export()
+            if report_path:
+                logger.info(f"运行指标已导出: {report_path}")
     
     def _cleanup(self) -> None:
         """清理资源"""
         try:
+            # 先写完队列中剩余的截图
+            self.writer.close()
+            
+            # 关闭预取标签页，切换回任务开始时的页面
+            self._stop_prefetch()
+            
             if self.page:
-                self.page.quit()
-                logger.info("浏览器已关闭")
+                if self._owns_browser:
+                    self.page.quit()
+                    logger.info("浏览器已关闭")
+                else:
+                    self.page.close()
+                    logger.info("标签页已关闭")
+                self.page = None
+                self._root_page = None
         except Exception as e:
             logger.warning(f"清理资源时出现警告: {str(e)}")
     
@@ -548,6 +1048,27 @@ class ScreenshotCrawler:
         """上下文管理器出口"""
         self._cleanup()
     
+    def take_screenshot(self) -> Optional[str]:
+        """
+        公共方法：对当前页面截图并等待写入完成（截图任务中写入在后台进行，单独截图时需要等待）
+        
+        Returns:
+            Optional[str]: 截图文件路径（近似重复时为原截图路径），截图或写入失败时返回None
+        """
+        if not self.page:
+            logger.error("浏览器未初始化，无法截图")
+            return None
+        
+        screenshot_path = self._take_screenshot()
+        for result in self.writer.flush():
+            if result.path != str(screenshot_path):
+                continue
+            if not result.success:
+                return None
+            if result.duplicate_of:
+                return result.duplicate_of
+        return screenshot_path or None
+    
     def click_first_a_tag(self) -> bool:
         """
         公共方法：点击页面中的第一个A标签
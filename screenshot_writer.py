@@ -0,0 +1,166 @@
+"""
+截图后台写入模块
+截图时只从浏览器取回图片字节并放入有界队列，由写入线程池负责编码和落盘：
+1. 按配置的输出格式编码后写入临时文件，fsync 后原子替换为目标文件
+2. 设置了重复截图检测器时，先检查是否与已保存的截图近似重复，重复的截图不写盘
+3. 队列已满时提交方阻塞等待（背压），避免内存无限增长
+4. flush() 等待队列清空并返回每个文件的写入结果
+"""
+
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from loguru import logger
+
+import config
+import utils
+from image_encoder import ImageEncoder, encoder_processes
+
+
+@dataclass
+class WriteResult:
+    """单个截图文件的写入结果"""
+
+    path: str
+    size: int = 0
+    raw_size: int = 0
+    page_num: Optional[int] = None
+    error: Optional[str] = None
+    # 与已保存的截图近似重复时为原截图路径（本文件没有写盘）
+    duplicate_of: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+class ScreenshotWriter:
+    """截图后台写入线程池"""
+
+    def __init__(self, workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 encoder: Optional[ImageEncoder] = None):
+        """
+        初始化写入线程池（线程在第一次提交时启动）
+
+        Args:
+            workers: 写入线程数量
+            queue_size: 待写入队列的最大长度，队列满时提交会阻塞
+            encoder: 截图编码器（可选），不传时直接写入原始字节
+        """
+        self.encoder = encoder
+        self.workers = max(1, workers or getattr(config, 'SCREENSHOT_WRITER_THREADS', 2))
+        if encoder is not None and not encoder.passthrough:
+            # 每个写入线程同一时间只占用一个编码进程，线程数不少于进程数才能用满进程池
+            self.workers = max(self.workers, encoder_processes())
+        self.queue_size = max(1, queue_size or getattr(config, 'SCREENSHOT_QUEUE_SIZE', 8))
+        self._queue: Optional[queue.Queue] = None
+        self._threads: List[threading.Thread] = []
+        self._results: List[WriteResult] = []
+        self._results_lock = threading.Lock()
+        # 运行指标（可选），记录每张截图编码和写入的耗时
+        self.metrics = None
+        # 重复截图检测器（可选），每次截图任务开始时设置
+        self.duplicates = None
+
+    def submit(self, filepath: Path, data: bytes, page_num: Optional[int] = None) -> None:
+        """
+        提交一张截图等待写入，队列已满时阻塞
+
+        Args:
+            filepath: 目标文件路径
+            data: 图片字节
+            page_num: 页码（可选，用于日志和结果记录）
+        """
+        if self._queue is None:
+            self._start()
+        self._queue.put((Path(filepath), data, page_num))
+
+    def flush(self) -> List[WriteResult]:
+        """
+        等待队列中的截图全部写入
+
+        Returns:
+            List[WriteResult]: 自上次 flush 以来的写入结果
+        """
+        if self._queue is not None:
+            self._queue.join()
+        with self._results_lock:
+            results, self._results = self._results, []
+        return results
+
+    def close(self) -> List[WriteResult]:
+        """
+        写完剩余截图并停止写入线程（之后再次提交会重新启动线程）
+
+        Returns:
+            List[WriteResult]: 尚未通过 flush 取走的写入结果
+        """
+        results = self.flush()
+        if self._queue is not None:
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+            self._queue = None
+        return results
+
+    def _start(self) -> None:
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"screenshot-writer-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                result = self._write(*item)
+                with self._results_lock:
+                    self._results.append(result)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, filepath: Path, data: bytes, page_num: Optional[int]) -> WriteResult:
+        """编码后写入临时文件并原子替换为目标文件（近似重复的截图删除占位文件，不写盘）"""
+        tmp_path = filepath.with_name(f".{filepath.name}.tmp")
+        start = time.perf_counter()
+        try:
+            raw_size = len(data)
+            duplicate_of = self.duplicates.check(data, str(filepath), page_num) if self.duplicates is not None else None
+            if duplicate_of:
+                if filepath.exists() and filepath.stat().st_size == 0:
+                    filepath.unlink()
+                return WriteResult(path=str(filepath), raw_size=raw_size, page_num=page_num,
+                                   duplicate_of=duplicate_of)
+            if self.encoder is not None:
+                data = self.encoder.encode(data)
+
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+
+            size = len(data)
+            if self.metrics is not None:
+                self.metrics.record('encode_write', time.perf_counter() - start, page=page_num)
+            logger.bind(page=page_num).success(f"截图保存成功: {filepath.name} (大小: {utils.format_file_size(size)})")
+            return WriteResult(path=str(filepath), size=size, raw_size=raw_size, page_num=page_num)
+        except Exception as e:
+            logger.bind(page=page_num).error(f"截图写入失败: {filepath.name} - {str(e)}")
+            for path in (tmp_path, filepath):
+                try:
+                    if path.exists() and (path == tmp_path or path.stat().st_size == 0):
+                        path.unlink()
+                except OSError:
+                    pass
+            return WriteResult(path=str(filepath), page_num=page_num, error=str(e))
@@ -0,0 +1,206 @@
+"""
+登录会话持久化模块
+登录成功后把 Cookie 和 localStorage 加密保存到本地，按站点和账号区分；
+下次运行时在首次访问前恢复，校验有效后即可跳过交互式登录。
+加密使用 cryptography 的 Fernet，密钥来自环境变量 SESSION_STORE_KEY 或本地密钥文件。
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from loguru import logger
+
+import config
+
+# 在目标源的新文档中、页面脚本执行前写入 localStorage（每个标签页会话只写一次）
+RESTORE_STORAGE_SCRIPT = """
+(function () {
+    var origin = %s, items = %s;
+    if (location.origin !== origin || sessionStorage.getItem('__dacRestored')) { return; }
+    for (var key in items) {
+        if (Object.prototype.hasOwnProperty.call(items, key)) { localStorage.setItem(key, items[key]); }
+    }
+    sessionStorage.setItem('__dacRestored', '1');
+})();
+"""
+
+
+class SessionStore:
+    """加密的本地登录会话存储"""
+
+    def __init__(self, store_dir: Optional[Path] = None, max_age_hours: Optional[float] = None):
+        """
+        初始化会话存储
+
+        Args:
+            store_dir: 会话文件保存目录，默认使用 config.SESSION_STORE_DIR
+            max_age_hours: 会话最长保留时间（小时），超过后视为过期
+        """
+        self.store_dir = Path(store_dir or getattr(config, 'SESSION_STORE_DIR',
+                                                   config.PROJECT_ROOT / "sessions"))
+        self.max_age = (max_age_hours if max_age_hours is not None
+                        else getattr(config, 'SESSION_MAX_AGE_HOURS', 12)) * 3600
+        self.enabled = getattr(config, 'SESSION_STORE_ENABLED', True)
+        # 加密器在第一次读写会话时加载（创建对象时不导入 cryptography、不读写密钥文件）
+        self._fernet = None
+        # 上次恢复会话时注册的 localStorage 初始化脚本，重试恢复前先移除，避免重复注册
+        self._restore_script_id = None
+
+    def _cipher(self):
+        """取得加密器（首次调用时加载），加载失败时停用会话存储"""
+        if self._fernet is None and self.enabled:
+            self._fernet = self._load_cipher()
+            if self._fernet is None:
+                self.enabled = False
+        return self._fernet
+
+    def _load_cipher(self):
+        """加载（或首次生成）加密密钥"""
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            logger.warning("未安装cryptography，登录会话不会被保存: pip install cryptography")
+            return None
+
+        key = os.environ.get("SESSION_STORE_KEY")
+        if not key:
+            key_file = Path(getattr(config, 'SESSION_KEY_FILE', config.PROJECT_ROOT / ".session.key"))
+            try:
+                if key_file.exists():
+                    key = key_file.read_text(encoding="utf-8").strip()
+                else:
+                    key = Fernet.generate_key().decode()
+                    fd = os.open(key_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        f.write(key)
+                    logger.info(f"已生成会话加密密钥: {key_file}")
+            except OSError as e:
+                logger.warning(f"读取会话加密密钥失败，登录会话不会被保存: {str(e)}")
+                return None
+        return Fernet(key.encode() if isinstance(key, str) else key)
+
+    def _session_path(self, url: str, account: str) -> Path:
+        site = urlparse(url).netloc.lower()
+        digest = hashlib.sha256(f"{site}|{account}".encode("utf-8")).hexdigest()[:16]
+        return self.store_dir / f"{digest}.session"
+
+    def load(self, url: str, account: str) -> Optional[Dict[str, Any]]:
+        """
+        读取站点和账号对应的会话
+
+        Args:
+            url: 目标网页URL（按域名区分站点）
+            account: 登录账号
+
+        Returns:
+            Optional[Dict[str, Any]]: 会话数据，不存在、无法解密或已过期时返回None
+        """
+        if not self.enabled:
+            return None
+        path = self._session_path(url, account)
+        if not path.exists() or self._cipher() is None:
+            return None
+        try:
+            session = json.loads(self._fernet.decrypt(path.read_bytes()))
+        except Exception as e:
+            logger.warning(f"读取已保存的登录会话失败: {str(e)}")
+            return None
+        if time.time() - session.get("saved_at", 0) > self.max_age:
+            logger.info("已保存的登录会话已过期")
+            self.invalidate(url, account)
+            return None
+        return session
+
+    def save(self, page, url: str, account: str) -> bool:
+        """
+        保存当前页面的 Cookie 和 localStorage
+
+        Args:
+            page: DrissionPage 页面或标签页对象
+            url: 目标网页URL
+            account: 登录账号
+
+        Returns:
+            bool: 是否保存成功
+        """
+        if not self.enabled or self._cipher() is None:
+            return False
+        try:
+            parsed = urlparse(page.url)
+            session = {
+                "site": urlparse(url).netloc.lower(),
+                "account": account,
+                "origin": f"{parsed.scheme}://{parsed.netloc}",
+                "saved_at": time.time(),
+                "cookies": [dict(c) for c in page.cookies(all_info=True)],
+                "local_storage": json.loads(
+                    page.run_js("return JSON.stringify(Object.assign({}, localStorage));") or "{}"),
+            }
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            path = self._session_path(url, account)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(self._fernet.encrypt(json.dumps(session).encode("utf-8")))
+            os.replace(tmp_path, path)
+            logger.info(f"登录会话已保存 ({len(session['cookies'])} 个Cookie)")
+            return True
+        except Exception as e:
+            logger.warning(f"保存登录会话失败: {str(e)}")
+            return False
+
+    def restore(self, page, url: str, account: str) -> bool:
+        """
+        在访问目标网页前恢复会话：写入 Cookie，并注册在目标源写入 localStorage 的初始化脚本
+
+        Args:
+            page: DrissionPage 页面或标签页对象
+            url: 目标网页URL
+            account: 登录账号
+
+        Returns:
+            bool: 是否恢复了会话
+        """
+        session = self.load(url, account)
+        if not session:
+            return False
+        try:
+            if session.get("cookies"):
+                page.set.cookies(session["cookies"])
+            self.discard_restore(page)
+            if session.get("local_storage"):
+                self._restore_script_id = page.add_init_js(
+                    RESTORE_STORAGE_SCRIPT % (json.dumps(session["origin"]), json.dumps(session["local_storage"])))
+            age = (time.time() - session["saved_at"]) / 60
+            logger.info(f"已恢复保存的登录会话（保存于 {age:.0f} 分钟前）")
+            return True
+        except Exception as e:
+            logger.warning(f"恢复登录会话失败: {str(e)}")
+            return False
+
+    def discard_restore(self, page) -> None:
+        """
+        移除上次恢复会话时注册的 localStorage 初始化脚本（会话失效后不再写回旧数据）
+
+        Args:
+            page: DrissionPage 页面或标签页对象
+        """
+        if self._restore_script_id is None:
+            return
+        try:
+            page.remove_init_js(self._restore_script_id)
+        except Exception as e:
+            logger.debug("移除会话恢复脚本失败: {}", e)
+        self._restore_script_id = None
+
+    def invalidate(self, url: str, account: str) -> None:
+        """删除站点和账号对应的会话"""
+        try:
+            self._session_path(url, account).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"删除登录会话失败: {str(e)}")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+启动开销基准测试
+在全新的子进程中用 python -X importtime 导入各入口模块，统计导入耗时并与记录的预算对比：
+1. 每个模块多次测量取中位数（子进程互不影响，不受已导入模块缓存干扰）
+2. 列出导入最慢的依赖，便于定位新增的启动开销
+3. 同时检查导入时没有写文件系统（不会创建截图目录、日志目录）
+4. 任一模块超出预算或导入时写了文件系统时退出码为1，可放在CI或提交前检查中运行
+
+使用方法：
+    python startup_benchmark.py                 # 检查所有入口模块
+    python startup_benchmark.py --runs 10 --top 15
+    python startup_benchmark.py --module worker_pool
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).parent
+
+# 各入口模块的导入耗时预算（毫秒，-X importtime 统计的累计耗时）
+# 记录时的实测中位数约为：screenshot_crawler 125、tab_pool 125、run_crawler 95、
+# worker_pool 70、browser_host 70、benchmark 95、batch_runner 120、scheduler 130
+# （延迟导入 DrissionPage 前 screenshot_crawler 约 300）；其中约 60 毫秒是 loguru 本身
+STARTUP_BUDGET_MS: Dict[str, float] = {
+    "screenshot_crawler": 200,
+    "run_crawler": 200,
+    "tab_pool": 200,
+    "worker_pool": 150,
+    "browser_host": 150,
+    "benchmark": 200,
+    "batch_runner": 200,
+    "scheduler": 200,
+}
+
+# 这些依赖导入很慢，入口模块导入时不应加载（只在启动浏览器、解码图片时导入）
+LAZY_DEPENDENCIES = ("DrissionPage", "PIL", "cryptography")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    在新的子进程中导入模块并解析 -X importtime 输出
+
+    Args:
+        module: 模块名
+
+    Returns:
+        Tuple[float, List[Tuple[str, float]]]: (模块累计导入耗时（毫秒）, 各依赖的 (模块名, 自身耗时毫秒))
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败: {result.stderr.strip().splitlines()[-1:]}")
+
+    total = None
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append((name, int(self_us) / 1000))
+        if name == module and len(indent) <= 1:
+            total = int(cumulative_us) / 1000
+    if total is None:
+        raise RuntimeError(f"未能解析 {module} 的导入耗时")
+    return total, modules
+
+
+def check_import_side_effects(module: str) -> List[str]:
+    """
+    在临时工作目录中导入模块，检查导入时是否创建了文件或目录，以及是否加载了慢依赖
+
+    Args:
+        module: 模块名
+
+    Returns:
+        List[str]: 发现的问题（为空表示没有问题）
+    """
+    before = {p.name for p in PROJECT_ROOT.iterdir()}
+    with tempfile.TemporaryDirectory() as workdir:
+        script = (f"import sys; sys.path.insert(0, {str(PROJECT_ROOT)!r}); import {module}; "
+                  f"print(','.join(m for m in {LAZY_DEPENDENCIES!r} if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", script], cwd=workdir, capture_output=True, text=True)
+        created = sorted(p.name for p in Path(workdir).iterdir())
+    created += sorted({p.name for p in PROJECT_ROOT.iterdir()} - before - {"__pycache__"})
+
+    problems = []
+    if result.returncode != 0:
+        return [f"导入失败: {result.stderr.strip().splitlines()[-1:]}"]
+    if created:
+        problems.append(f"导入时创建了 {', '.join(created)}")
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    if loaded:
+        problems.append(f"导入时加载了 {', '.join(loaded)}")
+    return problems
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="启动开销基准测试（python -X importtime）")
+    parser.add_argument("--module", action="append", default=None,
+                        help="只测量指定模块（可重复），默认测量所有记录了预算的入口模块")
+    parser.add_argument("--runs", type=int, default=5, help="每个模块的测量次数（取中位数）")
+    parser.add_argument("--top", type=int, default=8, help="列出自身导入最慢的依赖数量")
+    args = parser.parse_args()
+
+    modules = args.module or list(STARTUP_BUDGET_MS)
+    failed = False
+    slowest: Dict[str, float] = {}
+    print(f"⏱️  启动开销（{args.runs} 次测量取中位数）:")
+    for module in modules:
+        budget: Optional[float] = STARTUP_BUDGET_MS.get(module)
+        try:
+            samples = []
+            for _ in range(max(1, args.runs)):
+                total, imported = measure_import(module)
+                samples.append(total)
+                for name, self_ms in imported:
+                    slowest[name] = max(slowest.get(name, 0), self_ms)
+            problems = check_import_side_effects(module)
+        except RuntimeError as e:
+            print(f"   ❌ {module}: {e}")
+            failed = True
+            continue
+
+        median = statistics.median(samples)
+        over = budget is not None and median > budget
+        failed = failed or over or bool(problems)
+        status = "❌" if over or problems else "✅"
+        budget_text = f" / 预算 {budget:.0f} 毫秒" if budget is not None else ""
+        print(f"   {status} {module}: {median:.1f} 毫秒{budget_text}"
+              f"（最小 {min(samples):.1f}，最大 {max(samples):.1f}）")
+        for problem in problems:
+            print(f"      ⚠️  {problem}")
+
+    if args.top > 0 and slowest:
+        print(f"\n🐢 自身导入最慢的 {args.top} 个模块:")
+        for name, self_ms in sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+            print(f"   {self_ms:7.1f} 毫秒  {name}")
+
+    print("\n❌ 启动开销超出预算或导入有副作用" if failed else "\n✅ 启动开销在预算内")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
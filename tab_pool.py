@@ -0,0 +1,133 @@
+"""
+多标签页并行截图模块
+在同一个浏览器实例中，用有限数量的标签页并行执行一批截图任务：
+1. 只启动一次浏览器，并先在主标签页中完成一次登录
+2. 每个任务在独立的标签页中运行自己的翻页循环
+3. 每个任务的截图保存到各自的子目录
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, List, Optional, Union
+
+from loguru import logger
+
+import config
+from jobs import CaptureJob, JobResult
+from screenshot_crawler import ScreenshotCrawler
+
+
+class TabPool:
+    """单浏览器多标签页截图任务池"""
+
+    def __init__(self, pool_size: Optional[int] = None, headless: Optional[bool] = None,
+                 interactive: Optional[bool] = None):
+        """
+        初始化标签页任务池
+
+        Args:
+            pool_size: 同时打开的最大标签页数量，默认使用 config.TAB_POOL_SIZE
+            headless: 是否使用无头模式，默认使用 config.BROWSER_HEADLESS
+            interactive: 需要登录时是否等待手动输入密码，默认使用 config.LOGIN_INTERACTIVE
+        """
+        self.pool_size = max(1, pool_size or getattr(config, 'TAB_POOL_SIZE', 4))
+        self.headless = headless
+        self.interactive = interactive
+        self._host: Optional[ScreenshotCrawler] = None
+
+    def run(self, jobs: Iterable[Union[CaptureJob, str]],
+            on_result: Optional[Callable[[int, JobResult], None]] = None) -> List[JobResult]:
+        """
+        并行执行一批截图任务
+
+        Args:
+            jobs: 截图任务列表，元素可以是 CaptureJob 或 URL 字符串
+            on_result: 每个任务结束时调用（在调用 run 的线程中），参数为 (任务在列表中的位置, 结果)
+
+        Returns:
+            List[JobResult]: 与输入顺序一致的任务结果列表
+
+        Raises:
+            ValueError: 任务使用了不同的登录账号
+        """
+        jobs = [job if isinstance(job, CaptureJob) else CaptureJob(url=job) for job in jobs]
+        if not jobs:
+            return []
+
+        # 标签页共享同一浏览器的登录状态，不同账号的任务会以第一个账号的会话截图
+        accounts = sorted({job.account or config.LOGIN_USERNAME for job in jobs})
+        if len(accounts) > 1:
+            raise ValueError(f"多标签页任务池只能使用一个登录账号，当前任务使用了 {', '.join(accounts)}；"
+                             f"多个账号的任务请使用多进程任务池")
+
+        logger.info(f"开始批量截图: {len(jobs)} 个任务, 标签页并发数 {self.pool_size}")
+        start = time.perf_counter()
+
+        self._host = ScreenshotCrawler(headless=self.headless, account=jobs[0].account,
+                                       interactive=self.interactive)
+        try:
+            self._host._initialize_browser()
+            # 先在主标签页中访问一次，让登录只发生一次，其余标签页共享同一浏览器的会话
+            # （预热失败不影响任务：每个任务在自己的标签页中仍会访问并按需登录，失败只记在该任务上）
+            try:
+                self._host._navigate_to_url(jobs[0].url)
+            except Exception as e:
+                logger.warning(f"主标签页预热失败，各任务将分别访问目标网页: {str(e)}")
+
+            results: List[Optional[JobResult]] = [None] * len(jobs)
+            with ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="tab") as executor:
+                futures = {executor.submit(self._run_job, job, index): index - 1
+                           for index, job in enumerate(jobs, 1)}
+                for future in as_completed(futures):
+                    position = futures[future]
+                    results[position] = future.result()
+                    if on_result:
+                        on_result(position, results[position])
+        finally:
+            self._host._cleanup()
+            self._host = None
+
+        succeeded = sum(1 for r in results if r.success)
+        logger.success(f"批量截图完成: 成功 {succeeded}/{len(results)} 个任务, "
+                       f"耗时 {time.perf_counter() - start:.1f} 秒")
+        return results
+
+    def _run_job(self, job: CaptureJob, index: int) -> JobResult:
+        """在新标签页中执行单个任务"""
+        start = time.perf_counter()
+        output_dir = job.output_dir(index)
+        try:
+            tab = self._host.page.browser.new_tab()
+            crawler = ScreenshotCrawler(headless=self.headless, page=tab, capture_mode=job.capture_mode,
+                                        account=job.account, interactive=self.interactive)
+            count, files = crawler.start_screenshot_task(
+                url=job.url,
+                max_pages=job.max_pages,
+                screenshot_dir=str(output_dir),
+                resume=job.resume
+            )
+            return JobResult(job=job, success=True, screenshot_count=count, files=files,
+                             duration=time.perf_counter() - start)
+        except Exception as e:
+            logger.error(f"任务 {index} ({job.url}) 失败: {str(e)}")
+            return JobResult(job=job, success=False, error=str(e),
+                             duration=time.perf_counter() - start)
+
+
+def capture_batch(jobs: Iterable[Union[CaptureJob, str]],
+                  pool_size: Optional[int] = None,
+                  headless: Optional[bool] = None,
+                  on_result: Optional[Callable[[int, JobResult], None]] = None) -> List[JobResult]:
+    """
+    便捷函数：在一个浏览器中用多个标签页并行执行截图任务
+
+    Args:
+        jobs: 截图任务列表（CaptureJob 或 URL 字符串）
+        pool_size: 最大并发标签页数量
+        headless: 是否使用无头模式，默认使用 config.BROWSER_HEADLESS
+        on_result: 每个任务结束时调用，参数为 (任务在列表中的位置, 结果)
+
+    Returns:
+        List[JobResult]: 任务结果列表
+    """
+    return TabPool(pool_size=pool_size, headless=headless).run(jobs, on_result=on_result)
@@ -63,8 +63,11 @@ def test_cal_a_tag():
                 # 可选：截图查看结果
                 save_screenshot = input("是否截图查看结果？(y/N): ").strip().lower()
                 if save_screenshot in ['y', 'yes']:
-                    screenshot_path = crawler._take_screenshot()
-                    print(f"📸 截图已保存: {screenshot_path}")
+                    screenshot_path = crawler.take_screenshot()
+                    if screenshot_path:
+                        print(f"📸 截图已保存: {screenshot_path}")
+                    else:
+                        print(f"❌ 截图保存失败")
                     
             else:
                 print(f"\n⚠️  测试失败")
@@ -0,0 +1,19 @@
+"""
+测试公共配置
+把项目根目录加入导入路径；没有本地 config.py 时使用 config.example.py 中的默认配置
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+try:
+    import config  # noqa: F401
+except ImportError:
+    _spec = importlib.util.spec_from_file_location("config", PROJECT_ROOT / "config.example.py")
+    _config = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_config)
+    sys.modules["config"] = _config
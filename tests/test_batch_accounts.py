@@ -0,0 +1,27 @@
+"""批量任务登录账号检查测试"""
+
+import pytest
+
+import config
+from batch_runner import JobFileError, check_accounts
+from jobs import CaptureJob
+from tab_pool import TabPool
+
+URL = "https://example.com/attendance"
+
+
+def test_tabs_mode_rejects_mixed_accounts():
+    jobs = [CaptureJob(url=URL), CaptureJob(url=URL, account="bob")]
+    with pytest.raises(JobFileError, match="bob"):
+        check_accounts(jobs, "tabs")
+    check_accounts(jobs, "workers")
+
+
+def test_default_account_counts_as_the_configured_username():
+    jobs = [CaptureJob(url=URL), CaptureJob(url=URL, account=config.LOGIN_USERNAME)]
+    check_accounts(jobs, "tabs")
+
+
+def test_tab_pool_refuses_mixed_accounts_before_starting_browser():
+    with pytest.raises(ValueError, match="多进程任务池"):
+        TabPool().run([CaptureJob(url=URL, account="alice"), CaptureJob(url=URL, account="bob")])
@@ -0,0 +1,85 @@
+"""断点续传检查点测试"""
+
+import json
+
+import pytest
+
+import checkpoint as checkpoint_module
+from checkpoint import CHECKPOINT_FILENAME, RunCheckpoint
+
+URL = "https://example.com/attendance"
+
+
+def _shot(directory, name, content=b"png"):
+    path = directory / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def _run(directory, pages):
+    checkpoint = RunCheckpoint(directory)
+    checkpoint.start(URL, max_pages=10)
+    for page_num in range(1, pages + 1):
+        checkpoint.record_page(page_num, f"{URL}?page={page_num}", f"第{page_num}页",
+                               _shot(directory, f"{page_num}.png"))
+    return checkpoint
+
+
+def test_resume_from_last_recorded_page(tmp_path):
+    _run(tmp_path, 3)
+
+    state = RunCheckpoint(tmp_path).load(URL)
+    assert state.last_page == 3
+    assert state.page_url == f"{URL}?page=3"
+    assert state.url_addressable
+    assert state.files == [str(tmp_path / f"{i}.png") for i in (1, 2, 3)]
+
+    saved = json.loads((tmp_path / CHECKPOINT_FILENAME).read_text(encoding="utf-8"))
+    assert saved["last_page"] == 3 and saved["completed"] is False
+
+
+def test_completed_or_foreign_checkpoint_is_not_resumed(tmp_path):
+    checkpoint = _run(tmp_path, 2)
+    assert RunCheckpoint(tmp_path).load("https://example.com/other") is None
+
+    checkpoint.mark_completed()
+    assert RunCheckpoint(tmp_path).load(URL) is None
+
+
+def test_rolls_back_to_first_unwritten_screenshot(tmp_path):
+    _run(tmp_path, 4)
+    (tmp_path / "3.png").write_bytes(b"")   # 分配了序号但崩溃前没有写入
+    (tmp_path / "4.png").unlink()
+
+    state = RunCheckpoint(tmp_path).load(URL)
+    assert state.last_page == 2
+
+
+def test_corrupt_checkpoint_starts_over(tmp_path):
+    (tmp_path / CHECKPOINT_FILENAME).write_text("{not json", encoding="utf-8")
+    assert RunCheckpoint(tmp_path).load(URL) is None
+
+
+def test_save_is_atomic(tmp_path, monkeypatch):
+    checkpoint = _run(tmp_path, 1)
+    before = (tmp_path / CHECKPOINT_FILENAME).read_text(encoding="utf-8")
+
+    def crash(src, dst):
+        raise OSError("磁盘已满")
+    monkeypatch.setattr(checkpoint_module.os, "replace", crash)
+    checkpoint.record_page(2, f"{URL}?page=2", "第2页", _shot(tmp_path, "2.png"))
+
+    # 替换失败时原检查点保持完整，不会留下写了一半的文件
+    assert (tmp_path / CHECKPOINT_FILENAME).read_text(encoding="utf-8") == before
+    assert RunCheckpoint(tmp_path).load(URL).last_page == 1
+
+
+def test_skipped_duplicate_points_to_original_and_stays_resumable(tmp_path):
+    checkpoint = _run(tmp_path, 3)
+    # 写入线程判定第2页与第1页近似重复，占位文件已删除
+    (tmp_path / "2.png").unlink()
+    checkpoint.replace_files({str(tmp_path / "2.png"): str(tmp_path / "1.png")})
+
+    state = RunCheckpoint(tmp_path).load(URL)
+    assert state.last_page == 3
+    assert state.files == [str(tmp_path / "1.png"), str(tmp_path / "3.png")]
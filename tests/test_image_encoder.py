@@ -0,0 +1,45 @@
+"""截图编码测试"""
+
+import io
+import multiprocessing
+
+import pytest
+from PIL import Image
+
+from image_encoder import ImageEncoder
+
+
+def _png(color=(200, 30, 30), size=(64, 48)) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, "PNG")
+    return output.getvalue()
+
+
+def _encode_in_child(result_queue) -> None:
+    try:
+        encoded = ImageEncoder(fmt="JPEG", quality=80).encode(_png())
+        result_queue.put(("ok", encoded[:3]))
+    except BaseException as e:  # 把子进程中的异常带回测试进程
+        result_queue.put(("error", repr(e)))
+
+
+def test_png_without_compress_level_is_passed_through():
+    data = _png()
+    encoder = ImageEncoder(fmt="PNG", compress_level=None)
+
+    assert encoder.encode(data) is data
+    assert encoder.stats()["bytes_saved"] == 0
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="需要 fork 启动方式")
+def test_encodes_inside_daemon_worker_process():
+    # 多进程任务池的工作进程是守护进程，不能再启动编码进程池
+    ctx = multiprocessing.get_context("fork")
+    result_queue = ctx.Queue()
+    process = ctx.Process(target=_encode_in_child, args=(result_queue,), daemon=True)
+    process.start()
+    status, value = result_queue.get(timeout=30)
+    process.join(timeout=30)
+
+    assert status == "ok", value
+    assert value == b"\xff\xd8\xff"  # JPEG 文件头
@@ -0,0 +1,99 @@
+"""重复截图检测测试"""
+
+import io
+import json
+
+import pytest
+from PIL import Image, ImageDraw
+
+import config
+from image_hash import DuplicateDetector, dhash, hamming_distance
+from screenshot_writer import ScreenshotWriter
+
+
+def _calendar(month: int, size=(800, 600)) -> bytes:
+    """模拟日历页面：相同的版式，只有标题和少量日期格子不同"""
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, size[0], 60), fill=(40, 90, 160))
+    draw.text((20, 20), f"2024 - {month:02d}", fill="white")
+    for day in range(28 + month % 4):
+        x, y = 20 + (day % 7) * 110, 80 + (day // 7) * 100
+        draw.rectangle((x, y, x + 100, y + 90), outline="black")
+        draw.text((x + 5, y + 5), str(day + 1), fill="black")
+    output = io.BytesIO()
+    image.save(output, "PNG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setattr(config, "DUPLICATE_DETECTION", True, raising=False)
+    return DuplicateDetector(threshold=4, max_consecutive=2)
+
+
+def test_near_duplicate_skip_is_disabled_by_default(monkeypatch):
+    monkeypatch.delattr(config, "DUPLICATE_DETECTION", raising=False)
+    detector = DuplicateDetector(max_consecutive=2)
+    data = _calendar(1)
+
+    assert detector.check(data, "1.png") is None
+    assert detector.check(data, "2.png") is None
+    # 翻页失效（截图完全相同）的检测始终启用
+    for _ in range(3):
+        detector.observe(data)
+    assert detector.consecutive == 2 and detector.should_stop
+
+
+def test_identical_screenshot_refers_to_saved_file(detector):
+    data = _calendar(1)
+
+    assert detector.check(data, "1.png", page_num=1) is None
+    assert detector.check(data, "2.png", page_num=2) == "1.png"
+    assert detector.duplicates == [{"page": 2, "file": "2.png", "duplicate_of": "1.png", "distance": 0}]
+
+
+def test_manifest_lists_only_existing_files(detector, tmp_path):
+    data = _calendar(1)
+    detector.check(data, "1.png", page_num=1)
+    detector.check(data, "2.png", page_num=2)
+    detector.write_manifest(tmp_path)
+
+    record = json.loads((tmp_path / "duplicates.jsonl").read_text(encoding="utf-8"))
+    assert record["duplicate_of"] == "1.png" and "file" not in record
+
+
+@pytest.mark.parametrize("month", [2, 3, 4])
+def test_months_with_similar_layout_are_not_duplicates(detector, month):
+    # 9x8 的哈希把这些页面都判为近似重复（距离 0-3），32x32 的哈希可以区分
+    assert hamming_distance(dhash(_calendar(1)), dhash(_calendar(month))) > detector.threshold
+    assert detector.check(_calendar(1), "1.png") is None
+    assert detector.check(_calendar(month), "2.png") is None
+
+
+def test_only_byte_identical_screenshots_stop_the_run(detector):
+    detector.observe(_calendar(1))
+    detector.observe(_calendar(2))
+    assert detector.consecutive == 0
+
+    detector.observe(_calendar(2))
+    assert detector.consecutive == 1 and not detector.should_stop
+    detector.observe(_calendar(2))
+    assert detector.should_stop
+
+    detector.observe(_calendar(3))
+    assert detector.consecutive == 0
+
+
+def test_writer_skips_duplicates_and_removes_placeholder(detector, tmp_path):
+    writer = ScreenshotWriter(workers=1)
+    writer.duplicates = detector
+    data = _calendar(1)
+    for name in ("1.png", "2.png"):
+        (tmp_path / name).touch()  # 分配器创建的占位文件
+        writer.submit(tmp_path / name, data)
+    results = {r.path: r for r in writer.close()}
+
+    assert (tmp_path / "1.png").read_bytes() == data
+    assert not (tmp_path / "2.png").exists()
+    assert results[str(tmp_path / "2.png")].duplicate_of == str(tmp_path / "1.png")
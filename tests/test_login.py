@@ -0,0 +1,39 @@
+"""非交互式登录测试"""
+
+import pytest
+
+from metrics import RunMetrics
+from screenshot_crawler import LoginRequiredError, ScreenshotCrawler
+
+
+def _crawler(interactive: bool, probe: dict) -> ScreenshotCrawler:
+    # 不经过 __init__，避免初始化日志和目录；只设置登录流程用到的属性
+    crawler = ScreenshotCrawler.__new__(ScreenshotCrawler)
+    crawler.interactive = interactive
+    crawler.account = "tester"
+    crawler.metrics = RunMetrics()
+    crawler._probe_login_state = lambda: probe
+    # 没有用户名输入框时交互式登录流程直接判定为已登录，不会等待输入密码
+    crawler._complete_login = lambda probe: (probe['selector'] is None
+                                             or pytest.fail("非交互模式不应等待输入密码"))
+    return crawler
+
+
+LOGIN_FORM = {'verdict': 'login_form', 'login_hint': True, 'selector': 'input[name="username"]', 'keyword': 'login'}
+
+
+def test_non_interactive_login_fails_immediately():
+    with pytest.raises(LoginRequiredError, match="tester"):
+        _crawler(False, LOGIN_FORM)._handle_login()
+
+
+@pytest.mark.parametrize("verdict", ["on_target", "unknown"])
+def test_non_interactive_without_login_form_continues(verdict):
+    probe = {'verdict': verdict, 'login_hint': False, 'selector': None, 'keyword': None}
+    assert _crawler(False, probe)._handle_login() is True
+
+
+def test_non_interactive_logged_in_page_with_login_words_continues():
+    # 已登录页面上的“退出登录”“用户名”等文字会命中登录关键词，但没有登录表单
+    probe = {'verdict': 'unknown', 'login_hint': True, 'selector': None, 'keyword': '登录'}
+    assert _crawler(False, probe)._handle_login() is True
@@ -0,0 +1,30 @@
+"""运行指标导出测试"""
+
+import os
+
+from metrics import RunMetrics
+
+
+def test_export_keeps_only_latest_reports_per_job(tmp_path):
+    other = tmp_path / "run_job_1_extra_20240101_000000_abc123.json"
+    other.write_text("{}", encoding="utf-8")
+    for day in range(1, 5):
+        old = tmp_path / f"run_job_1_202401{day:02d}_080000_{day:012x}.json"
+        old.write_text("{}", encoding="utf-8")
+        os.utime(old, (day, day))
+
+    metrics = RunMetrics("https://example.com", job="job_1")
+    report_path = metrics.export(tmp_path, keep=3)
+
+    reports = sorted(p.name for p in tmp_path.glob("run_job_1_2*.json"))
+    assert len(reports) == 3
+    assert report_path.name in reports
+    assert "run_job_1_20240103_080000_000000000003.json" in reports
+    assert other.exists()
+    assert (tmp_path / "capture_job_1.prom").exists()
+
+
+def test_export_keeps_everything_when_keep_is_zero(tmp_path):
+    for _ in range(3):
+        RunMetrics("https://example.com", job="job").export(tmp_path, keep=0)
+    assert len(list(tmp_path.glob("run_job_*.json"))) == 3
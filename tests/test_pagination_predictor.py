@@ -0,0 +1,56 @@
+"""翻页URL规律推导测试"""
+
+import pytest
+
+from pagination_predictor import PagePattern, derive_pattern
+
+
+def test_integer_query_parameter():
+    pattern = derive_pattern("https://example.com/list?page=2&size=20", "https://example.com/list?page=3&size=20")
+    assert pattern == PagePattern('query', 'page', 'int', 1, '0')
+    assert pattern.next_url("https://example.com/list?page=3&size=20") == "https://example.com/list?page=4&size=20"
+
+
+def test_zero_padded_path_segment():
+    pattern = derive_pattern("https://example.com/report/007/view", "https://example.com/report/008/view")
+    assert (pattern.location, pattern.key, pattern.kind, pattern.fmt) == ('path', '2', 'int', '3')
+    assert pattern.next_url("https://example.com/report/009/view") == "https://example.com/report/010/view"
+
+
+def test_month_parameter_rolls_over_year():
+    pattern = derive_pattern("https://example.com/cal?month=2024-11", "https://example.com/cal?month=2024-12")
+    assert (pattern.kind, pattern.step) == ('month', 1)
+    assert pattern.next_url("https://example.com/cal?month=2024-12") == "https://example.com/cal?month=2025-01"
+
+
+def test_same_day_in_next_month_is_a_month_step():
+    # 日不同时按天数推算，日相同时按整月推算
+    pattern = derive_pattern("https://example.com/cal?d=2024-01-31", "https://example.com/cal?d=2024-02-29")
+    assert (pattern.kind, pattern.step) == ('day', 29)
+    pattern = derive_pattern("https://example.com/cal?d=2024-01-15", "https://example.com/cal?d=2024-02-15")
+    assert (pattern.kind, pattern.step) == ('month', 1)
+    assert pattern.next_url("https://example.com/cal?d=2024-03-15") == "https://example.com/cal?d=2024-04-15"
+
+
+def test_weekly_date_in_path():
+    pattern = derive_pattern("https://example.com/week/20240101", "https://example.com/week/20240108")
+    assert (pattern.kind, pattern.step, pattern.fmt) == ('day', 7, '%Y%m%d')
+    assert pattern.next_url("https://example.com/week/20240226") == "https://example.com/week/20240304"
+
+
+def test_parameter_order_is_ignored():
+    pattern = derive_pattern("https://example.com/list?page=1&sort=asc", "https://example.com/list?sort=asc&page=2")
+    assert pattern is not None and pattern.key == 'page'
+
+
+@pytest.mark.parametrize("current, following", [
+    ("https://example.com/list?page=1", "https://other.com/list?page=2"),            # 不同站点
+    ("https://example.com/list?page=1&a=1", "https://example.com/list?page=2&a=2"),  # 多个部分变化
+    ("https://example.com/list?page=1", "https://example.com/list?page=2&extra=1"),  # 参数不同
+    ("https://example.com/list?page=1", "https://example.com/list?page=1"),          # 没有变化
+    ("https://example.com/list?tab=a", "https://example.com/list?tab=b"),            # 无法推算
+    ("https://example.com/a/1", "https://example.com/a/1/b"),                        # 路径层级不同
+    ("https://example.com/list?page=1", ""),
+])
+def test_no_pattern(current, following):
+    assert derive_pattern(current, following) is None
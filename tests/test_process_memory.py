@@ -0,0 +1,31 @@
+"""进程树内存统计测试"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import utils
+
+
+@pytest.mark.skipif(not Path("/proc/self/statm").exists(), reason="需要 /proc")
+def test_process_tree_rss_includes_children():
+    alone = utils.get_process_tree_rss(os.getpid())
+    child = subprocess.Popen([sys.executable, "-c", "import sys, time; data = bytearray(64 << 20); "
+                              "print(flush=True); sys.stdin.read()"],
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        child.stdout.readline()  # 子进程已分配内存
+        with_child = utils.get_process_tree_rss(os.getpid())
+        child_only = utils.get_process_tree_rss(child.pid)
+    finally:
+        child.communicate()
+
+    assert child_only >= 64 << 20
+    assert with_child >= alone + child_only // 2
+
+
+def test_missing_process_returns_none():
+    assert utils.get_process_tree_rss(2 ** 22 + 12345) is None
@@ -0,0 +1,112 @@
+"""重试策略测试"""
+
+import pytest
+
+import retry_policy
+from metrics import RunMetrics
+from retry_policy import PageLoadError, PageNotFoundError, RetryPolicy
+
+
+class PageDisconnectedError(Exception):
+    """与 DrissionPage 同名的异常，按类名匹配处理方式"""
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(retry_policy.time, "sleep", recorded.append)
+    return recorded
+
+
+def _failing(errors, result="ok"):
+    errors = list(errors)
+
+    def step():
+        if errors:
+            raise errors.pop(0)
+        return result
+    return step
+
+
+def _policy(**kwargs):
+    options = dict(max_attempts=4, base_delay=1, max_delay=5, multiplier=2, jitter=0, budget=10)
+    options.update(kwargs)
+    return RetryPolicy(**options)
+
+
+def test_exponential_backoff_is_capped():
+    policy = _policy()
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [1, 2, 4, 5, 5]
+
+
+def test_jitter_stays_within_bounds():
+    policy = _policy(jitter=0.2)
+    delays = [policy.delay(2) for _ in range(200)]
+    assert all(1.6 <= delay <= 2.4 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retries_until_success(sleeps):
+    policy = _policy()
+    policy.reset(RunMetrics())
+    assert policy.run(_failing([RuntimeError("a"), RuntimeError("b")]), label="step") == "ok"
+    assert sleeps == [1, 2]
+    assert policy.retries == 2
+    assert policy.metrics.counters['retries'] == 2
+    assert policy.metrics.counters['retries_retry'] == 2
+
+
+def test_gives_up_after_max_attempts(sleeps):
+    policy = _policy(max_attempts=3)
+    with pytest.raises(RuntimeError, match="3"):
+        policy.run(_failing([RuntimeError("1"), RuntimeError("2"), RuntimeError("3")]))
+    assert len(sleeps) == 2
+
+
+def test_budget_is_shared_across_steps_until_reset(sleeps):
+    policy = _policy(budget=2)
+    policy.run(_failing([RuntimeError()]))
+    policy.run(_failing([RuntimeError()]))
+    assert policy.budget_left == 0
+    with pytest.raises(RuntimeError):
+        policy.run(_failing([RuntimeError()]))
+
+    policy.reset()
+    assert policy.budget_left == 2
+    assert policy.run(_failing([RuntimeError()])) == "ok"
+
+
+def test_strategy_mapping_by_class_name():
+    policy = _policy(strategies={"KeyError": "reload", "LookupError": "fail"})
+    assert policy.classify(PageDisconnectedError()) == "reconnect"
+    assert policy.classify(PageLoadError()) == "reload"
+    # 子类优先于父类
+    assert policy.classify(PageNotFoundError()) == "fail"
+    assert policy.classify(KeyError()) == "reload"
+    assert policy.classify(IndexError()) == "fail"
+    assert policy.classify(RuntimeError()) == "retry"
+
+
+def test_unknown_action_falls_back_to_retry():
+    assert _policy(strategies={"KeyError": "explode"}).classify(KeyError()) == "retry"
+
+
+def test_fail_action_raises_without_retry(sleeps):
+    with pytest.raises(PageNotFoundError):
+        _policy().run(_failing([PageNotFoundError("404")]))
+    assert sleeps == []
+
+
+def test_recover_function_runs_before_retry(sleeps):
+    calls = []
+    result = _policy().run(_failing([PageLoadError(), PageDisconnectedError()]),
+                           recover={"reload": lambda: calls.append("reload"),
+                                    "reconnect": lambda: calls.append("reconnect")})
+    assert result == "ok"
+    assert calls == ["reload", "reconnect"]
+
+
+def test_reconnect_without_recover_function_fails(sleeps):
+    with pytest.raises(PageDisconnectedError):
+        _policy().run(_failing([PageDisconnectedError()]))
+    assert sleeps == []
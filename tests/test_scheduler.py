@@ -0,0 +1,91 @@
+"""cron 表达式与调度器状态测试"""
+
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+import scheduler
+from jobs import CaptureJob
+from scheduler import CronExpression, ScheduledJob, Scheduler
+
+
+def _next(expression: str, moment: datetime, count: int = 1):
+    cron = CronExpression(expression)
+    times = []
+    for _ in range(count):
+        moment = cron.next_after(moment)
+        times.append(moment)
+    return times
+
+
+def test_next_after_is_exclusive_and_drops_seconds():
+    assert _next("30 8 * * *", datetime(2024, 1, 1, 8, 30, 0)) == [datetime(2024, 1, 2, 8, 30)]
+    assert _next("30 8 * * *", datetime(2024, 1, 1, 8, 29, 59)) == [datetime(2024, 1, 1, 8, 30)]
+
+
+def test_weekday_range_skips_weekend():
+    # 2024-01-05 是周五
+    assert _next("30 8 * * 1-5", datetime(2024, 1, 5, 9, 0), 2) == [
+        datetime(2024, 1, 8, 8, 30), datetime(2024, 1, 9, 8, 30)]
+
+
+def test_steps_lists_and_ranges():
+    assert _next("*/20 9-10 * * *", datetime(2024, 1, 1, 10, 30), 3) == [
+        datetime(2024, 1, 1, 10, 40), datetime(2024, 1, 2, 9, 0), datetime(2024, 1, 2, 9, 20)]
+    assert CronExpression("0 8,12,18 * * *").hours == {8, 12, 18}
+    assert CronExpression("5/15 * * * *").minutes == {5, 20, 35, 50}
+
+
+def test_names_and_sunday_as_seven():
+    cron = CronExpression("0 0 1 jan,DEC sun")
+    assert cron.months == {1, 12}
+    assert CronExpression("0 0 * * 7").weekdays == {0}
+    assert CronExpression("0 0 * * mon-fri").weekdays == {1, 2, 3, 4, 5}
+
+
+def test_day_of_month_or_weekday_when_both_restricted():
+    # 与 cron 相同：日和周都有限制时满足任一即可（1 号或周一）
+    assert _next("0 0 1 * mon", datetime(2024, 1, 1, 0, 0), 3) == [
+        datetime(2024, 1, 8), datetime(2024, 1, 15), datetime(2024, 1, 22)]
+    assert _next("0 0 1 * mon", datetime(2024, 1, 29, 1, 0)) == [datetime(2024, 2, 1)]
+
+
+def test_month_rollover_and_leap_day():
+    assert _next("@monthly", datetime(2024, 12, 15)) == [datetime(2025, 1, 1)]
+    assert _next("0 12 29 2 *", datetime(2024, 3, 1)) == [datetime(2028, 2, 29, 12, 0)]
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",           # 字段数量不对
+    "60 * * * *",        # 超出范围
+    "* * * 13 *",
+    "*/0 * * * *",       # 步长无效
+    "5-1 * * * *",       # 范围颠倒
+    "* * * foo *",       # 未知名称
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_expression_that_never_fires():
+    with pytest.raises(ValueError, match="没有可以触发的时间"):
+        CronExpression("0 0 31 2 *").next_after(datetime(2024, 1, 1))
+
+
+def test_concurrent_status_writes(tmp_path, monkeypatch):
+    warnings = []
+    monkeypatch.setattr(scheduler.logger, "warning", warnings.append)
+    item = ScheduledJob(name="daily", cron=CronExpression("@daily"), job=CaptureJob(url="https://example.com"))
+    runner = Scheduler([item], status_file=tmp_path / "status.json")
+
+    threads = [threading.Thread(target=lambda: [runner._write_status() for _ in range(50)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert warnings == []
+    assert json.loads((tmp_path / "status.json").read_text(encoding="utf-8"))['jobs'].keys() == {"daily"}
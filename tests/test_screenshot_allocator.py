@@ -0,0 +1,32 @@
+"""截图序号分配器测试"""
+
+from utils import ScreenshotIndexAllocator
+
+
+def test_continues_after_highest_existing_index(tmp_path):
+    for name in ("1.png", "7.png", "3.jpg", "notes.txt"):
+        (tmp_path / name).touch()
+
+    allocator = ScreenshotIndexAllocator(tmp_path, "png")
+
+    assert allocator.next_filename() == "8.png"
+    assert allocator.next_filename() == "9.png"
+
+
+def test_two_allocators_never_hand_out_the_same_name(tmp_path):
+    first = ScreenshotIndexAllocator(tmp_path, "png")
+    second = ScreenshotIndexAllocator(tmp_path, "png")
+
+    names = [allocator.next_filename() for _ in range(5) for allocator in (first, second)]
+
+    assert len(names) == len(set(names)) == 10
+    assert sorted(int(name.split(".")[0]) for name in names) == list(range(1, 11))
+    assert all((tmp_path / name).exists() for name in names)
+
+
+def test_persisted_counter_is_used_as_starting_point(tmp_path):
+    ScreenshotIndexAllocator(tmp_path, "png").next_filename()
+    (tmp_path / "1.png").unlink()
+
+    # 计数器记录了已分配到 1，新分配器从 2 开始，不会重新使用被删除的序号
+    assert ScreenshotIndexAllocator(tmp_path, "png").next_filename() == "2.png"
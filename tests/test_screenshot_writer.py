@@ -0,0 +1,64 @@
+"""截图后台写入测试"""
+
+import threading
+
+from screenshot_writer import ScreenshotWriter
+
+
+class _BlockingEncoder:
+    """编码时等待放行，用于验证队列满时的背压"""
+
+    passthrough = False
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def encode(self, data: bytes) -> bytes:
+        self.release.wait(5)
+        return data.upper()
+
+
+def test_flush_waits_for_all_writes(tmp_path):
+    writer = ScreenshotWriter(workers=2, queue_size=2)
+    for i in range(1, 6):
+        writer.submit(tmp_path / f"{i}.png", f"page {i}".encode(), page_num=i)
+    results = writer.flush()
+
+    assert sorted(r.page_num for r in results) == [1, 2, 3, 4, 5]
+    assert all(r.success for r in results)
+    assert (tmp_path / "3.png").read_bytes() == b"page 3"
+    assert not list(tmp_path.glob(".*.tmp"))
+    assert writer.flush() == []
+    writer.close()
+
+
+def test_failed_write_reports_error_and_removes_placeholder(tmp_path):
+    placeholder = tmp_path / "1.png"
+    placeholder.touch()
+    writer = ScreenshotWriter(workers=1)
+    writer.submit(tmp_path / "missing_dir" / "2.png", b"data")
+    writer.submit(placeholder, b"data")
+    results = {r.path: r for r in writer.close()}
+
+    failed = results[str(tmp_path / "missing_dir" / "2.png")]
+    assert not failed.success and failed.error
+    assert results[str(placeholder)].success and results[str(placeholder)].size == 4
+
+
+def test_submit_blocks_when_queue_is_full(tmp_path):
+    encoder = _BlockingEncoder()
+    writer = ScreenshotWriter(workers=1, queue_size=1, encoder=encoder)
+    writer.workers = 1  # 使用编码器时线程数不少于编码进程数，这里固定为一个线程
+    writer.submit(tmp_path / "1.png", b"a")   # 写入线程取走后在编码中等待
+    writer.submit(tmp_path / "2.png", b"b")   # 占满队列
+
+    third = threading.Thread(target=writer.submit, args=(tmp_path / "3.png", b"c"))
+    third.start()
+    third.join(0.2)
+    assert third.is_alive()
+
+    encoder.release.set()
+    third.join(5)
+    results = writer.close()
+    assert len(results) == 3
+    assert (tmp_path / "3.png").read_bytes() == b"C"
@@ -0,0 +1,48 @@
+"""会话恢复测试"""
+
+import time
+from types import SimpleNamespace
+
+from session_store import SessionStore
+
+
+class _FakePage:
+    def __init__(self):
+        self.init_scripts = {}
+        self.set = SimpleNamespace(cookies=lambda cookies: None)
+
+    def add_init_js(self, script):
+        script_id = str(len(self.init_scripts) + 1)
+        self.init_scripts[script_id] = script
+        return script_id
+
+    def remove_init_js(self, script_id=None):
+        self.init_scripts.pop(script_id, None)
+
+
+def _store(tmp_path, monkeypatch):
+    store = SessionStore(store_dir=tmp_path)
+    session = {"origin": "https://example.com", "cookies": [{"name": "sid", "value": "1"}],
+               "local_storage": {"token": "abc"}, "saved_at": time.time()}
+    monkeypatch.setattr(store, "load", lambda url, account: session)
+    return store
+
+
+def test_restore_retries_keep_a_single_init_script(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch)
+    page = _FakePage()
+
+    for _ in range(3):  # 页面加载重试时每次都会恢复会话
+        assert store.restore(page, "https://example.com/app", "user")
+
+    assert len(page.init_scripts) == 1
+
+
+def test_discard_restore_removes_init_script(tmp_path, monkeypatch):
+    store = _store(tmp_path, monkeypatch)
+    page = _FakePage()
+    store.restore(page, "https://example.com/app", "user")
+
+    store.discard_restore(page)
+
+    assert page.init_scripts == {}
@@ -0,0 +1,111 @@
+"""分块整页截图测试"""
+
+import io
+import json
+import struct
+
+import pytest
+from PIL import Image
+
+import config
+from image_hash import DuplicateDetector
+from tiled_capture import StreamingPngWriter, remove_capture, write_stitched, write_tile_set
+
+
+def _tile(color, size=(120, 50)) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, "PNG")
+    return output.getvalue()
+
+
+def _striped_tile(offset: int, size=(120, 50)) -> bytes:
+    image = Image.new("RGB", size, "white")
+    for x in range(offset, size[0], 20):
+        image.paste((0, 0, 0), (x, 0, x + 10, size[1]))
+    output = io.BytesIO()
+    image.save(output, "PNG")
+    return output.getvalue()
+
+
+def test_streaming_writer_patches_ihdr_on_close(tmp_path):
+    path = tmp_path / "page.png"
+    writer = StreamingPngWriter(path)
+    writer.add_tile(_tile("red"))
+    writer.add_tile(_tile("blue", size=(120, 30)))
+    writer.close()
+
+    data = path.read_bytes()
+    assert data[12:16] == b"IHDR"
+    assert struct.unpack(">II", data[16:24]) == (120, 80)
+
+
+def test_stitched_png_round_trips_through_pillow(tmp_path):
+    path = tmp_path / "page.png"
+    # 第二个分块更宽（如出现滚动条），会被裁剪到第一个分块的宽度
+    count = write_stitched(path, iter([_tile("red"), _tile("blue", size=(140, 30))]), compress_level=1)
+
+    with Image.open(path) as image:
+        image.load()
+        assert count == 2
+        assert image.size == (120, 80)
+        assert image.getpixel((5, 10)) == (255, 0, 0)
+        assert image.getpixel((5, 70)) == (0, 0, 255)
+
+
+def test_aborted_write_removes_file(tmp_path):
+    path = tmp_path / "page.png"
+
+    def tiles():
+        yield _tile("red")
+        raise RuntimeError("浏览器断开")
+
+    with pytest.raises(RuntimeError):
+        write_stitched(path, tiles())
+    assert not path.exists()
+
+
+def test_remove_capture_deletes_tile_set(tmp_path):
+    index_path = tmp_path / "3.json"
+    write_tile_set(index_path, iter([_tile("red"), _tile("blue")]), page_num=3)
+    assert json.loads(index_path.read_text(encoding="utf-8"))["height"] == 100
+
+    remove_capture(index_path)
+    assert not index_path.exists()
+    assert not (tmp_path / "3_tiles").exists()
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setattr(config, "DUPLICATE_DETECTION", True, raising=False)
+    return DuplicateDetector(threshold=4, max_consecutive=2)
+
+
+def _capture(detector, tiles, path, tmp_path):
+    signature = detector.tile_signature()
+    write_stitched(tmp_path / path, signature.wrap(iter(tiles)))
+    return detector.check_tiles(signature, path)
+
+
+def test_pages_differing_below_first_tile_are_not_duplicates(detector, tmp_path):
+    # 页眉相同、下方内容不同的页面，只比较第一个分块会误判为重复
+    assert _capture(detector, [_tile("red"), _striped_tile(0)], "1.png", tmp_path) is None
+    assert _capture(detector, [_tile("red"), _striped_tile(10)], "2.png", tmp_path) is None
+    assert detector.consecutive == 0
+
+
+def test_identical_tiled_pages_are_duplicates(detector, tmp_path):
+    tiles = [_tile("red"), _striped_tile(0)]
+    assert _capture(detector, tiles, "1.png", tmp_path) is None
+    assert _capture(detector, tiles, "2.png", tmp_path) == "1.png"
+    assert detector.consecutive == 1
+    # 分块数量不同的页面不会判为重复
+    assert _capture(detector, tiles + [_tile("red")], "3.png", tmp_path) is None
+
+
+def test_identical_tiled_pages_stop_the_run_without_duplicate_detection(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "DUPLICATE_DETECTION", False, raising=False)
+    detector = DuplicateDetector(max_consecutive=1)
+    tiles = [_tile("red"), _striped_tile(0)]
+    assert _capture(detector, tiles, "1.png", tmp_path) is None
+    assert _capture(detector, tiles, "2.png", tmp_path) is None
+    assert detector.should_stop
@@ -0,0 +1,68 @@
+"""多进程任务池测试"""
+
+import multiprocessing
+import os
+import socket
+import sys
+from types import SimpleNamespace
+
+import worker_pool
+from jobs import JobResult
+from worker_pool import WorkerPool
+
+
+def test_pick_port_skips_ports_already_listening():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        busy_port = listener.getsockname()[1]
+
+        pool = WorkerPool(workers=2)
+        pool.base_port = busy_port  # 模拟常驻浏览器占用了 0 号工作进程的端口
+
+        first = pool._pick_port(0)
+        second = pool._pick_port(1)
+
+    assert first != busy_port
+    assert first == busy_port + 2
+    assert second == busy_port + 1
+
+
+def _crash_after_start(worker_id, port, user_data_dir, headless, interactive, job_queue, result_queue):
+    """回报开始后立即退出（模拟浏览器退出），重新入队的任务正常完成"""
+    while True:
+        item = job_queue.get()
+        if item is None:
+            return
+        index, job = item
+        result_queue.put(('start', worker_id, index, None))
+        if not job.resume:
+            sys.exit(worker_pool.BROWSER_EXITED_CODE)
+        result_queue.put(('done', worker_id, index, JobResult(job=job, success=True, screenshot_count=1)))
+
+
+def test_job_requeued_when_worker_exits_right_after_start(monkeypatch):
+    monkeypatch.setattr(worker_pool, "_worker_main", _crash_after_start)
+    pool = WorkerPool(workers=1, max_attempts=2)
+    pool._ctx = multiprocessing.get_context("fork")
+
+    results = pool.run(["https://example.com"])
+
+    assert results[0].success
+    assert results[0].job.resume
+
+
+class _FakeBrowser:
+    def __init__(self, pid, alive):
+        self.process_id = pid
+        self.states = SimpleNamespace(is_alive=alive)
+
+
+def test_browser_alive_checks_process_and_connection():
+    assert worker_pool._browser_alive(_FakeBrowser(os.getpid(), True))
+    assert not worker_pool._browser_alive(_FakeBrowser(os.getpid(), False))
+
+    dead = multiprocessing.get_context("fork").Process(target=lambda: None)
+    dead.start()
+    dead.join()
+    assert not worker_pool._browser_alive(_FakeBrowser(dead.pid, True))
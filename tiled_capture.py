@@ -0,0 +1,236 @@
+"""
+分块整页截图模块
+超长页面（如上万像素高的报表）不再让浏览器一次生成整张位图，而是逐屏滚动、按固定高度截取分块：
+1. stitched - 分块逐个解码后按行流式压缩写入一张PNG，内存中始终只有一个分块
+2. tiles    - 分块原样保存为图片集，并写入记录各分块位置的 index.json
+固定定位（fixed/sticky）的元素在第一个分块之后隐藏，避免在每个分块中重复出现
+"""
+
+import importlib.util
+import io
+import json
+import os
+import shutil
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from loguru import logger
+
+from capture_modes import GEOMETRY_SCRIPT, capture_region
+
+# 流式拼接需要 Pillow 解码分块（只检查是否安装，用到时才导入）
+STITCHING_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+# 隐藏固定定位的元素（页眉、悬浮按钮等），返回隐藏的数量
+HIDE_FIXED_SCRIPT = """
+var hidden = window.__dacHiddenFixed = window.__dacHiddenFixed || [];
+var all = document.body ? document.body.getElementsByTagName('*') : [];
+for (var i = 0; i < all.length; i++) {
+    var pos = getComputedStyle(all[i]).position;
+    if ((pos === 'fixed' || pos === 'sticky') && all[i].style.visibility !== 'hidden') {
+        hidden.push([all[i], all[i].style.visibility]);
+        all[i].style.visibility = 'hidden';
+    }
+}
+return hidden.length;
+"""
+
+# 恢复被隐藏的元素并滚动回顶部
+RESTORE_FIXED_SCRIPT = """
+var hidden = window.__dacHiddenFixed || [];
+for (var i = 0; i < hidden.length; i++) { hidden[i][0].style.visibility = hidden[i][1]; }
+window.__dacHiddenFixed = null;
+window.scrollTo(0, 0);
+"""
+
+# 滚动到指定位置并返回实际位置（到达底部时浏览器会限制滚动距离）
+SCROLL_SCRIPT = """
+window.scrollTo(0, arguments[0]);
+return window.scrollY;
+"""
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+class StreamingPngWriter:
+    """按行流式写入的PNG文件：逐个追加分块，不在内存中拼接整张图片"""
+
+    def __init__(self, path: Path, compress_level: int = 6, chunk_size: int = 256 * 1024):
+        """
+        初始化写入器
+
+        Args:
+            path: 输出PNG路径
+            compress_level: zlib压缩级别（0-9）
+            chunk_size: 单个IDAT数据块的大小（字节）
+        """
+        self.path = Path(path)
+        self.width = 0
+        self.height = 0
+        self._compressor = zlib.compressobj(compress_level)
+        self._chunk_size = chunk_size
+        self._pending = bytearray()
+        self._file = open(self.path, "wb")
+        self._file.write(PNG_SIGNATURE)
+        # 高度在写完所有分块后回填
+        self._ihdr_offset = self._file.tell()
+        self._file.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", 0, 0, 8, 2, 0, 0, 0)))
+
+    def add_tile(self, data: bytes) -> None:
+        """
+        追加一个分块（PNG字节），宽度必须与第一个分块一致
+
+        Args:
+            data: 分块图片字节
+        """
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as tile:
+            tile = tile.convert("RGB")
+            if not self.width:
+                self.width = tile.width
+            elif tile.width != self.width:
+                # 宽度不一致（如出现滚动条）时裁剪或补白到第一个分块的宽度
+                canvas = Image.new("RGB", (self.width, tile.height), "white")
+                canvas.paste(tile, (0, 0))
+                tile = canvas
+            raw = tile.tobytes()
+            stride = self.width * 3
+            for row in range(tile.height):
+                self._pending += self._compressor.compress(b"\x00" + raw[row * stride:(row + 1) * stride])
+                if len(self._pending) >= self._chunk_size:
+                    self._flush_pending()
+            self.height += tile.height
+
+    def close(self) -> None:
+        """写完剩余数据并回填图片高度"""
+        self._pending += self._compressor.flush()
+        self._flush_pending()
+        self._file.write(_chunk(b"IEND", b""))
+        self._file.seek(self._ihdr_offset)
+        self._file.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def abort(self) -> None:
+        """放弃写入并删除文件"""
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+    def _flush_pending(self) -> None:
+        if self._pending:
+            self._file.write(_chunk(b"IDAT", bytes(self._pending)))
+            self._pending.clear()
+
+
+def iter_tiles(page, tile_height: int, scroll_delay: float = 0.1) -> Iterator[bytes]:
+    """
+    逐屏滚动并截取固定高度的分块
+
+    Args:
+        page: DrissionPage 页面或标签页对象
+        tile_height: 分块高度（CSS像素，超过可视区域高度时按可视区域高度截取）
+        scroll_delay: 每次滚动后等待渲染的秒数
+
+    Yields:
+        bytes: 分块PNG字节（从上到下）
+    """
+    geometry = page.run_js(GEOMETRY_SCRIPT, "")
+    page_height = geometry['pageHeight']
+    width = geometry['clientWidth']
+    step = max(1, min(tile_height, geometry['viewHeight']))
+    try:
+        y = 0
+        while y < page_height:
+            page.run_js(SCROLL_SCRIPT, y)
+            if scroll_delay:
+                time.sleep(scroll_delay)
+            height = min(step, page_height - y)
+            yield capture_region(page, {'x': 0, 'y': y, 'width': width, 'height': height})
+            if y == 0:
+                page.run_js(HIDE_FIXED_SCRIPT)
+            y += height
+    finally:
+        try:
+            page.run_js(RESTORE_FIXED_SCRIPT)
+        except Exception as e:
+            logger.debug("恢复页面滚动位置失败: {}", e)
+
+
+def write_stitched(path: Path, tiles: Iterator[bytes], compress_level: int = 6) -> int:
+    """
+    把分块流式拼接为一张PNG
+
+    Args:
+        path: 输出PNG路径
+        tiles: 分块PNG字节迭代器
+        compress_level: zlib压缩级别（0-9）
+
+    Returns:
+        int: 分块数量
+    """
+    writer = StreamingPngWriter(path, compress_level)
+    count = 0
+    try:
+        for data in tiles:
+            writer.add_tile(data)
+            count += 1
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return count
+
+
+def write_tile_set(index_path: Path, tiles: Iterator[bytes], page_num: Optional[int] = None) -> int:
+    """
+    把分块保存为图片集，并写入 index.json
+
+    Args:
+        index_path: 索引文件路径（分块保存在同名的 _tiles 目录中）
+        tiles: 分块PNG字节迭代器
+        page_num: 页码（写入索引）
+
+    Returns:
+        int: 分块数量
+    """
+    tile_dir = index_path.with_name(f"{index_path.stem}_tiles")
+    tile_dir.mkdir(parents=True, exist_ok=True)
+    entries: List[dict] = []
+    y = 0
+    for i, data in enumerate(tiles):
+        name = f"tile_{i:04d}.png"
+        (tile_dir / name).write_bytes(data)
+        width, height = struct.unpack(">II", data[16:24])
+        entries.append({'file': f"{tile_dir.name}/{name}", 'y': y, 'width': width, 'height': height})
+        y += height
+    index = {
+        'page': page_num,
+        'width': entries[0]['width'] if entries else 0,
+        'height': y,
+        'tiles': entries,
+    }
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp_path, index_path)
+    return len(entries)
+
+
+def remove_capture(path: Path) -> None:
+    """
+    删除已写入的整页截图（分块图片集时同时删除分块目录）
+
+    Args:
+        path: 拼接后的PNG路径或分块图片集的索引文件路径
+    """
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    shutil.rmtree(path.with_name(f"{path.stem}_tiles"), ignore_errors=True)
@@ -3,7 +3,10 @@
 包含项目中使用的各种辅助函数
 """
 
+import json
 import os
+import sys
+import threading
 import time
 from pathlib import Path
 from typing import Optional, Union
@@ -12,58 +15,240 @@ import config
 from loguru import logger
 
 
-def setup_logger() -> None:
-    """设置日志器配置"""
-    # 移除默认的logger
-    logger.remove()
+# 日志只在每个进程中配置一次（记录完成配置的进程ID，fork 出的子进程会重新配置）
+_logger_lock = threading.Lock()
+_logger_pid: Optional[int] = None
+
+# 进程级初始化（目录、磁盘空间检查）同样每个进程只执行一次
+_init_lock = threading.Lock()
+_init_pid: Optional[int] = None
+
+
+def _json_log_format(record) -> str:
+    """JSON Lines 日志格式：每条日志一行，附带 run/job/page 等上下文字段"""
+    entry = {
+        'time': record['time'].isoformat(),
+        'level': record['level'].name,
+        'message': record['message'],
+        'logger': record['name'],
+        'function': record['function'],
+        'line': record['line'],
+        'process': record['process'].id,
+        'thread': record['thread'].name,
+    }
+    entry.update({key: value for key, value in record['extra'].items() if not key.startswith('_')})
+    if record['exception']:
+        entry['exception'] = repr(record['exception'].value)
+    record['extra']['_json'] = json.dumps(entry, ensure_ascii=False, default=str)
+    return "{extra[_json]}\n"
+
+
+def setup_logger(force: bool = False) -> None:
+    """
+    设置日志器配置（每个进程只配置一次，重复调用直接返回）
     
-    # 添加控制台输出
-    logger.add(
-        sink=lambda msg: print(msg, end=""),
-        level=config.LOG_LEVEL,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-               "<level>{level: <8}</level> | "
-               "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
-               "<level>{message}</level>",
-        colorize=True
-    )
+    日志经队列由后台线程写入控制台和文件，截图线程不会因为日志IO阻塞
     
-    # 添加文件输出
-    logger.add(
-        config.LOG_FILE,
-        level=config.LOG_LEVEL,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-        rotation="10 MB",
-        retention="7 days",
-        encoding="utf-8"
-    )
+    Args:
+        force: 是否强制重新配置（如修改了日志配置）
+    """
+    global _logger_pid
+    with _logger_lock:
+        if _logger_pid == os.getpid() and not force:
+            return
+        _logger_pid = os.getpid()
+        enqueue = getattr(config, 'LOG_ENQUEUE', True)
+        
+        # 移除默认的logger
+        logger.remove()
+        
+        # 添加控制台输出
+        logger.add(
+            sink=sys.stdout,
+            level=config.LOG_LEVEL,
+            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+                   "<level>{level: <8}</level> | "
+                   "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+                   "<level>{message}</level>",
+            colorize=True,
+            enqueue=enqueue
+        )
+        
+        # 添加文件输出
+        logger.add(
+            config.LOG_FILE,
+            level=config.LOG_LEVEL,
+            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+            rotation="10 MB",
+            retention="7 days",
+            encoding="utf-8",
+            enqueue=enqueue
+        )
+        
+        # 可选的 JSON Lines 输出（便于按 run/job/page 检索和汇总）
+        json_file = getattr(config, 'LOG_JSON_FILE', None)
+        if json_file:
+            logger.add(
+                json_file,
+                level=config.LOG_LEVEL,
+                format=_json_log_format,
+                rotation="10 MB",
+                retention="7 days",
+                encoding="utf-8",
+                enqueue=enqueue
+            )
+
+
+def init_process() -> None:
+    """
+    进程级初始化（每个进程只执行一次，重复调用直接返回）
+
+    配置日志、创建必要目录并检查磁盘空间。导入模块时不会写文件系统，
+    这些工作推迟到进程第一次创建爬虫或运行任务时完成；工作进程各自执行一次。
+    """
+    global _init_pid
+    with _init_lock:
+        if _init_pid == os.getpid():
+            return
+        _init_pid = os.getpid()
+
+    setup_logger()
+
+    ensure_directories = getattr(config, 'ensure_directories', None)
+    if callable(ensure_directories):
+        ensure_directories()
+
+    # 检查磁盘空间
+    if not check_disk_space(config.SCREENSHOT_DIR):
+        logger.warning("磁盘空间可能不足，请注意")
+
 
+def import_drission(name: str):
+    """
+    延迟导入 DrissionPage 中的类
+
+    DrissionPage 导入较慢（会连带导入 requests、tldextract 等），只在真正启动或连接浏览器时导入
+
+    Args:
+        name: 类名（如 WebPage、Chromium、ChromiumOptions）
 
-def get_next_screenshot_filename(screenshot_dir: Union[str, Path]) -> str:
+    Returns:
+        对应的类
+    """
+    try:
+        import DrissionPage
+    except ImportError:
+        logger.error("请先安装DrissionPage: pip install DrissionPage")
+        raise
+    return getattr(DrissionPage, name)
+
+
+class ScreenshotIndexAllocator:
+    """
+    截图序号分配器
+    
+    创建时只扫描一次目录（或读取持久化的计数器），之后在内存中递增分配序号。
+    每个序号通过独占创建文件（O_EXCL）来占用，多个爬虫（线程或进程）同时写入
+    同一目录时也不会分配到相同的文件名。
     """
-    获取下一个截图文件名
+    
+    COUNTER_FILE = ".screenshot_counter"
+    
+    def __init__(self, screenshot_dir: Union[str, Path], extension: str = "png"):
+        """
+        初始化分配器
+        
+        Args:
+            screenshot_dir: 截图保存目录
+            extension: 截图文件扩展名
+        """
+        self.screenshot_dir = Path(screenshot_dir)
+        self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        self.extension = extension
+        self._counter_path = self.screenshot_dir / self.COUNTER_FILE
+        self._lock = threading.Lock()
+        self._next_index = self._load_start_index()
+    
+    def _load_start_index(self) -> int:
+        """读取持久化计数器，不存在时扫描一次目录中的最大编号"""
+        try:
+            return int(self._counter_path.read_text(encoding="utf-8").strip()) + 1
+        except (OSError, ValueError):
+            pass
+        
+        max_index = 0
+        with os.scandir(self.screenshot_dir) as entries:
+            for entry in entries:
+                stem = entry.name.split(".", 1)[0]
+                if stem.isdigit():
+                    max_index = max(max_index, int(stem))
+        return max_index + 1
+    
+    def next_filename(self) -> str:
+        """
+        分配下一个截图文件名，并创建空文件占用该序号
+        
+        Returns:
+            str: 截图文件名（如: "1.png", "2.png"等）
+        """
+        with self._lock:
+            while True:
+                index = self._next_index
+                self._next_index += 1
+                filename = f"{index}.{self.extension}"
+                try:
+                    fd = os.open(self.screenshot_dir / filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                except FileExistsError:
+                    # 其他爬虫已占用该序号，继续尝试下一个
+                    continue
+                os.close(fd)
+                self._save_counter(index)
+                return filename
+    
+    def _save_counter(self, index: int) -> None:
+        """持久化当前最大序号（仅作为下次启动的起点提示，冲突由独占创建兜底）"""
+        try:
+            self._counter_path.write_text(str(index), encoding="utf-8")
+        except OSError as e:
+            logger.debug("保存截图计数器失败: {}", e)
+
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+
+def get_screenshot_allocator(screenshot_dir: Union[str, Path], extension: str = "png") -> ScreenshotIndexAllocator:
+    """
+    获取目录对应的截图序号分配器（每个进程内同一目录和扩展名只创建一次）
     
     Args:
         screenshot_dir: 截图保存目录
+        extension: 截图文件扩展名
         
     Returns:
-        str: 下一个截图文件名（如: "1.png", "2.png"等）
+        ScreenshotIndexAllocator: 截图序号分配器
     """
-    screenshot_dir = Path(screenshot_dir)
-    screenshot_dir.mkdir(exist_ok=True)
-    
-    # 查找现有截图文件的最大编号
-    max_index = 0
-    for file in screenshot_dir.glob("*.png"):
-        try:
-            index = int(file.stem)
-            max_index = max(max_index, index)
-        except ValueError:
-            continue
+    key = (str(Path(screenshot_dir).resolve()), extension)
+    with _allocators_lock:
+        allocator = _allocators.get(key)
+        if allocator is None:
+            allocator = ScreenshotIndexAllocator(screenshot_dir, extension)
+            _allocators[key] = allocator
+        return allocator
+
+
+def get_next_screenshot_filename(screenshot_dir: Union[str, Path], extension: str = "png") -> str:
+    """
+    获取下一个截图文件名（会创建空文件占用该序号）
     
-    # 返回下一个编号的文件名
-    next_index = max_index + 1
-    return f"{next_index}.png"
+    Args:
+        screenshot_dir: 截图保存目录
+        extension: 截图文件扩展名
+        
+    Returns:
+        str: 下一个截图文件名（如: "1.png", "2.png"等）
+    """
+    return get_screenshot_allocator(screenshot_dir, extension).next_filename()
 
 
 def safe_sleep(seconds: float) -> None:
@@ -73,7 +258,7 @@ def safe_sleep(seconds: float) -> None:
     Args:
         seconds: 睡眠时间（秒）
     """
-    logger.debug(f"等待 {seconds} 秒...")
+    logger.debug("等待 {} 秒...", seconds)
     time.sleep(seconds)
 
 
@@ -173,4 +358,61 @@ def check_disk_space(path: Union[str, Path], min_free_gb: float = 1.0) -> bool:
         return True
     except Exception as e:
         logger.error(f"检查磁盘空间时出错: {str(e)}")
-        return False 
\ No newline at end of file
+        return False 
+
+
+def get_peak_rss() -> Optional[int]:
+    """
+    获取当前进程的内存占用峰值（常驻内存）
+    
+    Returns:
+        Optional[int]: 内存峰值（字节），平台不支持时返回None
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows 没有 resource 模块
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以KB为单位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def get_process_tree_rss(pid: int) -> Optional[int]:
+    """
+    获取进程及其所有子孙进程当前的常驻内存之和（如浏览器主进程和各渲染进程）
+
+    Args:
+        pid: 根进程ID
+
+    Returns:
+        Optional[int]: 内存（字节），平台不支持（没有 /proc）或进程不存在时返回None
+    """
+    proc = Path("/proc")
+    if not (proc / str(pid)).exists():
+        return None
+
+    children = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # 进程名可能包含空格和括号，父进程ID在最后一个右括号之后的第二个字段
+            stat = (entry / "stat").read_text()
+            ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        except (OSError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry.name))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            total += int((proc / str(current) / "statm").read_text().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            # 进程在扫描期间已退出
+            continue
+    return total
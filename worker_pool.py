@@ -0,0 +1,361 @@
+"""
+多进程截图任务池
+启动多个工作进程，每个进程拥有独立的浏览器、用户数据目录和调试端口：
+1. 工作进程从共享队列中领取任务，并把结果回报给主进程
+2. 工作进程崩溃、浏览器退出或单个任务超时时，主进程会结束该进程及其浏览器，并把任务重新放回队列（从检查点续传）
+3. 任务超过最大尝试次数后记为失败
+"""
+
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from loguru import logger
+
+import config
+from jobs import CaptureJob, JobResult
+
+
+# 工作进程发现浏览器已退出时的退出码（主进程按崩溃处理：重启进程并把任务重新入队）
+BROWSER_EXITED_CODE = 3
+
+
+def _browser_alive(browser) -> bool:
+    """检查浏览器是否仍在运行（进程存在且调试连接可用）"""
+    try:
+        pid = browser.process_id
+        if pid:
+            os.kill(pid, 0)
+        return browser.states.is_alive
+    except Exception:
+        return False
+
+
+def _worker_main(worker_id: int, port: int, user_data_dir: str, headless: Optional[bool],
+                 interactive: Optional[bool], job_queue, result_queue) -> None:
+    """
+    工作进程入口：启动独立浏览器，循环领取并执行任务
+
+    Args:
+        worker_id: 工作进程编号
+        port: 浏览器调试端口
+        user_data_dir: 浏览器用户数据目录
+        headless: 是否使用无头模式，默认使用 config.BROWSER_HEADLESS
+        interactive: 需要登录时是否等待手动输入密码，默认使用 config.LOGIN_INTERACTIVE
+        job_queue: 共享任务队列，元素为 (任务序号, CaptureJob)，None 表示退出
+        result_queue: 结果队列，元素为 (事件, 工作进程编号, 任务序号, 数据)
+    """
+    # 在子进程中导入，避免主进程加载浏览器相关依赖
+    from screenshot_crawler import ScreenshotCrawler
+
+    host = ScreenshotCrawler(headless=headless, local_port=port, user_data_dir=user_data_dir)
+    try:
+        host._initialize_browser()
+        result_queue.put(('browser', worker_id, None, host.page.browser.process_id))
+
+        while True:
+            item = job_queue.get()
+            if item is None:
+                break
+            index, job = item
+            result_queue.put(('start', worker_id, index, None))
+            if not _browser_alive(host.page.browser):
+                # 浏览器已退出：不再在失效的浏览器上逐个失败任务，结束进程由主进程重启并重新入队
+                logger.error(f"工作进程 {worker_id} 的浏览器已退出，结束进程等待重启")
+                sys.exit(BROWSER_EXITED_CODE)
+
+            start = time.perf_counter()
+            try:
+                crawler = ScreenshotCrawler(headless=headless, page=host.page.browser.new_tab(),
+                                            capture_mode=job.capture_mode, account=job.account,
+                                            interactive=interactive)
+                count, files = crawler.start_screenshot_task(
+                    url=job.url,
+                    max_pages=job.max_pages,
+                    screenshot_dir=str(job.output_dir(index + 1)),
+                    resume=job.resume
+                )
+                result = JobResult(job=job, success=True, screenshot_count=count, files=files,
+                                   duration=time.perf_counter() - start)
+            except Exception as e:
+                if not _browser_alive(host.page.browser):
+                    logger.error(f"工作进程 {worker_id} 的浏览器在任务 {index + 1} 中退出，结束进程等待重启")
+                    sys.exit(BROWSER_EXITED_CODE)
+                result = JobResult(job=job, success=False, error=str(e),
+                                   duration=time.perf_counter() - start)
+            result_queue.put(('done', worker_id, index, result))
+    finally:
+        host._cleanup()
+
+
+def _port_in_use(port: int) -> bool:
+    """检查本机端口上是否已有进程在监听（如常驻浏览器或其他程序）"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.5)
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+class WorkerPool:
+    """多进程截图任务池，每个工作进程使用独立浏览器"""
+
+    def __init__(self, workers: Optional[int] = None,
+                 job_timeout: Optional[float] = None,
+                 max_attempts: Optional[int] = None,
+                 headless: Optional[bool] = None,
+                 interactive: Optional[bool] = None):
+        """
+        初始化任务池
+
+        Args:
+            workers: 工作进程数量，默认使用 config.WORKER_COUNT（未配置时为CPU核心数）
+            job_timeout: 单个任务的最长执行时间（秒），超时视为卡死
+            max_attempts: 单个任务的最大尝试次数（进程崩溃或超时后重新入队）
+            headless: 是否使用无头模式，默认使用 config.BROWSER_HEADLESS
+            interactive: 需要登录时是否等待手动输入密码，默认使用 config.LOGIN_INTERACTIVE
+        """
+        self.workers = max(1, workers or getattr(config, 'WORKER_COUNT', None) or os.cpu_count() or 1)
+        self.job_timeout = job_timeout or getattr(config, 'WORKER_JOB_TIMEOUT', 600)
+        self.max_attempts = max_attempts or getattr(config, 'WORKER_MAX_ATTEMPTS', 2)
+        self.headless = headless
+        self.interactive = interactive
+        self.base_port = getattr(config, 'WORKER_BASE_PORT', 9300)
+        self.profile_root = Path(tempfile.gettempdir()) / "drission-auto-capture-workers"
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._job_queue = None
+        self._result_queue = None
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._browser_pids: Dict[int, int] = {}
+        # 工作进程编号 -> 浏览器调试端口
+        self._ports: Dict[int, int] = {}
+        # 工作进程编号 -> (任务序号, 开始时间)
+        self._in_flight: Dict[int, Tuple[int, float]] = {}
+        # 工作进程编号 -> 未执行任务就退出的连续次数（如浏览器无法启动）
+        self._startup_failures: Dict[int, int] = {}
+        self._on_result: Optional[Callable[[int, JobResult], None]] = None
+
+    def run(self, jobs: Iterable[Union[CaptureJob, str]],
+            on_result: Optional[Callable[[int, JobResult], None]] = None) -> List[JobResult]:
+        """
+        用多个工作进程执行一批截图任务
+
+        Args:
+            jobs: 截图任务列表，元素可以是 CaptureJob 或 URL 字符串
+            on_result: 每个任务结束时在主进程中调用，参数为 (任务在列表中的位置, 结果)
+
+        Returns:
+            List[JobResult]: 与输入顺序一致的任务结果列表
+        """
+        jobs = [job if isinstance(job, CaptureJob) else CaptureJob(url=job) for job in jobs]
+        if not jobs:
+            return []
+        self._on_result = on_result
+
+        worker_count = min(self.workers, len(jobs))
+        logger.info(f"开始多进程截图: {len(jobs)} 个任务, 工作进程数 {worker_count}")
+        start = time.perf_counter()
+
+        self._job_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        attempts = [0] * len(jobs)
+        results: List[Optional[JobResult]] = [None] * len(jobs)
+
+        for index, job in enumerate(jobs):
+            attempts[index] += 1
+            self._job_queue.put((index, job))
+
+        try:
+            for worker_id in range(worker_count):
+                self._start_worker(worker_id)
+
+            while any(r is None for r in results):
+                self._handle_events(results, timeout=0.5)
+
+                failed = self._find_failed_workers()
+                if failed:
+                    # 已退出的进程回报的事件都已在队列中：先全部处理，才能找到它正在执行的任务并重新入队
+                    self._handle_events(results)
+                for worker_id, reason in failed:
+                    index = self._restart_worker(worker_id, reason)
+                    if index is None or results[index] is not None:
+                        continue
+                    if attempts[index] < self.max_attempts:
+                        attempts[index] += 1
+                        logger.warning(f"任务 {index + 1} 重新入队 (第 {attempts[index]} 次尝试)")
+                        # 重试时从该任务的检查点继续，不重复截已完成的页面
+                        self._job_queue.put((index, replace(jobs[index], resume=True)))
+                    else:
+                        self._set_result(results, index, JobResult(job=jobs[index], success=False,
+                                                                   error=f"工作进程{reason}，已达最大尝试次数"))
+
+                if not self._processes:
+                    logger.error("没有可用的工作进程，剩余任务记为失败")
+                    for index, result in enumerate(results):
+                        if result is None:
+                            self._set_result(results, index, JobResult(job=jobs[index], success=False,
+                                                                       error="没有可用的工作进程"))
+        finally:
+            self._shutdown()
+
+        succeeded = sum(1 for r in results if r.success)
+        logger.success(f"多进程截图完成: 成功 {succeeded}/{len(results)} 个任务, "
+                       f"耗时 {time.perf_counter() - start:.1f} 秒")
+        return results
+
+    def _handle_events(self, results: List[Optional[JobResult]], timeout: Optional[float] = None) -> None:
+        """
+        处理结果队列中已到达的所有事件
+
+        Args:
+            results: 任务结果列表
+            timeout: 队列为空时等待第一个事件的秒数，None 表示不等待
+        """
+        try:
+            if timeout is not None:
+                self._handle_event(*self._result_queue.get(timeout=timeout), results)
+            while True:
+                self._handle_event(*self._result_queue.get_nowait(), results)
+        except queue.Empty:
+            pass
+
+    def _handle_event(self, event: str, worker_id: int, index: Optional[int],
+                      data, results: List[Optional[JobResult]]) -> None:
+        """处理工作进程回报的事件"""
+        if event == 'browser':
+            self._browser_pids[worker_id] = data
+        elif event == 'start':
+            self._in_flight[worker_id] = (index, time.monotonic())
+            self._startup_failures.pop(worker_id, None)
+            logger.info(f"工作进程 {worker_id} 开始任务 {index + 1}")
+        elif event == 'done':
+            self._in_flight.pop(worker_id, None)
+            if results[index] is None:
+                self._set_result(results, index, data)
+                status = "成功" if data.success else f"失败: {data.error}"
+                logger.info(f"工作进程 {worker_id} 完成任务 {index + 1} ({status})")
+
+    def _set_result(self, results: List[Optional[JobResult]], index: int, result: JobResult) -> None:
+        """记录任务结果并通知调用方"""
+        results[index] = result
+        if self._on_result:
+            self._on_result(index, result)
+
+    def _find_failed_workers(self) -> List[Tuple[int, str]]:
+        """找出已崩溃或任务超时的工作进程"""
+        failed = []
+        now = time.monotonic()
+        for worker_id, process in self._processes.items():
+            if not process.is_alive():
+                failed.append((worker_id, "异常退出"))
+            elif worker_id in self._in_flight and now - self._in_flight[worker_id][1] > self.job_timeout:
+                failed.append((worker_id, "任务超时"))
+        return failed
+
+    def _start_worker(self, worker_id: int) -> None:
+        """启动指定编号的工作进程"""
+        user_data_dir = self.profile_root / f"worker_{worker_id}"
+        port = self._pick_port(worker_id)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, port, str(user_data_dir), self.headless, self.interactive,
+                  self._job_queue, self._result_queue),
+            name=f"capture-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._processes[worker_id] = process
+
+    def _pick_port(self, worker_id: int) -> int:
+        """
+        为工作进程选择调试端口：默认 起始端口+编号，已被占用（如常驻浏览器）时
+        按工作进程数量为步长顺延，不会与其他工作进程的端口重复
+
+        Returns:
+            int: 调试端口
+        """
+        others = {port for wid, port in self._ports.items() if wid != worker_id}
+        port = self.base_port + worker_id
+        for _ in range(100):
+            if port not in others and not _port_in_use(port):
+                if port != self.base_port + worker_id:
+                    logger.warning(f"端口 {self.base_port + worker_id} 已被占用，工作进程 {worker_id} 改用端口 {port}")
+                self._ports[worker_id] = port
+                return port
+            port += self.workers
+        raise RuntimeError(f"工作进程 {worker_id} 找不到可用的调试端口（起始端口 {self.base_port}）")
+
+    def _restart_worker(self, worker_id: int, reason: str) -> Optional[int]:
+        """
+        结束故障工作进程及其浏览器，并启动新的工作进程
+        未领取任务就连续退出超过最大尝试次数的工作进程不再重启
+
+        Returns:
+            Optional[int]: 该进程正在执行的任务序号（没有则为None）
+        """
+        self._kill_worker(worker_id)
+        in_flight = self._in_flight.pop(worker_id, None)
+
+        if in_flight is None:
+            failures = self._startup_failures.get(worker_id, 0) + 1
+            self._startup_failures[worker_id] = failures
+            if failures > self.max_attempts:
+                logger.error(f"工作进程 {worker_id} 连续 {failures} 次启动失败，不再重启")
+                del self._processes[worker_id]
+                return None
+
+        logger.error(f"工作进程 {worker_id} {reason}，正在重启...")
+        self._start_worker(worker_id)
+        return in_flight[0] if in_flight else None
+
+    def _kill_worker(self, worker_id: int) -> None:
+        """强制结束工作进程以及它启动的浏览器进程"""
+        process = self._processes.get(worker_id)
+        if process and process.is_alive():
+            process.kill()
+            process.join(timeout=5)
+
+        browser_pid = self._browser_pids.pop(worker_id, None)
+        if browser_pid:
+            try:
+                os.kill(browser_pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def _shutdown(self) -> None:
+        """通知所有工作进程退出，超时未退出的强制结束"""
+        for _ in self._processes:
+            self._job_queue.put(None)
+        for worker_id, process in self._processes.items():
+            process.join(timeout=30)
+            if process.is_alive():
+                self._kill_worker(worker_id)
+        self._processes.clear()
+        self._ports.clear()
+        self._in_flight.clear()
+
+
+def capture_with_workers(jobs: Iterable[Union[CaptureJob, str]],
+                         workers: Optional[int] = None,
+                         headless: Optional[bool] = None,
+                         on_result: Optional[Callable[[int, JobResult], None]] = None) -> List[JobResult]:
+    """
+    便捷函数：用多进程任务池执行截图任务
+
+    Args:
+        jobs: 截图任务列表（CaptureJob 或 URL 字符串）
+        workers: 工作进程数量
+        headless: 是否使用无头模式，默认使用 config.BROWSER_HEADLESS
+        on_result: 每个任务结束时调用，参数为 (任务在列表中的位置, 结果)
+
+    Returns:
+        List[JobResult]: 任务结果列表
+    """
+    return WorkerPool(workers=workers, headless=headless).run(jobs, on_result=on_result)